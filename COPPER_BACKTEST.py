@@ -1,118 +1,49 @@
 # =======================
 # COPPER BACKTEST – PHASE 2
 # (Gold-Setup + ret_20)
+# Config (Symbol, Features, Thresholds) -> backtest/registry.py
 # =======================
 
-import numpy as np
-import pandas as pd
-import yfinance as yf
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import StandardScaler
+from backtest import REGISTRY, long_pnl, threshold_sweep
+from backtest.features import build_frame
+from backtest.models import fit_logit
+from backtest.runner import load_prices
 
 # =======================
 # CONFIG
 # =======================
-SYMBOL = "HG=F"          # Copper Futures
-START_DATE = "2010-01-01"
+SPEC = REGISTRY["COPPER"]
 
-THRESHOLDS = [
-    0.50,
-    0.52,
-    0.54,
-    0.56,
-    0.58,
-    0.60
-]
+SYMBOL = SPEC.symbol
+START_DATE = SPEC.start
+THRESHOLDS = list(SPEC.thresholds)
 
 # =======================
 # DATA
 # =======================
 def load_copper():
-    df = yf.download(SYMBOL, start=START_DATE, progress=False)
-
-    df = df[["Open", "High", "Low", "Close", "Volume"]].dropna()
-
-    # Features (Gold + Momentum-Erweiterung)
-    df["ret_1"] = df["Close"].pct_change(1)
-    df["ret_5"] = df["Close"].pct_change(5)
-    df["ret_20"] = df["Close"].pct_change(20)      # <<< PHASE 2 FEATURE
-    df["ma_10"] = df["Close"].rolling(10).mean()
-    df["ma_50"] = df["Close"].rolling(50).mean()
-    df["ma_ratio"] = df["ma_10"] / df["ma_50"] - 1
-    df["vol_10"] = df["ret_1"].rolling(10).std()
-
-    # Target: nächster Tag höher?
-    df["Target"] = (df["Close"].shift(-1) > df["Close"]).astype(int)
-
-    df = df.dropna()
-    return df
+    return build_frame(load_prices(SPEC), SPEC.features, SPEC.hold_days)
 
 # =======================
 # MODEL
 # =======================
 def fit_model(df):
-    features = [
-        "ret_1",
-        "ret_5",
-        "ret_20",     # <<< NEU
-        "ma_ratio",
-        "vol_10"
-    ]
-
-    X = df[features].values
-    y = df["Target"].values
-
-    scaler = StandardScaler()
-    Xs = scaler.fit_transform(X)
-
-    model = LogisticRegression(
-        max_iter=300,
-        class_weight="balanced",
-        solver="lbfgs"
-    )
-
-    model.fit(Xs, y)
-
-    probs = model.predict_proba(Xs)[:, 1]
-    df = df.copy()
-    df["prob_up"] = probs
-
-    return df
+    return fit_logit(df, SPEC.features, SPEC.max_iter)
 
 # =======================
 # BACKTEST (LONG ONLY)
 # =======================
 def backtest(df, threshold):
-    trades = []
-
-    for _, row in df.iterrows():
-        val = row["prob_up"]
-        prob = float(val.iloc[0] if hasattr(val, "iloc") else val)
-
-        val_t = row["Target"]
-        target = int(val_t.iloc[0] if hasattr(val_t, "iloc") else val_t)
-
-        if prob >= threshold:
-            ret = 1 if target == 1 else -1
-            trades.append(ret)
+    return backtest_sweep(df, [threshold]).to_dict("records")[0]
 
-    if len(trades) == 0:
-        return {
-            "threshold": threshold,
-            "trades": 0,
-            "accuracy": 0.0,
-            "profit": 0
-        }
-
-    trades = np.array(trades)
-
-    return {
-        "threshold": threshold,
-        "trades": len(trades),
-        "accuracy": trades[trades > 0].size / trades.size,
-        "profit": int(trades.sum())
-    }
 
+def backtest_sweep(df, thresholds):
+    # prob_up einmal sortieren -> alle Thresholds in einem Durchlauf
+    return threshold_sweep(
+        df["prob_up"].values,
+        long_pnl(df["Target"].values),
+        thresholds
+    )
 
 # =======================
 # MAIN
@@ -123,23 +54,19 @@ def main():
     df = load_copper()
     df = fit_model(df)
 
-    results = []
-
-    for th in THRESHOLDS:
-        res = backtest(df, th)
-        results.append(res)
+    out = backtest_sweep(df, THRESHOLDS)
 
+    for res in out.to_dict("records"):
         print(
-            f"TH={th:.2f} | "
+            f"TH={res['threshold']:.2f} | "
             f"Trades={res['trades']} | "
             f"Accuracy={res['accuracy']*100:.2f}% | "
             f"Profit={res['profit']}"
         )
 
-    out = pd.DataFrame(results)
-    out.to_csv("copper_backtest_phase2_results.csv", index=False)
+    out.to_csv(SPEC.output, index=False)
 
-    print("\n[OK] copper_backtest_phase2_results.csv written")
+    print(f"\n[OK] {SPEC.output} written")
 
 # =======================
 if __name__ == "__main__":
@@ -1,94 +1,75 @@
-import yfinance as yf
-import numpy as np
 import pandas as pd
 
-from model_core import model_score
+from backtest import REGISTRY, threshold_sweep
+from backtest.models import score_signals
+from backtest.runner import load_prices
 
 # ==================================================
-# CONFIG (Silver-spezifisch)
+# CONFIG (Silver-spezifisch) -> backtest/registry.py
 # ==================================================
 
-TICKER = "SI=F"
-PERIOD = "6y"
-LOOKBACK = 40          # exakt ausreichend für Score-V2
-HOLD_DAYS = 10         # Silver hält länger
-MIN_ROWS = 500
+SPEC = REGISTRY["SILVER"]
 
-THRESHOLDS = [0.19, 0.30, 0.72, 0.74, 0.68]
+TICKER = SPEC.symbol
+PERIOD = SPEC.period
+LOOKBACK = SPEC.lookback       # exakt ausreichend für Score-V2
+HOLD_DAYS = SPEC.hold_days     # Silver hält länger
+MIN_ROWS = SPEC.min_rows
 
-# ==================================================
-# LOAD DATA
-# ==================================================
-
-print("[START] Silver backtest")
+THRESHOLDS = list(SPEC.thresholds)
 
-df = yf.download(
-    TICKER,
-    period=PERIOD,
-    interval="1d",
-    progress=False
-).dropna()
 
-print("Downloaded rows:", len(df))
+def main():
+    # ==================================================
+    # LOAD DATA
+    # ==================================================
 
-if len(df) < MIN_ROWS:
-    raise RuntimeError("Not enough data for Silver backtest")
-
-# ==================================================
-# BACKTEST LOOP (FIXED LOOKBACK – IMPORTANT)
-# ==================================================
+    print("[START] Silver backtest")
 
-scores = []
-future_returns = []
+    df = load_prices(SPEC).dropna()
 
-for i in range(LOOKBACK, len(df) - HOLD_DAYS):
-    window = df.iloc[i - LOOKBACK : i]   # <<< DER ENTSCHEIDENDE FIX
-    score = model_score(window)
+    print("Downloaded rows:", len(df))
 
-    entry = df["Close"].iloc[i]
-    exit_ = df["Close"].iloc[i + HOLD_DAYS]
+    if len(df) < MIN_ROWS:
+        raise RuntimeError("Not enough data for Silver backtest")
 
-    ret = (exit_ - entry) / entry
+    # ==================================================
+    # SCORES (VECTORIZED, FIXED LOOKBACK – IMPORTANT)
+    # ==================================================
 
-    scores.append(score)
-    future_returns.append(ret)
+    scores, future_returns = score_signals(df, SPEC)
 
-scores = np.array(scores)
-future_returns = np.array(future_returns)
+    # ==================================================
+    # THRESHOLD EVALUATION
+    # ==================================================
 
-# ==================================================
-# THRESHOLD EVALUATION
-# ==================================================
+    rows = []
 
-rows = []
+    for res in threshold_sweep(scores, future_returns, THRESHOLDS).to_dict("records"):
+        th, trades = res["threshold"], res["trades"]
+        acc = res["accuracy"] * 100
+        profit = res["profit"]
 
-for th in THRESHOLDS:
-    mask = scores >= th
-    trades = int(mask.sum())
+        print(
+            f"TH={th:.2f} | "
+            f"Trades={trades} | "
+            f"Accuracy={acc:.2f}% | "
+            f"Profit={profit:.1f}"
+        )
 
-    if trades == 0:
-        acc = 0.0
-        profit = 0.0
-    else:
-        acc = (future_returns[mask] > 0).mean() * 100
-        profit = future_returns[mask].sum()
+        rows.append((th, trades, round(acc, 2), round(profit, 1)))
 
-    print(
-        f"TH={th:.2f} | "
-        f"Trades={trades} | "
-        f"Accuracy={acc:.2f}% | "
-        f"Profit={profit:.1f}"
-    )
+    # ==================================================
+    # SAVE RESULTS
+    # ==================================================
 
-    rows.append((th, trades, round(acc, 2), round(profit, 1)))
+    pd.DataFrame(
+        rows,
+        columns=["threshold", "trades", "accuracy_pct", "profit_sum"]
+    ).to_csv(SPEC.output, index=False)
 
-# ==================================================
-# SAVE RESULTS
-# ==================================================
+    print(f"[OK] {SPEC.output} written")
 
-pd.DataFrame(
-    rows,
-    columns=["threshold", "trades", "accuracy_pct", "profit_sum"]
-).to_csv("silver_backtest_results.csv", index=False)
 
-print("[OK] silver_backtest_results.csv written")
+if __name__ == "__main__":
+    main()
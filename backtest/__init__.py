@@ -0,0 +1,40 @@
+import importlib
+
+# Exporte werden erst beim ersten Zugriff importiert (PEP 562):
+# `import backtest.engine` zieht so nicht Grid / Runner / Datenquellen mit.
+_EXPORTS = {
+    "AssetSpec": ".registry",
+    "REGISTRY": ".registry",
+    "VARIANTS": ".registry",
+    "best_params": ".grid",
+    "bootstrap_indices": ".significance",
+    "bootstrap_thresholds": ".significance",
+    "expand": ".registry",
+    "grid_stats": ".grid",
+    "long_pnl": ".engine",
+    "param_combos": ".grid",
+    "run_portfolio": ".portfolio",
+    "run_backtests": ".runner",
+    "run_grid": ".grid",
+    "run_spec": ".runner",
+    "score_matrix": ".grid",
+    "simulate_asset": ".portfolio",
+    "simulate_portfolio": ".portfolio",
+    "specs_for": ".registry",
+    "threshold_sweep": ".engine",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,121 @@
+import argparse
+
+from .runner import GRID_FILE, PORTFOLIO_FILE, RESULTS_FILE, run_backtests
+
+
+def _grid_main(args):
+    from .grid import best_params, run_grid
+
+    print("[START] Score-V2 grid search")
+    results = run_grid(
+        args.assets or None,
+        horizon=args.horizon,
+        workers=args.workers,
+        out_file=args.out or GRID_FILE,
+    )
+
+    best = best_params(results, min_trades=args.min_trades)
+    for res in best.to_dict("records"):
+        print(
+            f"{res['asset']:<12} {res['side']:<5} "
+            f"TH={res['threshold']:.2f} | "
+            f"L={res['long_window']} S={res['short_window']} "
+            f"blend={res['blend']} gains={res['gain_long']}/{res['gain_short']} | "
+            f"Trades={res['trades']} | "
+            f"Hit={res['hit_rate']*100:.2f}% | "
+            f"Sharpe={res['sharpe']:.2f}"
+        )
+
+    print(f"\n[OK] {args.out or GRID_FILE} written ({len(results)} rows)")
+
+
+def _portfolio_main(args):
+    from .portfolio import run_portfolio
+
+    print("[START] Portfolio simulation")
+    summary = run_portfolio(
+        args.assets or None,
+        fee=args.fee,
+        slippage=args.slippage,
+        out_file=args.out or PORTFOLIO_FILE,
+        equity_file=args.equity,
+    )
+
+    for res in summary.to_dict("records"):
+        print(
+            f"{res['asset']:<12} "
+            f"Return={res['total_return']*100:+.1f}% | "
+            f"CAGR={res['cagr']*100:+.2f}% | "
+            f"Sharpe={res['sharpe']:.2f} | "
+            f"MaxDD={res['max_drawdown']*100:.1f}% | "
+            f"Trades={res['trades']} | "
+            f"Stops={res['stop_rate']*100:.1f}%"
+        )
+
+    print(f"\n[OK] {args.out or PORTFOLIO_FILE} written ({len(summary)} rows)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backtest", description="Sammel-Backtest aller Registry-Assets")
+    parser.add_argument("assets", nargs="*", help="z.B. GOLD COPPER (Default: alle)")
+    parser.add_argument("--workers", type=int, default=None, help="Prozesse (Default: alle Kerne)")
+    parser.add_argument("--no-variants", action="store_true", help="nur Basis-Spec pro Asset")
+    parser.add_argument("--hold-days", type=int, nargs="+", help="Grid über hold_days")
+    parser.add_argument("--walk-forward", action="store_true", help="Logit-Modelle out-of-sample (Walk-Forward)")
+    parser.add_argument("--refit-every", type=int, nargs="+", help="Walk-Forward: Refit alle N Bars (Grid)")
+    parser.add_argument("--train-window", type=int, default=None, help="Walk-Forward: rollierendes Fenster (Default: expandierend)")
+    parser.add_argument("--bootstrap", type=int, default=0, help="Block-Bootstrap-Resamples für CIs / p-Werte (z.B. 10000)")
+    parser.add_argument("--block", type=float, default=None, help="Bootstrap: (mittlere) Blocklänge (Default: n^(1/3))")
+    parser.add_argument("--method", choices=("stationary", "block"), default="stationary", help="Bootstrap-Verfahren")
+    parser.add_argument("--grid", action="store_true", help="Grid-Search über die Score-V2-Parameter (Forecast-Assets)")
+    parser.add_argument("--horizon", type=int, default=5, help="Grid: Forward-Return-Horizont in Bars")
+    parser.add_argument("--min-trades", type=int, default=100, help="Grid: Mindest-Trades für die Bestenliste")
+    parser.add_argument("--portfolio", action="store_true", help="Portfolio-Simulation (Hebel, Stop-Loss, Kosten) der Forecast-Assets")
+    parser.add_argument("--fee", type=float, default=0.0005, help="Portfolio: Gebühr pro Seite (Anteil Exposure)")
+    parser.add_argument("--slippage", type=float, default=0.0005, help="Portfolio: Slippage pro Seite")
+    parser.add_argument("--equity", default=None, help="Portfolio: Equity-Kurve zusätzlich als CSV")
+    parser.add_argument("--out", default=None, help=f"Default: {RESULTS_FILE} / {GRID_FILE} / {PORTFOLIO_FILE}")
+    args = parser.parse_args(argv)
+
+    if args.grid:
+        return _grid_main(args)
+    if args.portfolio:
+        return _portfolio_main(args)
+
+    grid = {}
+    if args.hold_days:
+        grid["hold_days"] = args.hold_days
+    if args.walk_forward:
+        grid["walk_forward"] = [True]
+        grid["train_window"] = [args.train_window]
+        if args.refit_every:
+            grid["refit_every"] = args.refit_every
+
+    print("[START] Backtest sweep")
+    results = run_backtests(
+        args.assets or None,
+        variants=not args.no_variants,
+        grid=grid or None,
+        workers=args.workers,
+        out_file=args.out or RESULTS_FILE,
+        bootstrap={"n_boot": args.bootstrap, "block": args.block, "method": args.method} if args.bootstrap else None,
+    )
+
+    for res in results.to_dict("records"):
+        print(
+            f"{res['asset']:<7} {res['variant']:<12} "
+            f"TH={res['threshold']:.3f} | "
+            f"Trades={res['trades']} | "
+            f"Accuracy={res['accuracy']*100:.2f}% | "
+            f"Profit={res['profit']:.1f}"
+            + (
+                f" | Acc95=[{res['acc_lo']*100:.1f}-{res['acc_hi']*100:.1f}]% | p={res['p_value']:.4f}"
+                if args.bootstrap else ""
+            )
+        )
+
+    print(f"\n[OK] {args.out or RESULTS_FILE} written ({len(results)} rows)")
+
+
+if __name__ == "__main__":
+    main()
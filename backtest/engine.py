@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+
+# =======================
+# THRESHOLD SWEEP (SINGLE PASS)
+# =======================
+def long_pnl(target) -> np.ndarray:
+    """Target (1 = nächster Tag höher) -> LONG-Ergebnis +1 / -1 pro Bar."""
+    target = np.asarray(target).reshape(-1)
+    return np.where(target == 1, 1, -1)
+
+
+def threshold_sweep(scores, pnl, thresholds, wins=None) -> pd.DataFrame:
+    """
+    Wertet beliebig viele Thresholds in einem Durchlauf aus.
+
+    Ein Trade entsteht, wenn score >= threshold (NaN-Scores handeln nie).
+    scores werden einmal sortiert, danach liefern Suffix-Summen über pnl / wins
+    für jeden Threshold per searchsorted:
+        trades   = Anzahl Bars mit score >= threshold
+        accuracy = Anteil Gewinner (wins, Default: pnl > 0)
+        profit   = Summe pnl
+    """
+    scores = np.asarray(scores, dtype=float).reshape(-1)
+    pnl = np.asarray(pnl).reshape(-1)
+    wins = (pnl > 0) if wins is None else np.asarray(wins, dtype=bool).reshape(-1)
+    th = np.asarray(thresholds, dtype=float).reshape(-1)
+
+    ok = np.isfinite(scores)
+    order = np.argsort(scores[ok], kind="stable")
+    s_sorted = scores[ok][order]
+
+    # suffix[k] = Summe über alle sortierten Positionen >= k
+    def _suffix(x):
+        return np.concatenate((np.cumsum(x[::-1])[::-1], [0]))
+
+    pnl_suffix = _suffix(pnl[ok][order])
+    win_suffix = _suffix(wins[ok][order].astype(np.int64))
+
+    k = np.searchsorted(s_sorted, th, side="left")
+    trades = len(s_sorted) - k
+    correct = win_suffix[k]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        accuracy = np.where(trades > 0, correct / np.maximum(trades, 1), 0.0)
+
+    return pd.DataFrame({
+        "threshold": th,
+        "trades": trades.astype(int),
+        "accuracy": accuracy,
+        "profit": pnl_suffix[k],
+    })
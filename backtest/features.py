@@ -0,0 +1,33 @@
+import pandas as pd
+
+from feature_store import FEATURES, get_feature_store
+
+
+# =======================
+# FEATURES (bewusst simpel & robust)
+# =======================
+# Definitionen + Cache leben in feature_store (geteilt mit Forecast / Universe);
+# die Namen bleiben hier für bestehende Importe erhalten.
+ret_1 = FEATURES["ret_1"]
+ret_5 = FEATURES["ret_5"]
+ret_20 = FEATURES["ret_20"]
+ma_ratio = FEATURES["ma_ratio"]
+vol_10 = FEATURES["vol_10"]
+
+
+def build_frame(df: pd.DataFrame, features, hold_days: int = 1, store=None) -> pd.DataFrame:
+    """
+    OHLCV + gewünschte Features + Target (Close in hold_days Bars höher?).
+    Zeilen mit unvollständigen Features werden verworfen.
+    Features kommen aus dem FeatureStore (einmal gerechnet, auf Platte gecacht).
+    """
+    df = df[["Open", "High", "Low", "Close", "Volume"]].dropna().copy()
+    close = df["Close"]
+
+    values = (store or get_feature_store()).get(close, features)
+    for name in features:
+        df[name] = values[name]
+
+    df["Target"] = (close.shift(-hold_days) > close).astype(int)
+
+    return df.dropna()
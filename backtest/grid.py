@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_provider import load_history
+from forecast_assets import ASSETS
+from model_core import SCORE_PARAMS, _rolling_sum, score_from_components
+
+from .runner import GRID_FILE
+
+
+# Default-Raster um die Produktions-Formel herum (405 Kombinationen nach short < long)
+DEFAULT_GRID: Dict[str, tuple] = {
+    "long_window": (10, 15, 20, 30, 40),
+    "short_window": (3, 5, 8),
+    "blend": (0.5, 0.65, 0.8),
+    "gain_long": (0.5, 0.8, 1.2),
+    "gain_short": (0.8, 1.2, 1.6),
+}
+PARAM_COLS = list(SCORE_PARAMS)
+
+# LONG wenn score >= th, SHORT wenn score <= th (wie decision_engine)
+LONG_THRESHOLDS = tuple(np.round(np.arange(0.50, 0.7501, 0.01), 2))
+SHORT_THRESHOLDS = tuple(np.round(np.arange(0.25, 0.5001, 0.01), 2))
+
+# Scores sind auf 3 Nachkommastellen gerundet und liegen in [0.25, 0.75]
+# -> 501 Bins, jeder Threshold auf dem 0.001-Raster ist eine Prefix-/Suffix-Summe
+_BIN_LO = 250
+_N_BINS = 501
+
+# Obergrenze Zellen (Kombinationen x Bars) pro Chunk
+MAX_CELLS = 2_000_000
+
+GRID_COLS = [
+    "asset", "symbol", "horizon", "side", "threshold", *PARAM_COLS, "default",
+    "trades", "hit_rate", "mean_return", "std_return", "sharpe",
+]
+
+
+# =======================
+# PARAMETER GRID
+# =======================
+def param_combos(grid: Optional[dict] = None) -> pd.DataFrame:
+    """Kartesisches Produkt des Grids (fehlende Keys = Produktionswert), nur short_window < long_window."""
+    grid = {**{k: (v,) for k, v in SCORE_PARAMS.items()}, **(grid or DEFAULT_GRID)}
+    rows = list(itertools.product(*(grid[k] for k in PARAM_COLS)))
+    combos = pd.DataFrame(rows, columns=PARAM_COLS)
+    combos = combos[combos["short_window"] < combos["long_window"]].reset_index(drop=True)
+    combos["default"] = (combos[PARAM_COLS] == pd.Series(SCORE_PARAMS)).all(axis=1)
+    return combos
+
+
+# =======================
+# SCORE MATRIX (BROADCAST)
+# =======================
+def _components(p: np.ndarray, long_windows, short_windows):
+    """
+    Formel-Bausteine je eindeutigem Fenster, jeweils (Fenster x Bars):
+        r_long / r_short = Return über long/short Bars, vol = Std der letzten long Log-Returns.
+    """
+    n = len(p)
+    pos = np.arange(n)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rets = np.diff(np.log(p))
+        ok = np.isfinite(rets)
+        # zentrieren -> keine Auslöschung bei E[r^2] - E[r]^2; ungültige Returns (p <= 0)
+        # auf 0, sonst trägt die cumsum in _rolling_sum -inf / NaN in alle späteren Bars
+        x = np.where(ok, rets - (rets[ok].mean() if ok.any() else 0.0), 0.0)
+        bad = (~ok).astype(float)
+
+        r_long = np.full((len(long_windows), n), np.nan)
+        vol = np.full((len(long_windows), n), np.nan)
+        for j, w in enumerate(long_windows):
+            if n > w:
+                r_long[j, w:] = (p[w:] - p[:-w]) / p[:-w]
+                s1 = _rolling_sum(x, w)
+                s2 = _rolling_sum(x * x, w)
+                v = np.sqrt(np.maximum(s2 / w - (s1 / w) ** 2, 0.0))
+                # Fenster mit ungültigem Return -> np.std wäre NaN (wie compute_score)
+                v[_rolling_sum(bad, w) > 0] = np.nan
+                # Fensterlänge wie compute_score: mindestens max(30, long + 1) Closes
+                vol[j, 1:] = np.where(pos[1:] >= max(29, w), v, np.nan)
+
+        r_short = np.full((len(short_windows), n), np.nan)
+        for j, w in enumerate(short_windows):
+            if n > w:
+                r_short[j, w:] = (p[w:] - p[:-w]) / p[:-w]
+
+    return r_long, vol, r_short
+
+
+def score_matrix(prices, combos: pd.DataFrame) -> np.ndarray:
+    """
+    Score V2 für alle Kombinationen x alle Bars in einem Broadcast.
+
+    out[c, i] == compute_score(p[: i + 1], **combos.iloc[c]);  NaN wo compute_score
+    auf den Fallback 0.50 gehen würde (zu kurz / Volatilität ~ 0).
+    """
+    p = np.asarray(prices, dtype=float).reshape(-1)
+    lw, li = np.unique(combos["long_window"].to_numpy(), return_inverse=True)
+    sw, si = np.unique(combos["short_window"].to_numpy(), return_inverse=True)
+    r_long, vol, r_short = _components(p, lw, sw)
+    return _scores(r_long, vol, r_short, combos, lw[li], li, sw[si], si)
+
+
+def _scores(r_long, vol, r_short, combos, L, li, S, si) -> np.ndarray:
+    return score_from_components(
+        r_long[li], r_short[si], vol[li], L[:, None], S[:, None],
+        combos["blend"].to_numpy(dtype=float)[:, None],
+        combos["gain_long"].to_numpy(dtype=float)[:, None],
+        combos["gain_short"].to_numpy(dtype=float)[:, None],
+    )
+
+
+# =======================
+# STATS (BINNED PREFIX SUMS)
+# =======================
+def _binned(scores: np.ndarray, fwd: np.ndarray):
+    """Pro Kombination und Score-Bin: Anzahl, Summe r, Summe r^2, Anzahl r > 0, Anzahl r < 0."""
+    c = scores.shape[0]
+    ok = np.isfinite(scores) & np.isfinite(fwd)[None, :]
+    rows, cols = np.nonzero(ok)
+    bins = np.rint(scores[rows, cols] * 1000).astype(np.int64) - _BIN_LO
+    idx = rows * _N_BINS + np.clip(bins, 0, _N_BINS - 1)
+    r = fwd[cols]
+
+    size = c * _N_BINS
+
+    def _bc(w=None):
+        return np.bincount(idx, weights=w, minlength=size).reshape(c, _N_BINS)
+
+    return _bc(), _bc(r), _bc(r * r), _bc((r > 0).astype(float)), _bc((r < 0).astype(float))
+
+
+def _side_stats(count, s1, s2, wins, thresholds, side: str, horizon: int) -> Dict[str, np.ndarray]:
+    """Kennzahlen (Kombination x Threshold) aus den Bin-Summen."""
+    k = np.rint(np.asarray(thresholds) * 1000).astype(np.int64) - _BIN_LO
+
+    def _cum(x):
+        if side == "LONG":      # score >= th -> Suffix-Summe
+            return np.concatenate((np.cumsum(x[:, ::-1], axis=1)[:, ::-1], np.zeros((len(x), 1))), axis=1)[:, k]
+        return np.cumsum(x, axis=1)[:, k]       # score <= th -> Prefix-Summe
+
+    n = _cum(count)
+    sign = 1.0 if side == "LONG" else -1.0
+    total = sign * _cum(s1)
+    sq = _cum(s2)
+    hits = _cum(wins)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(n > 0, total / n, np.nan)
+        std = np.sqrt(np.maximum(sq / n - mean ** 2, 0.0))
+        sharpe = np.where(std > 0, mean / std * np.sqrt(252 / horizon), np.nan)
+        hit = np.where(n > 0, hits / n, np.nan)
+
+    return {"trades": n.astype(np.int64), "hit_rate": hit, "mean_return": mean, "std_return": std, "sharpe": sharpe}
+
+
+def grid_stats(
+    prices,
+    combos: pd.DataFrame,
+    *,
+    horizon: int = 5,
+    long_thresholds=LONG_THRESHOLDS,
+    short_thresholds=SHORT_THRESHOLDS,
+    max_cells: int = MAX_CELLS,
+) -> pd.DataFrame:
+    """
+    Forward-Return-Statistik (horizon Bars, überlappend) je Kombination x Seite x Threshold.
+
+    Scores werden in Chunks von max_cells // Bars Kombinationen berechnet; pro Chunk
+    bleiben nur Bin-Summen (Kombinationen x 501) übrig -> Speicher unabhängig von der Grid-Größe.
+    """
+    p = np.asarray(prices, dtype=float).reshape(-1)
+    p = p[np.isfinite(p)]
+    n = len(p)
+
+    fwd = np.full(n, np.nan)
+    if n > horizon:
+        fwd[:-horizon] = p[horizon:] / p[:-horizon] - 1
+
+    lw, li = np.unique(combos["long_window"].to_numpy(), return_inverse=True)
+    sw, si = np.unique(combos["short_window"].to_numpy(), return_inverse=True)
+    r_long, vol, r_short = _components(p, lw, sw)
+
+    chunk = max(1, max_cells // max(n, 1))
+    parts: Dict[str, List[np.ndarray]] = {"LONG": [], "SHORT": []}
+    for a in range(0, len(combos), chunk):
+        sl = slice(a, a + chunk)
+        scores = _scores(r_long, vol, r_short, combos.iloc[sl], lw[li[sl]], li[sl], sw[si[sl]], si[sl])
+        count, s1, s2, up, down = _binned(scores, fwd)
+        parts["LONG"].append(_side_stats(count, s1, s2, up, long_thresholds, "LONG", horizon))
+        parts["SHORT"].append(_side_stats(count, s1, s2, down, short_thresholds, "SHORT", horizon))
+
+    tables = []
+    for side, thresholds in (("LONG", long_thresholds), ("SHORT", short_thresholds)):
+        stats = {k: np.concatenate([d[k] for d in parts[side]]) for k in parts[side][0]}
+        t = len(thresholds)
+        table = combos.loc[combos.index.repeat(t)].reset_index(drop=True)
+        table.insert(0, "threshold", np.tile(np.asarray(thresholds, dtype=float), len(combos)))
+        table.insert(0, "side", side)
+        for k, v in stats.items():
+            table[k] = v.reshape(-1)
+        tables.append(table)
+
+    out = pd.concat(tables, ignore_index=True)
+    out.insert(0, "horizon", horizon)
+    return out
+
+
+# =======================
+# ALL ASSETS
+# =======================
+def _asset_job(name, symbol, closes, combos, kwargs):
+    table = grid_stats(closes, combos, **kwargs)
+    table.insert(0, "symbol", symbol)
+    table.insert(0, "asset", name)
+    return table
+
+
+def run_grid(
+    assets=None,
+    *,
+    grid: Optional[dict] = None,
+    horizon: int = 5,
+    start: str = "2010-01-01",
+    long_thresholds=LONG_THRESHOLDS,
+    short_thresholds=SHORT_THRESHOLDS,
+    max_cells: int = MAX_CELLS,
+    workers: Optional[int] = None,
+    out_file: Optional[str] = GRID_FILE,
+) -> pd.DataFrame:
+    """
+    Grid-Search über die Score-V2-Parameter für die Forecast-Assets (ein Prozess pro Asset).
+    Ergebnis: eine Zeile je (Asset, Seite, Threshold, Kombination), siehe GRID_COLS.
+    """
+    wanted = {a.upper() for a in assets} if assets else None
+    universe = [(name, symbol) for name, symbol, _ in ASSETS if wanted is None or name in wanted]
+    combos = param_combos(grid)
+    kwargs = dict(
+        horizon=horizon,
+        long_thresholds=long_thresholds,
+        short_thresholds=short_thresholds,
+        max_cells=max_cells,
+    )
+
+    jobs = []
+    for name, symbol in universe:
+        df = load_history(symbol, start=start)
+        if df is None or df.empty or "Close" not in df.columns:
+            print(f"[SKIP] {name}: keine Daten")
+            continue
+        jobs.append((name, symbol, df["Close"].to_numpy(dtype=float), combos, kwargs))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        tables = [_asset_job(*j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            tables = list(pool.map(_asset_job, *zip(*jobs)))
+
+    results = pd.concat(tables, ignore_index=True)[GRID_COLS] if tables else pd.DataFrame(columns=GRID_COLS)
+
+    if out_file:
+        results.to_csv(out_file, index=False)
+    return results
+
+
+def best_params(results: pd.DataFrame, *, min_trades: int = 100, metric: str = "sharpe") -> pd.DataFrame:
+    """Beste Kombination + Threshold je (Asset, Seite) nach metric, mit Mindestanzahl Trades."""
+    ok = results[(results["trades"] >= min_trades) & results[metric].notna()]
+    if ok.empty:
+        return ok
+    idx = ok.groupby(["asset", "side"])[metric].idxmax()
+    return ok.loc[idx].reset_index(drop=True)
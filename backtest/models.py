@@ -0,0 +1,75 @@
+import numpy as np
+
+from model_core import compute_score_series
+
+from .engine import long_pnl
+from .features import build_frame
+from .walkforward import walk_forward_proba
+
+
+# =======================
+# LOGIT (Feature-Modell, in-sample)
+# =======================
+def fit_logit(df, features, max_iter=200):
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+
+    X = df[list(features)].values
+    y = df["Target"].values
+
+    scaler = StandardScaler()
+    Xs = scaler.fit_transform(X)
+
+    model = LogisticRegression(
+        max_iter=max_iter,
+        class_weight="balanced",
+        solver="lbfgs"
+    )
+    model.fit(Xs, y)
+
+    df = df.copy()
+    df["prob_up"] = model.predict_proba(Xs)[:, 1]
+    return df
+
+
+def logit_signals(prices, spec, workers=1):
+    df = build_frame(prices, spec.features, spec.hold_days)
+
+    if spec.walk_forward:
+        probs = walk_forward_proba(
+            df[list(spec.features)].values,
+            df["Target"].values,
+            refit_every=spec.refit_every,
+            train_window=spec.train_window,
+            min_train=spec.min_train,
+            embargo=spec.hold_days,
+            max_iter=spec.max_iter,
+            workers=workers,
+        )
+        ok = np.isfinite(probs)
+        return probs[ok], long_pnl(df["Target"].values[ok])
+
+    df = fit_logit(df, spec.features, spec.max_iter)
+    return df["prob_up"].values, long_pnl(df["Target"].values)
+
+
+# =======================
+# SCORE V2 (fixes Lookback)
+# =======================
+def score_signals(prices, spec, workers=1):
+    df = prices.dropna()
+    score_series = compute_score_series(df, lookback=spec.lookback).values
+    close = df["Close"].values.reshape(-1)
+
+    idx = np.arange(spec.lookback, len(df) - spec.hold_days)
+
+    # Score aus df.iloc[i - lookback : i], Entry Close[i], Exit Close[i + hold_days]
+    scores = score_series[idx - 1]
+    future_returns = (close[idx + spec.hold_days] - close[idx]) / close[idx]
+    return scores, future_returns
+
+
+MODELS = {
+    "logit": logit_signals,
+    "score": score_signals,
+}
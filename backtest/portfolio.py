@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from chatgpt_overlay import chatgpt_overlay
+from data_provider import load_many
+from decision_engine import _NO_RULE, ENTRY_RULES, decide_batch
+from forecast_assets import ASSETS
+from model_core import compute_score_series
+
+from .runner import PORTFOLIO_FILE
+
+
+# Kosten pro Seite, bezogen aufs Exposure (Margin x Hebel)
+FEE = 0.0005
+SLIPPAGE = 0.0005
+
+BARS_PER_YEAR = 252
+
+# Overlay-FINAL -> Positionsgröße
+SIZING = {"Go100": 1.0, "Go50": 0.5, "NoTrade": 0.0}
+
+
+# =======================
+# STRATEGIE PRO ASSET
+# =======================
+@dataclass(frozen=True)
+class PortfolioSpec:
+    name: str
+    symbol: str
+    leverage: float = 1.0
+    stop_loss: Optional[float] = None       # Verlust auf die Margin, z.B. 0.20 -> Kursstopp 20 % / Hebel
+    hold_days: int = 5                      # Haltedauer pro Tranche (Bars)
+    directions: Optional[Tuple[str, ...]] = None   # None = wie ENTRY_RULES
+    weight: float = 0.25                    # Kapitalanteil des Assets (verteilt auf hold_days Tranchen)
+    macro: str = "STRONG_SUPPORT"           # Overlay-Input -> Go100 / Go50 / NoTrade
+    lookback: Optional[int] = 126           # Score-Fenster (~6mo wie FORECAST_PERIOD)
+
+
+_SYMBOLS = {name: symbol for name, symbol, _ in ASSETS}
+
+# Strategie-Zeilen aus forecast_gas / forecast_silver ("Lev ≤ 10 | SL −20 %", "Long only | Lev ≤ 15 | SL −20 %")
+STRATEGIES: Dict[str, PortfolioSpec] = {
+    "GOLD": PortfolioSpec("GOLD", _SYMBOLS["GOLD"]),
+    "SILVER": PortfolioSpec("SILVER", _SYMBOLS["SILVER"], leverage=15, stop_loss=0.20, directions=("LONG",)),
+    "NATURAL GAS": PortfolioSpec("NATURAL GAS", _SYMBOLS["NATURAL GAS"], leverage=10, stop_loss=0.20),
+    "COPPER": PortfolioSpec("COPPER", _SYMBOLS["COPPER"]),
+}
+
+TRADE_COLS = [
+    "asset", "entry_date", "exit_date", "direction", "size", "entry", "exit",
+    "return", "stopped", "open",
+]
+
+
+def overlay_size(spec: PortfolioSpec) -> float:
+    """Positionsgröße aus dem Overlay (Go100 = 1.0, Go50 = 0.5, NoTrade = 0)."""
+    return SIZING[chatgpt_overlay(spec.name, None, None, spec.macro)[2]]
+
+
+def signals(spec: PortfolioSpec, close) -> np.ndarray:
+    """+1 LONG / -1 SHORT / 0 pro Bar aus Score-V2 + Entry-Regeln (wie im Tageslauf)."""
+    score = compute_score_series(np.asarray(close, dtype=float), lookback=spec.lookback)
+    action = np.asarray(decide_batch(asset=spec.name, score=score)["action"], dtype=object)
+    direction = np.select([action == "LONG", action == "SHORT"], [1, -1], 0).astype(np.int8)
+
+    allowed = spec.directions if spec.directions is not None else ENTRY_RULES.get(spec.name, _NO_RULE).directions
+    if "LONG" not in allowed:
+        direction[direction > 0] = 0
+    if "SHORT" not in allowed:
+        direction[direction < 0] = 0
+    return direction
+
+
+# =======================
+# SIMULATION (ein Asset)
+# =======================
+def _ohlc(df: pd.DataFrame):
+    df = df[df["Close"].notna()]
+    close = df["Close"].to_numpy(dtype=float)
+    cols = [df[c].to_numpy(dtype=float) if c in df else close for c in ("Open", "High", "Low")]
+    # fehlende O/H/L -> Close (kein Intrabar-Pfad)
+    o, h, l = (np.where(np.isfinite(x), x, close) for x in cols)
+    return df.index, o, h, l, close
+
+
+def _windows(x: np.ndarray, hold: int, fill: float) -> np.ndarray:
+    # Zeile t = x[t+1 .. t+hold], hinter dem Ende mit fill aufgefüllt
+    return sliding_window_view(np.concatenate((x[1:], np.full(hold, fill))), hold)
+
+
+def simulate_asset(
+    spec: PortfolioSpec,
+    df: pd.DataFrame,
+    *,
+    signal=None,
+    size=None,
+    fee: float = FEE,
+    slippage: float = SLIPPAGE,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Gestaffelte Tranchen: jedes Signal eröffnet zum Close eine Tranche mit weight * size / hold_days
+    Margin; Exit nach hold_days Bars zum Close oder vorher am Stopp (erster Bar mit Low/High
+    jenseits des Stopps, Gap -> Open). Alles über Index-Arrays, keine Schleife über Bars/Trades.
+
+    Fixed Notional: Margin = Anteil des *Startkapitals*, feste Stückzahl pro Tranche (kein Rebalancing);
+    PnL = (Kurs - Entry) / Entry x Hebel x Margin, Verlust max. die Margin.
+    Liefert (bars, trades): bars mit pnl / exposure pro Bar (Anteil Startkapital), trades eine Zeile je Tranche.
+    """
+    index, o, hi, lo, c = _ohlc(df)
+    n = len(c)
+    hold = max(int(spec.hold_days), 1)
+
+    sig = signals(spec, c) if signal is None else np.asarray(signal, dtype=np.int8).reshape(-1)[-n:]
+    size = np.full(n, overlay_size(spec)) if size is None else np.broadcast_to(np.asarray(size, dtype=float), (n,))
+
+    # Tranchen: Signal + Größe > 0 + mindestens ein Folgebar
+    t = np.flatnonzero((sig != 0) & (size > 0) & (np.arange(n) < n - 1))
+    d = sig[t].astype(float)
+    w = spec.weight * size[t] / hold
+    lev = float(spec.leverage)
+
+    entry = c[t] * (1 + slippage * d)
+    stop_frac = min(spec.stop_loss or 1.0, 1.0) / lev     # ohne SL: Liquidation bei -100 % Margin
+    stop = entry * (1 - d * stop_frac)
+
+    # ---------- STOPP-SUCHE (Fenster t+1 .. t+hold aus High/Low) ----------
+    win_lo = _windows(lo, hold, np.inf)[t]
+    win_hi = _windows(hi, hold, -np.inf)[t]
+    hit = np.where(d[:, None] > 0, win_lo <= stop[:, None], win_hi >= stop[:, None])
+
+    stopped = hit.any(axis=1)
+    exit_pos = np.where(stopped, t + 1 + hit.argmax(axis=1), np.minimum(t + hold, n - 1))
+    is_open = ~stopped & (t + hold > n - 1)
+
+    # Gap über den Stopp -> Fill zum Open
+    gap_open = o[exit_pos]
+    gapped = np.where(d > 0, gap_open < stop, gap_open > stop)
+    raw_exit = np.where(stopped, np.where(gapped, gap_open, stop), c[exit_pos])
+    exit_px = raw_exit * (1 - slippage * d)
+
+    ret = d * lev * (exit_px / entry - 1) - 2 * fee * lev
+    floor = np.maximum(ret, -1.0) - ret                   # Margin weg -> kein weiterer Verlust
+
+    # ---------- PNL PRO BAR (Differenz-Arrays) ----------
+    # Tranche hält Stück = w x Hebel / Entry -> pnl[s] = Stück x d x (C[s] - C[s-1]) für t < s < Exit
+    coef = w * d * lev / entry
+    active = np.zeros(n + 1)
+    np.add.at(active, t + 1, coef)
+    np.add.at(active, exit_pos, -coef)
+    dc = np.diff(c, prepend=c[0])
+    pnl = np.cumsum(active)[:n] * dc
+
+    cost = w * lev * fee
+    np.add.at(pnl, t, coef * (c[t] - entry) - cost)
+    np.add.at(pnl, exit_pos, coef * (exit_px - c[exit_pos - 1]) - cost + w * floor)
+
+    gross = np.zeros(n + 1)
+    np.add.at(gross, t + 1, w * lev)
+    np.add.at(gross, exit_pos + 1, -w * lev)
+
+    bars = pd.DataFrame({"pnl": pnl, "exposure": np.cumsum(gross)[:n]}, index=index)
+    trades = pd.DataFrame({
+        "asset": spec.name,
+        "entry_date": index[t],
+        "exit_date": index[exit_pos],
+        "direction": np.where(d > 0, "LONG", "SHORT"),
+        "size": size[t],
+        "entry": entry,
+        "exit": exit_px,
+        "return": np.maximum(ret, -1.0),
+        "stopped": stopped,
+        "open": is_open,
+    }, columns=TRADE_COLS)
+    return bars, trades
+
+
+# =======================
+# PORTFOLIO
+# =======================
+def equity_curve(pnl) -> pd.DataFrame:
+    """
+    Equity + Drawdown aus pnl pro Bar (Anteil Startkapital, siehe simulate_asset).
+    Fixed Notional -> Equity = 1 + kumulierte Summe, kein Compounding; Ruin (<= 0) bleibt bei 0.
+    """
+    pnl = pd.Series(pnl, dtype=float).fillna(0.0)
+    equity = 1.0 + np.cumsum(pnl.to_numpy())
+    equity[np.maximum.accumulate(equity <= 0)] = 0.0
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0))
+    return pd.DataFrame({"pnl": pnl.to_numpy(), "equity": equity, "drawdown": equity / peak - 1.0}, index=pnl.index)
+
+
+def _stats(curve: pd.DataFrame, trades: pd.DataFrame, exposure) -> dict:
+    pnl = curve["pnl"].to_numpy()
+    n = len(pnl)
+    final = float(curve["equity"].iloc[-1]) if n else 1.0
+    std = pnl.std(ddof=1) if n > 1 else 0.0
+    ret = trades["return"].to_numpy()
+    return {
+        "bars": n,
+        "total_return": final - 1.0,
+        "cagr": final ** (BARS_PER_YEAR / n) - 1.0 if n and final > 0 else -1.0,
+        "vol": std * np.sqrt(BARS_PER_YEAR),
+        "sharpe": pnl.mean() / std * np.sqrt(BARS_PER_YEAR) if std > 0 else np.nan,
+        "max_drawdown": float(curve["drawdown"].min()) if n else 0.0,
+        "trades": len(ret),
+        "hit_rate": float((ret > 0).mean()) if len(ret) else np.nan,
+        "avg_trade": float(ret.mean()) if len(ret) else np.nan,
+        "stop_rate": float(trades["stopped"].mean()) if len(ret) else np.nan,
+        "avg_exposure": float(np.mean(exposure)) if n else 0.0,
+    }
+
+
+def simulate_portfolio(
+    frames: Dict[str, pd.DataFrame],
+    strategies: Optional[Dict[str, PortfolioSpec]] = None,
+    *,
+    fee: float = FEE,
+    slippage: float = SLIPPAGE,
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Alle Assets gemeinsam: pnl pro Asset auf den vereinigten Kalender (fehlende Bars = 0),
+    Portfolio-pnl = Summe. frames: {Asset-Name: OHLCV-DataFrame}.
+    Liefert (curve, trades, summary): curve mit pnl_<asset>, pnl, equity, drawdown;
+    summary eine Zeile je Asset (standalone) + PORTFOLIO.
+    """
+    strategies = strategies or STRATEGIES
+    bars, trades = {}, []
+    for name, df in frames.items():
+        if df is None or df.empty or "Close" not in df:
+            continue
+        bars[name], tr = simulate_asset(strategies[name], df, fee=fee, slippage=slippage)
+        trades.append(tr)
+
+    trades = pd.concat(trades, ignore_index=True) if trades else pd.DataFrame(columns=TRADE_COLS)
+    if not bars:
+        return equity_curve([]), trades, pd.DataFrame()
+
+    pnl = pd.concat({name: b["pnl"] for name, b in bars.items()}, axis=1).fillna(0.0)
+    exposure = pd.concat({name: b["exposure"] for name, b in bars.items()}, axis=1).fillna(0.0)
+
+    curve = equity_curve(pnl.sum(axis=1))
+    curve = pd.concat([pnl.add_prefix("pnl_"), curve], axis=1)
+
+    rows = [
+        {"asset": name, **_stats(equity_curve(pnl[name]), trades[trades["asset"] == name], exposure[name])}
+        for name in pnl.columns
+    ]
+    rows.append({"asset": "PORTFOLIO", **_stats(curve, trades, exposure.sum(axis=1))})
+    return curve, trades, pd.DataFrame(rows)
+
+
+def run_portfolio(
+    assets=None,
+    *,
+    start: str = "2010-01-01",
+    fee: float = FEE,
+    slippage: float = SLIPPAGE,
+    out_file: Optional[str] = PORTFOLIO_FILE,
+    equity_file: Optional[str] = None,
+) -> pd.DataFrame:
+    """Daten laden (ein Batch) -> simulate_portfolio -> Summary (optional CSV + Equity-Kurve)."""
+    names = [a.upper() for a in assets] if assets else list(STRATEGIES)
+    unknown = [a for a in names if a not in STRATEGIES]
+    if unknown:
+        raise KeyError(f"Unknown portfolio asset: {', '.join(unknown)}")
+
+    loaded = load_many([STRATEGIES[a].symbol for a in names], start=start)
+    frames = {}
+    for a in names:
+        df = loaded.get(STRATEGIES[a].symbol)
+        if df is None or df.empty:
+            print(f"[SKIP] {a}: keine Daten")
+            continue
+        frames[a] = df
+
+    curve, _, summary = simulate_portfolio(frames, fee=fee, slippage=slippage)
+
+    if out_file:
+        summary.to_csv(out_file, index=False)
+    if equity_file:
+        curve.to_csv(equity_file, index_label="date")
+    return summary
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+
+# =======================
+# ASSET SPEC
+# =======================
+@dataclass(frozen=True)
+class AssetSpec:
+    name: str
+    symbol: str
+    model: str                              # "logit" (Feature-Modell) | "score" (Score-V2)
+    features: Tuple[str, ...] = ()
+    thresholds: Tuple[float, ...] = ()
+    hold_days: int = 1
+    start: Optional[str] = "2010-01-01"     # entweder start ...
+    period: Optional[str] = None            # ... oder yfinance-period
+    lookback: int = 40                      # Score-Fenster (model="score")
+    max_iter: int = 200                     # LogisticRegression (model="logit")
+    walk_forward: bool = False              # logit: out-of-sample statt in-sample Fit
+    refit_every: int = 21                   # Walk-Forward: Refit alle N Bars
+    train_window: Optional[int] = None      # Walk-Forward: None = expandierend, sonst rollierend
+    min_train: int = 252                    # Walk-Forward: Bars vor dem ersten Fold
+    min_rows: int = 0
+    output: Optional[str] = None            # Legacy-CSV der Einzel-Skripte
+    variant: str = "base"
+
+
+# =======================
+# REGISTRY
+# =======================
+GOLD_FEATURES = ("ret_1", "ret_5", "ma_ratio", "vol_10")
+
+REGISTRY: Dict[str, AssetSpec] = {
+    "GOLD": AssetSpec(
+        name="GOLD",
+        symbol="GC=F",
+        model="logit",
+        features=GOLD_FEATURES,
+        thresholds=(0.54, 0.545, 0.55, 0.6, 0.65, 0.7, 0.75),
+        max_iter=200,
+        output="gold_backtest_results.csv",
+    ),
+    "COPPER": AssetSpec(
+        name="COPPER",
+        symbol="HG=F",
+        model="logit",
+        features=("ret_1", "ret_5", "ret_20", "ma_ratio", "vol_10"),   # Phase 2: Gold-Setup + ret_20
+        thresholds=(0.50, 0.52, 0.54, 0.56, 0.58, 0.60),
+        max_iter=300,
+        output="copper_backtest_phase2_results.csv",
+    ),
+    "SILVER": AssetSpec(
+        name="SILVER",
+        symbol="SI=F",
+        model="score",
+        thresholds=(0.19, 0.30, 0.72, 0.74, 0.68),
+        hold_days=10,
+        start=None,
+        period="6y",
+        lookback=40,
+        min_rows=500,
+        output="silver_backtest_results.csv",
+    ),
+}
+
+# Zusätzliche Parameter-Sets pro Asset (laufen im Sammel-Backtest mit)
+VARIANTS: Dict[str, List[dict]] = {
+    "COPPER": [
+        {"variant": "phase1", "features": GOLD_FEATURES},
+    ],
+}
+
+
+def expand(spec: AssetSpec, grid: Optional[dict] = None) -> List[AssetSpec]:
+    """
+    Kartesisches Produkt über grid, z.B. {"hold_days": [1, 5, 10]} -> ein Spec pro Kombination.
+    """
+    if not grid:
+        return [spec]
+
+    keys = sorted(grid)
+    out = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        label = ",".join(f"{k}={v}" for k, v in zip(keys, values))
+        variant = label if spec.variant == "base" else f"{spec.variant}|{label}"
+        out.append(replace(spec, variant=variant, **dict(zip(keys, values))))
+    return out
+
+
+def specs_for(assets=None, *, variants: bool = True, grid: Optional[dict] = None) -> List[AssetSpec]:
+    names = list(REGISTRY) if not assets else [a.upper() for a in assets]
+
+    specs = []
+    for name in names:
+        if name not in REGISTRY:
+            raise KeyError(f"Unknown backtest asset: {name}")
+        base = REGISTRY[name]
+        specs.append(base)
+        if variants:
+            specs.extend(replace(base, **v) for v in VARIANTS.get(name, []))
+
+    return [s for spec in specs for s in expand(spec, grid)]
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from data_provider import load_history
+
+from .engine import threshold_sweep
+from .models import MODELS
+from .registry import AssetSpec, specs_for
+from .significance import SIGNIFICANCE_COLS, bootstrap_thresholds
+
+
+RESULTS_FILE = "backtest_results.csv"
+GRID_FILE = "score_grid_results.csv"        # backtest.grid
+PORTFOLIO_FILE = "portfolio_results.csv"    # backtest.portfolio
+
+RESULT_COLS = [
+    "asset", "variant", "symbol", "model", "hold_days",
+    "threshold", "trades", "accuracy", "profit",
+]
+
+
+# =======================
+# SINGLE JOB
+# =======================
+def run_spec(
+    spec: AssetSpec,
+    prices: pd.DataFrame,
+    workers: int = 1,
+    bootstrap: Optional[dict] = None,
+) -> pd.DataFrame:
+    """
+    Ein Asset / Parameter-Set -> Threshold-Tabelle (eine Zeile pro Threshold).
+    workers: Prozesse innerhalb des Jobs (Walk-Forward-Folds / Bootstrap-Chunks).
+    bootstrap: kwargs für bootstrap_thresholds (n_boot, block, method, ...) -> + SIGNIFICANCE_COLS
+    """
+    if len(prices.dropna()) < spec.min_rows:
+        raise RuntimeError(f"Not enough data for {spec.name} backtest")
+
+    scores, pnl = MODELS[spec.model](prices, spec, workers=workers)
+    out = threshold_sweep(scores, pnl, spec.thresholds)
+
+    if bootstrap:
+        sig = bootstrap_thresholds(scores, pnl, spec.thresholds, workers=workers, **bootstrap)
+        out = pd.concat([out, sig[SIGNIFICANCE_COLS]], axis=1)
+
+    out.insert(0, "hold_days", spec.hold_days)
+    out.insert(0, "model", spec.model)
+    out.insert(0, "symbol", spec.symbol)
+    out.insert(0, "variant", spec.variant)
+    out.insert(0, "asset", spec.name)
+    return out
+
+
+def _job(
+    spec: AssetSpec,
+    prices: pd.DataFrame,
+    workers: int = 1,
+    bootstrap: Optional[dict] = None,
+) -> Tuple[AssetSpec, Optional[pd.DataFrame], str]:
+    try:
+        return spec, run_spec(spec, prices, workers, bootstrap), ""
+    except Exception as e:
+        return spec, None, str(e)
+
+
+def load_prices(spec: AssetSpec) -> pd.DataFrame:
+    return load_history(spec.symbol, start=spec.start, period=spec.period)
+
+
+# =======================
+# SWEEP (PROCESS POOL)
+# =======================
+def run_backtests(
+    assets=None,
+    *,
+    variants: bool = True,
+    grid: Optional[dict] = None,
+    workers: Optional[int] = None,
+    out_file: Optional[str] = RESULTS_FILE,
+    bootstrap: Optional[dict] = None,
+) -> pd.DataFrame:
+    """
+    Alle Assets x Parameter-Sets der Registry über einen Process-Pool.
+    Preisdaten werden im Hauptprozess einmal pro (Symbol, Fenster) geladen und an die Jobs gereicht.
+    bootstrap (optional): Signifikanz pro Threshold, siehe backtest.significance.
+    """
+    specs = specs_for(assets, variants=variants, grid=grid)
+
+    data: Dict[tuple, pd.DataFrame] = {}
+    for s in specs:
+        key = (s.symbol, s.start, s.period)
+        if key not in data:
+            data[key] = load_prices(s)
+
+    jobs = [(s, data[(s.symbol, s.start, s.period)]) for s in specs]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(jobs) == 1:
+        # ein Job -> die Kerne gehen an die Walk-Forward-Folds / Bootstrap-Chunks
+        done = [_job(s, df, workers, bootstrap) for s, df in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            done = list(pool.map(_job, *zip(*jobs), [1] * len(jobs), [bootstrap] * len(jobs)))
+
+    tables: List[pd.DataFrame] = []
+    for spec, table, err in done:
+        if table is None:
+            print(f"[SKIP] {spec.name} ({spec.variant}): {err}")
+            continue
+        tables.append(table)
+
+    results = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=RESULT_COLS)
+
+    if out_file:
+        results.to_csv(out_file, index=False)
+    return results
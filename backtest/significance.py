@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Resamples pro Chunk (Index-Matrix chunk x Bars, int32)
+CHUNK = 250
+
+SIGNIFICANCE_COLS = [
+    "acc_lo", "acc_hi", "profit_lo", "profit_hi",
+    "excess_mean", "excess_lo", "excess_hi", "p_value",
+]
+
+
+# =======================
+# INDEX-MATRIZEN
+# =======================
+def bootstrap_indices(
+    n: int,
+    size: int,
+    block: float,
+    rng: np.random.Generator,
+    method: str = "stationary",
+) -> np.ndarray:
+    """
+    (size x n) Index-Matrix für Block-Bootstrap, ohne Python-Schleife über die Bars.
+
+    stationary: Blocklängen geometrisch mit Mittel `block` (Politis/Romano), zirkulär
+    block:      feste Blocklänge `block` (moving block), zirkulär
+    """
+    t = np.arange(n)
+    if method == "stationary":
+        restart = rng.random((size, n)) < 1.0 / max(block, 1.0)
+        restart[:, 0] = True
+    elif method == "block":
+        restart = np.broadcast_to(t % max(int(block), 1) == 0, (size, n))
+    else:
+        raise ValueError(f"Unknown bootstrap method: {method}")
+
+    # Beginn des laufenden Blocks je Position, Startindex aus dem Zufallsvektor dieser Position
+    block_start = np.maximum.accumulate(np.where(restart, t, 0), axis=1)
+    starts = rng.integers(0, n, size=(size, n), dtype=np.int64)
+    first = np.take_along_axis(starts, block_start, axis=1)
+    return ((first + (t - block_start)) % n).astype(np.int32)
+
+
+def default_block(n: int) -> float:
+    """Faustregel n^(1/3) (z.B. ~16 Bars für 15 Jahre Tagesdaten)."""
+    return max(1.0, round(n ** (1.0 / 3.0)))
+
+
+# =======================
+# STATISTIK PRO RESAMPLE
+# =======================
+def _bucket_sums(idx: np.ndarray, bucket: np.ndarray, pnl: np.ndarray, wins: np.ndarray, n_buckets: int):
+    """Summen pro (Resample, Score-Bucket) -> Anzahl, Summe pnl, Gewinner; dazu Summe pnl aller Bars."""
+    size = idx.shape[0]
+    flat = (np.arange(size)[:, None] * n_buckets + bucket[idx]).ravel()
+    total = size * n_buckets
+
+    count = np.bincount(flat, minlength=total).reshape(size, n_buckets)
+    profit = np.bincount(flat, weights=pnl[idx].ravel(), minlength=total).reshape(size, n_buckets)
+    won = np.bincount(flat, weights=wins[idx].ravel(), minlength=total).reshape(size, n_buckets)
+    return count, profit, won
+
+
+def _threshold_stats(count, profit, won, pnl_all):
+    """Bucket-Summen -> (trades, accuracy, profit, excess) je Threshold (Suffix-Summen)."""
+    def _suffix(x):
+        return np.cumsum(x[..., ::-1], axis=-1)[..., ::-1][..., 1:]
+
+    trades = _suffix(count)
+    prof = _suffix(profit)
+    wins = _suffix(won)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        acc = np.where(trades > 0, wins / trades, np.nan)
+        mean = np.where(trades > 0, prof / trades, np.nan)
+    bench = pnl_all / count.sum(axis=-1)
+    return trades, acc, prof, mean - bench[..., None]
+
+
+def _chunk(seed, size, bucket, pnl, wins, n_buckets, block, method):
+    rng = np.random.default_rng(seed)
+    idx = bootstrap_indices(len(pnl), size, block, rng, method)
+    count, profit, won = _bucket_sums(idx, bucket, pnl, wins, n_buckets)
+    _, acc, prof, excess = _threshold_stats(count, profit, won, pnl[idx].sum(axis=1))
+    return acc, prof, excess
+
+
+# =======================
+# API
+# =======================
+def bootstrap_thresholds(
+    scores,
+    pnl,
+    thresholds,
+    *,
+    wins=None,
+    n_boot: int = 10_000,
+    block: Optional[float] = None,
+    method: str = "stationary",
+    alpha: float = 0.05,
+    seed: int = 0,
+    workers: int = 1,
+) -> pd.DataFrame:
+    """
+    Block-Bootstrap der (Score, pnl)-Paare -> Konfidenzintervalle und p-Werte pro Threshold.
+
+    Trade wenn score >= threshold (wie threshold_sweep). Benchmark = mittleres pnl aller Bars
+    (immer investiert); excess_mean = pnl pro Trade - Benchmark.
+    p_value: einseitig für H0 excess <= 0, über die zentrierte Bootstrap-Verteilung.
+    Resamples laufen in Chunks (CHUNK x Bars Indizes) über einen Process-Pool;
+    Seeds pro Chunk aus SeedSequence -> Ergebnis unabhängig von `workers`.
+    """
+    scores = np.asarray(scores, dtype=float).reshape(-1)
+    pnl = np.asarray(pnl, dtype=float).reshape(-1)
+    wins = (pnl > 0) if wins is None else np.asarray(wins, dtype=bool).reshape(-1)
+    th = np.asarray(thresholds, dtype=float).reshape(-1)
+
+    ok = np.isfinite(scores)
+    scores, pnl, wins = scores[ok], pnl[ok], wins[ok].astype(float)
+    n = len(scores)
+    block = block or default_block(n)
+
+    # Bucket k = Anzahl Thresholds <= score -> Trade für Threshold j genau dann, wenn j < k
+    order = np.argsort(th, kind="stable")
+    bucket = np.searchsorted(th[order], scores, side="right")
+    n_buckets = len(th) + 1
+
+    # ---------- BEOBACHTET ----------
+    count, profit, won = _bucket_sums(np.arange(n)[None, :], bucket, pnl, wins, n_buckets)
+    trades, acc, prof, excess = (a[0] for a in _threshold_stats(count, profit, won, np.array([pnl.sum()])))
+
+    # ---------- RESAMPLES ----------
+    sizes = [min(CHUNK, n_boot - a) for a in range(0, n_boot, CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(s, k, bucket, pnl, wins, n_buckets, block, method) for s, k in zip(seeds, sizes)]
+
+    if workers <= 1 or len(args) == 1:
+        parts = [_chunk(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(args))) as pool:
+            parts = list(pool.map(_chunk, *zip(*args)))
+
+    boot_acc, boot_prof, boot_excess = (np.concatenate(x) for x in zip(*parts))
+
+    lo, hi = 100 * alpha / 2, 100 * (1 - alpha / 2)
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        # Thresholds ohne Trades -> nur NaN in der Spalte
+        warnings.simplefilter("ignore", RuntimeWarning)
+        acc_lo, acc_hi = np.nanpercentile(boot_acc, [lo, hi], axis=0)
+        prof_lo, prof_hi = np.nanpercentile(boot_prof, [lo, hi], axis=0)
+        ex_lo, ex_hi = np.nanpercentile(boot_excess, [lo, hi], axis=0)
+        # zentriert: Verteilung von excess* - excess approximiert die Null-Verteilung
+        exceed = np.sum((boot_excess - excess) >= excess, axis=0)
+        valid = np.sum(np.isfinite(boot_excess), axis=0)
+        p_value = np.where(trades > 0, (1 + exceed) / (1 + valid), np.nan)
+
+    out = pd.DataFrame({
+        "threshold": th[order],
+        "trades": trades.astype(int),
+        "accuracy": np.nan_to_num(acc),
+        "profit": prof,
+        "acc_lo": acc_lo,
+        "acc_hi": acc_hi,
+        "profit_lo": prof_lo,
+        "profit_hi": prof_hi,
+        "excess_mean": excess,
+        "excess_lo": ex_lo,
+        "excess_hi": ex_hi,
+        "p_value": p_value,
+    })
+    # Reihenfolge der übergebenen Thresholds
+    return out.iloc[np.argsort(order, kind="stable")].reset_index(drop=True)
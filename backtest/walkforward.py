@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+# =======================
+# FOLDS
+# =======================
+def make_folds(
+    n: int,
+    *,
+    refit_every: int = 21,
+    train_window: Optional[int] = None,
+    min_train: int = 252,
+    embargo: int = 1,
+) -> List[Tuple[int, int, int, int]]:
+    """
+    Walk-Forward-Folds als (train_start, train_end, test_start, test_end), Enden exklusiv.
+
+    train_window=None -> expandierendes Fenster, sonst rollierend über train_window Bars.
+    embargo: Target von Zeile t kennt Close[t + hold_days] -> die letzten hold_days
+             Trainingszeilen vor test_start werden ausgelassen (kein Blick in die Zukunft).
+    """
+    folds = []
+    test_start = min_train + embargo
+    while test_start < n:
+        test_end = min(test_start + refit_every, n)
+        train_end = test_start - embargo
+        train_start = 0 if train_window is None else max(0, train_end - train_window)
+        folds.append((train_start, train_end, test_start, test_end))
+        test_start = test_end
+    return folds
+
+
+# =======================
+# STANDARDIZATION (PREFIX SUMS)
+# =======================
+class _PrefixScaler:
+    """
+    Mittelwert / Std (ddof=0, wie StandardScaler) für beliebige Zeilenbereiche in O(features)
+    aus einmal berechneten Prefix-Summen der gemeinsamen Feature-Matrix.
+    """
+
+    def __init__(self, X: np.ndarray):
+        # zentrieren -> stabile Varianz aus E[x^2] - E[x]^2
+        self.shift = X.mean(axis=0)
+        Xc = X - self.shift
+        zero = np.zeros((1, X.shape[1]))
+        self.s1 = np.vstack([zero, np.cumsum(Xc, axis=0)])
+        self.s2 = np.vstack([zero, np.cumsum(Xc * Xc, axis=0)])
+
+    def stats(self, a: int, b: int):
+        n = b - a
+        m = (self.s1[b] - self.s1[a]) / n
+        var = np.maximum((self.s2[b] - self.s2[a]) / n - m * m, 0.0)
+        sd = np.sqrt(var)
+        sd[sd == 0] = 1.0
+        return m + self.shift, sd
+
+
+def _run_chunk(X: np.ndarray, y: np.ndarray, folds, max_iter: int):
+    """Folds eines Chunks nacheinander, Koeffizienten werden von Fold zu Fold warm übernommen."""
+    from sklearn.linear_model import LogisticRegression
+
+    scaler = _PrefixScaler(X)
+    model = LogisticRegression(
+        max_iter=max_iter,
+        class_weight="balanced",
+        solver="lbfgs",
+        warm_start=True,
+    )
+
+    out = []
+    for a, b, c, d in folds:
+        y_train = y[a:b]
+        if len(np.unique(y_train)) < 2:
+            continue
+
+        mu, sd = scaler.stats(a, b)
+        model.fit((X[a:b] - mu) / sd, y_train)
+        out.append((c, d, model.predict_proba((X[c:d] - mu) / sd)[:, 1]))
+    return out
+
+
+# =======================
+# WALK-FORWARD
+# =======================
+def walk_forward_proba(
+    X,
+    y,
+    *,
+    refit_every: int = 21,
+    train_window: Optional[int] = None,
+    min_train: int = 252,
+    embargo: int = 1,
+    max_iter: int = 200,
+    workers: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Out-of-sample prob_up je Zeile: alle refit_every Bars neu fitten, nur auf Vergangenheit.
+    Zeilen ohne Vorhersage (Warm-up, einklassiges Training) bleiben NaN.
+
+    Die Folds werden in zusammenhängende Chunks geteilt und parallel gerechnet
+    (workers Prozesse, Default: alle Kerne); innerhalb eines Chunks mit Warm-Start.
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y).reshape(-1)
+
+    probs = np.full(len(y), np.nan)
+    folds = make_folds(len(y), refit_every=refit_every, train_window=train_window,
+                       min_train=min_train, embargo=embargo)
+    if not folds:
+        return probs
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(folds)))
+    chunks = [list(c) for c in np.array_split(np.array(folds), workers) if len(c)]
+
+    if workers == 1:
+        parts = [_run_chunk(X, y, chunks[0], max_iter)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(
+                _run_chunk,
+                [X] * len(chunks), [y] * len(chunks), chunks, [max_iter] * len(chunks),
+            ))
+
+    for part in parts:
+        for c, d, p in part:
+            probs[c:d] = p
+    return probs
@@ -0,0 +1,4 @@
+from .runner import compare, run
+from .synthetic import synthetic_ohlcv, synthetic_universe
+
+__all__ = ["compare", "run", "synthetic_ohlcv", "synthetic_universe"]
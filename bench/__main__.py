@@ -0,0 +1,42 @@
+import argparse
+import sys
+
+from .runner import RESULTS_FILE, compare, load, run, save
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Benchmarks auf synthetischen OHLCV-Daten")
+    parser.add_argument("--assets", type=int, default=4)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="beste von N Wiederholungen pro Case")
+    parser.add_argument("--sample", type=int, default=4, help="Assets für die Python-Schleifen-Cases")
+    parser.add_argument("--out", default=RESULTS_FILE)
+    parser.add_argument("--baseline", help="gespeicherte Ergebnisse zum Vergleich")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="erlaubte Verlangsamung (0.20 = +20 %%)")
+    args = parser.parse_args(argv)
+
+    report = run(args.assets, args.years, seed=args.seed, repeat=args.repeat, sample=args.sample)
+    save(report, args.out)
+
+    meta = report["meta"]
+    print(f"[BENCH] assets={meta['assets']} years={meta['years']} bars={meta['bars']}")
+    for name, r in report["results"].items():
+        print(f"{name:<24} {r['seconds']:>10.4f}s  {r['calls']:>10}  {r['us_per_call']:>12.3f} us/call")
+    print(f"\n[OK] {args.out} written")
+
+    if not args.baseline:
+        return 0
+
+    rows = compare(report, load(args.baseline), tolerance=args.tolerance)
+    regressions = [r for r in rows if r["regression"]]
+    print(f"\nVS BASELINE {args.baseline} (tolerance +{args.tolerance:.0%}):")
+    for r in rows:
+        flag = "REGRESSION" if r["regression"] else "ok"
+        print(f"{r['name']:<24} {r['baseline_us']:>12.3f} -> {r['current_us']:>12.3f} us  x{r['ratio']:<6} {flag}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
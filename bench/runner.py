@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from backtest.engine import threshold_sweep
+from data_provider import normalize_ohlcv
+from forecast_writer import write_daily_summary
+from model_core import ScoreState, compute_score, compute_score_series
+from price_series import PriceSeries
+from signal_guard import guard_dataframe
+
+from .synthetic import synthetic_universe
+
+
+RESULTS_FILE = "bench_results.json"
+
+SWEEP_THRESHOLDS = np.linspace(0.0, 1.0, 1000)
+
+
+class _Timer:
+    """Summiert Laufzeit und Aufrufe pro Benchmark-Case über alle Assets."""
+
+    def __init__(self, repeat: int = 1):
+        self.repeat = max(1, repeat)
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+
+    def run(self, name: str, fn: Callable, calls: int = 1, once: bool = False):
+        # once=True für zustandsbehaftete Cases (zweiter Lauf hätte nichts mehr zu tun)
+        best, out = float("inf"), None
+        for _ in range(1 if once else self.repeat):
+            t0 = time.perf_counter()
+            out = fn()
+            best = min(best, time.perf_counter() - t0)
+        self.seconds[name] = self.seconds.get(name, 0.0) + best
+        self.calls[name] = self.calls.get(name, 0) + calls
+        return out
+
+    def results(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "seconds": round(sec, 6),
+                "calls": self.calls[name],
+                "us_per_call": round(sec / max(self.calls[name], 1) * 1e6, 3),
+            }
+            for name, sec in sorted(self.seconds.items())
+        }
+
+
+def _legacy_window_loop(close: np.ndarray, lookback: int = 40):
+    # Backtest-Schleife alter Art: compute_score auf jedem Fenster
+    return [compute_score(close[i - lookback:i]) for i in range(lookback, len(close))]
+
+
+def _stream(close: np.ndarray, lookback: int = 40):
+    state = ScoreState(lookback)
+    for x in close:
+        state.update(x)
+    return state.score()
+
+
+def _result_row(ticker: str, df: pd.DataFrame, guard) -> dict:
+    close = df["Close"].iloc[-1]
+    return {
+        "asset": ticker,
+        "close": float(close) if np.isfinite(close) else None,
+        "score": compute_score(df),
+        "signal": "TRADE",
+        "f_1_5": 0.0,
+        "f_2_3": 0.0,
+        "gpt_1_5d": "Neutral",
+        "gpt_2_3w": "Neutral",
+        "final": "LONG",
+        "zusatzinfo": "bench",
+        **guard.to_dict(),
+        "data_ok": True,
+    }
+
+
+# =======================
+# RUN
+# =======================
+def run(
+    assets: int = 4,
+    years: float = 1.0,
+    *,
+    seed: int = 0,
+    repeat: int = 1,
+    sample: int = 4,
+    loop_bars: int = 2000,
+    signals_per_asset: int = 50,
+) -> dict:
+    """
+    Alle Hot Paths auf synthetischen Daten (assets x years).
+    Teure Python-Schleifen (Fenster-Loop, Streaming) laufen nur auf `sample` Assets
+    und höchstens `loop_bars` Bars; alles andere auf dem ganzen Universum.
+    """
+    import trade_tracker
+    from trade_store import TradeStore
+
+    timer = _Timer(repeat)
+    closes: Dict[str, pd.DataFrame] = {}
+    results: List[dict] = []
+    rows = 0
+
+    for k, (ticker, raw) in enumerate(synthetic_universe(assets, years, seed=seed)):
+        df = normalize_ohlcv(raw)
+        close = df["Close"].to_numpy(dtype=float)
+        rows += len(df)
+
+        # ---------- SCORING ----------
+        timer.run("compute_score", lambda: compute_score(raw))
+        scores = timer.run("compute_score_series", lambda: compute_score_series(close, lookback=40), calls=len(close))
+
+        if k < sample:
+            c = close[:loop_bars]
+            timer.run("score_window_loop", lambda: _legacy_window_loop(c), calls=max(len(c) - 40, 0))
+            timer.run("score_state_stream", lambda: _stream(c), calls=len(c))
+
+        # ---------- BACKTEST ----------
+        fwd = np.full(len(close), np.nan)
+        fwd[:-10] = close[10:] / close[:-10] - 1
+        ok = np.isfinite(fwd)
+        timer.run("threshold_sweep_1000", lambda: threshold_sweep(scores[ok], fwd[ok], SWEEP_THRESHOLDS))
+
+        # ---------- GUARD ----------
+        guard = timer.run("guard_dataframe", lambda: guard_dataframe(ticker, df))
+        prices = timer.run("price_series_from_frame", lambda: PriceSeries.from_frame(df, ticker))
+        timer.run("guard_price_series", lambda: guard_dataframe(ticker, prices))
+
+        results.append(_result_row(ticker, df, guard))
+        closes[ticker] = df[["Close"]]
+
+    # ---------- TRADE LOG ----------
+    with tempfile.TemporaryDirectory() as tmp:
+        old_db = trade_tracker.TRADE_DB_FILE
+        trade_tracker.TRADE_DB_FILE = os.path.join(tmp, "bench_trades.sqlite")
+        try:
+            store = TradeStore(trade_tracker.TRADE_DB_FILE, legacy_csv=None)
+            rng = np.random.default_rng(seed)
+
+            backfill = []
+            for ticker, frame in closes.items():
+                days = frame.index[rng.integers(0, len(frame), signals_per_asset)].strftime("%Y-%m-%d")
+                for d in sorted(set(days)):
+                    backfill.append({
+                        "asset": ticker, "ticker": ticker, "signal_date": d,
+                        "direction": "LONG", "entry_close": None,
+                    })
+            timer.run("trade_store_backfill", lambda: store.insert_signals(backfill), calls=len(backfill), once=True)
+
+            asset_to_ticker = {t: t for t in closes}
+            timer.run("record_signals", lambda: trade_tracker.record_signals(results, asset_to_ticker), calls=len(results), once=True)
+            timer.run(
+                "evaluate_open_trades",
+                lambda: trade_tracker.evaluate_open_trades(asset_to_ticker, horizon_days=5, market_data=closes),
+                calls=len(backfill),
+                once=True,
+            )
+            stats = timer.run("compute_stats", trade_tracker.compute_stats)
+
+            # ---------- WRITER ----------
+            out = os.path.join(tmp, "forecast_output.txt")
+            timer.run("write_daily_summary", lambda: write_daily_summary(results, stats, output_file=out), calls=len(results))
+        finally:
+            trade_tracker.TRADE_DB_FILE = old_db
+
+    return {
+        "meta": {
+            "time_utc": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            "assets": assets,
+            "years": years,
+            "bars": rows,
+            "seed": seed,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+        },
+        "results": timer.results(),
+    }
+
+
+# =======================
+# BASELINE
+# =======================
+def save(report: dict, path: str = RESULTS_FILE) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(report: dict, baseline: dict, *, tolerance: float = 0.20, min_seconds: float = 0.01) -> List[dict]:
+    """
+    Vergleich pro Case über us_per_call (unabhängig von der Datengröße).
+    regression=True, wenn langsamer als baseline * (1 + tolerance);
+    Cases unter min_seconds werden als Rauschen ignoriert.
+    """
+    rows = []
+    base = baseline.get("results", {})
+    for name, cur in report.get("results", {}).items():
+        ref = base.get(name)
+        if not ref or not ref.get("us_per_call"):
+            continue
+        ratio = cur["us_per_call"] / ref["us_per_call"]
+        noisy = cur["seconds"] < min_seconds and ref["seconds"] < min_seconds
+        rows.append({
+            "name": name,
+            "baseline_us": ref["us_per_call"],
+            "current_us": cur["us_per_call"],
+            "ratio": round(ratio, 3),
+            "regression": bool(ratio > 1 + tolerance and not noisy),
+        })
+    return rows
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+TRADING_DAYS = 252
+
+# (Drift p.a., Vola p.a.) je Regime: Bull / Bear / Stress
+REGIMES = np.array([
+    (0.10, 0.15),
+    (-0.15, 0.25),
+    (0.00, 0.55),
+])
+
+# Übergangswahrscheinlichkeiten pro Bar (Zeilen: von, Spalten: nach)
+TRANSITIONS = np.array([
+    [0.990, 0.007, 0.003],
+    [0.010, 0.985, 0.005],
+    [0.020, 0.020, 0.960],
+])
+
+
+def _regime_path(n: int, rng: np.random.Generator) -> np.ndarray:
+    # Markov-Kette segmentweise: Verweildauer geometrisch, danach Sprung in ein anderes Regime
+    path = np.empty(n, dtype=np.int8)
+    i, state = 0, 0
+    while i < n:
+        dur = int(rng.geometric(1.0 - TRANSITIONS[state, state]))
+        path[i:i + dur] = state
+        i += dur
+        others = TRANSITIONS[state].copy()
+        others[state] = 0.0
+        state = int(rng.choice(len(others), p=others / others.sum()))
+    return path
+
+
+def synthetic_ohlcv(
+    n_bars: int,
+    *,
+    ticker: str = "SYN",
+    seed: int = 0,
+    start_price: float = 100.0,
+    end: Optional[pd.Timestamp] = None,
+    gap_prob: float = 0.01,
+    nan_prob: float = 0.001,
+    multiindex: bool = True,
+) -> pd.DataFrame:
+    """
+    Daily OHLCV wie yf.download: GBM mit Regime-Wechseln, Overnight-Gaps und vereinzelten NaNs.
+    multiindex=True -> Spalten ('Close', ticker), ... wie yfinance >= 0.2.48.
+    """
+    rng = np.random.default_rng(seed)
+    end = (end or pd.Timestamp.now()).normalize()
+    index = pd.bdate_range(end=end, periods=n_bars, name="Date")
+
+    regime = _regime_path(n_bars, rng)
+    mu, sigma = REGIMES[regime, 0] / TRADING_DAYS, REGIMES[regime, 1] / np.sqrt(TRADING_DAYS)
+
+    # Overnight-Gaps: seltene Sprünge zwischen Close(t-1) und Open(t)
+    gaps = np.where(rng.random(n_bars) < gap_prob, rng.normal(0.0, 5 * sigma), 0.0)
+    intraday = rng.normal(mu - 0.5 * sigma ** 2, sigma)
+
+    log_open = np.log(start_price) + np.cumsum(gaps + np.concatenate(([0.0], intraday[:-1])))
+    open_ = np.exp(log_open)
+    close = np.exp(log_open + intraday)
+
+    spread = np.abs(rng.normal(0.0, sigma / 2, (2, n_bars)))
+    high = np.maximum(open_, close) * np.exp(spread[0])
+    low = np.minimum(open_, close) * np.exp(-spread[1])
+    volume = rng.integers(1_000, 100_000, n_bars).astype(float)
+
+    values = np.column_stack([close, high, low, open_, volume])
+    if nan_prob > 0:
+        values[rng.random(values.shape) < nan_prob] = np.nan
+
+    fields = ["Close", "High", "Low", "Open", "Volume"]
+    if multiindex:
+        columns = pd.MultiIndex.from_product([fields, [ticker]], names=["Price", "Ticker"])
+    else:
+        columns = pd.Index(fields)
+    return pd.DataFrame(values, index=index, columns=columns)
+
+
+def synthetic_universe(
+    n_assets: int,
+    years: float,
+    *,
+    seed: int = 0,
+    **kwargs,
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """Lazy: (ticker, DataFrame) pro Asset, reproduzierbar über seed."""
+    n_bars = max(int(round(years * TRADING_DAYS)), 2)
+    for i in range(n_assets):
+        ticker = f"SYN{i:05d}"
+        yield ticker, synthetic_ohlcv(n_bars, ticker=ticker, seed=seed + i, **kwargs)
@@ -0,0 +1,126 @@
+"""
+Ein Einstiegspunkt für alle Kurzaufrufe:
+
+    python cli.py forecast                 # Tageslauf (wie main.py)
+    python cli.py evaluate [--horizon 5]   # offene Trades (alle Horizonte) auswerten + Stats
+    python cli.py backtest GOLD [...]      # Registry-Backtests (Optionen wie python -m backtest)
+    python cli.py bench [...]              # Benchmarks (Optionen wie python -m bench)
+    python cli.py serve [--port 8765]      # warmer Dienst (HTTP / Unix-Socket), siehe forecast_service
+
+Schwere Module (pandas, pyarrow, yfinance, sklearn) werden erst im gewählten
+Subcommand importiert; --import-time zeigt, was das gekostet hat.
+"""
+import argparse
+import sys
+import time
+
+_T0 = time.perf_counter()
+
+
+# =======================
+# SUBCOMMANDS (Imports jeweils lokal)
+# =======================
+def _forecast(args, rest):
+    import main
+    return main.main
+
+
+def _evaluate(args, rest):
+    from main import ASSET_TO_TICKER
+    from trade_tracker import evaluate_open_trades
+
+    def run():
+        stats = evaluate_open_trades(ASSET_TO_TICKER, horizon_days=args.horizon)
+        overall = stats.get("overall", {})
+        print(
+            f"OVERALL: Trades={overall.get('trades', 0)} | "
+            f"Correct={overall.get('correct', 0)} | Wrong={overall.get('wrong', 0)} | "
+            f"Accuracy={overall.get('accuracy')}"
+        )
+        for asset, s in stats.get("by_asset", {}).items():
+            print(f"{asset:<12} Trades={s.get('trades', 0)} | Accuracy={s.get('accuracy')}")
+        for h, s in sorted(stats.get("by_horizon", {}).items()):
+            o = s["overall"]
+            print(f"H={h:<3} Trades={o.get('trades', 0)} | Accuracy={o.get('accuracy')}")
+    return run
+
+
+def _backtest(args, rest):
+    from backtest.__main__ import main as backtest_main
+    return lambda: backtest_main(rest)
+
+
+def _bench(args, rest):
+    from bench.__main__ import main as bench_main
+    return lambda: bench_main(rest)
+
+
+def _serve(args, rest):
+    from forecast_service import serve
+
+    return lambda: serve(
+        host=args.host,
+        port=args.port,
+        socket_path=args.socket,
+        interval=args.interval,
+        record=args.record,
+        quiet=not args.verbose,
+    )
+
+
+COMMANDS = {
+    "forecast": (_forecast, "Tageslauf: Download, Forecast, Trade-Log, Output"),
+    "evaluate": (_evaluate, "offene Trades auswerten und Accuracy ausgeben"),
+    "backtest": (_backtest, "Backtests, weitere Argumente gehen an python -m backtest"),
+    "bench": (_bench, "Benchmarks, weitere Argumente gehen an python -m bench"),
+    "serve": (_serve, "Forecast-Dienst mit Daten im Speicher (localhost-HTTP / Unix-Socket)"),
+}
+
+# Subcommands, die ihre restlichen Argumente selbst parsen
+_PASSTHROUGH = ("backtest", "bench")
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python cli.py", description="Forecast / Backtest CLI")
+    parser.add_argument("--import-time", action="store_true", help="Importzeit des Subcommands ausgeben (stderr)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        p = sub.add_parser(name, help=help_text, add_help=name not in _PASSTHROUGH)
+        if name == "evaluate":
+            p.add_argument("--horizon", type=int, default=5, help="Headline-Horizont (ausgewertet werden alle)")
+        if name == "serve":
+            p.add_argument("--host", default="127.0.0.1")
+            p.add_argument("--port", type=int, default=8765)
+            p.add_argument("--socket", default=None, help="Unix-Socket statt TCP")
+            p.add_argument("--interval", type=float, default=300, help="Sekunden zwischen Prüfungen auf neue Bars")
+            p.add_argument("--record", action="store_true", help="Signale loggen + offene Trades auswerten (wie forecast)")
+            p.add_argument("--verbose", action="store_true", help="Requests loggen")
+    return parser
+
+
+def main(argv=None) -> int:
+    args, rest = _parser().parse_known_args(argv)
+    if rest and args.command not in _PASSTHROUGH:
+        _parser().error(f"unrecognized arguments: {' '.join(rest)}")
+
+    n_modules = len(sys.modules)
+    t_import = time.perf_counter()
+    run = COMMANDS[args.command][0](args, rest)
+    t_run = time.perf_counter()
+
+    if args.import_time:
+        print(
+            f"[IMPORT] cli={(t_import - _T0) * 1000:.1f}ms "
+            f"{args.command}={(t_run - t_import) * 1000:.1f}ms "
+            f"(+{len(sys.modules) - n_modules} modules)",
+            file=sys.stderr,
+        )
+
+    code = run()
+    if args.import_time:
+        print(f"[TIME] {args.command} total={time.perf_counter() - _T0:.2f}s", file=sys.stderr)
+    return code if isinstance(code, int) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
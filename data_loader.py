@@ -1,9 +1,10 @@
-import yfinance as yf
 import pandas as pd
 
+from data_provider import load_history
+
 
 def load_asset(ticker: str, period="2y") -> pd.DataFrame:
-    df = yf.download(ticker, period=period, progress=False)
+    df = load_history(ticker, period=period)
     if df.empty:
         raise RuntimeError(f"No data for {ticker}")
     df = df.dropna()
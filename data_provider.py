@@ -0,0 +1,417 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from run_metrics import METRICS
+
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+# Lokaler OHLCV-Store (pro Ticker eine Parquet-Datei + Meta-JSON)
+DATA_CACHE_DIR = os.environ.get("FORECAST_CACHE_DIR") or os.path.join(os.path.dirname(__file__), "data_cache")
+
+# Untergrenze der gecachten Historie (wie metals_bundle / Backtests)
+DEFAULT_START = "2010-01-01"
+
+# Innerhalb dieses Fensters wird der Store ohne Netzwerk-Request bedient
+DEFAULT_MAX_AGE_S = 15 * 60
+
+OHLCV_COLS = ("Open", "High", "Low", "Close", "Volume")
+
+# Deadline für einen kompletten Download-Aufruf (danach wird er aufgegeben) / pro HTTP-Request in yfinance
+FETCH_TIMEOUT_S = float(os.environ.get("FORECAST_FETCH_TIMEOUT") or 120)
+REQUEST_TIMEOUT_S = 30
+
+
+# ==========================================================
+# NORMALIZATION
+# ==========================================================
+def normalize_ohlcv(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Bringt yfinance-/Datei-Output auf eine einheitliche Form:
+    flache Spalten (Open/High/Low/Close/...), sortierter, eindeutiger, tz-naiver DatetimeIndex.
+    """
+    if df is None or len(df) == 0:
+        return pd.DataFrame(columns=list(OHLCV_COLS), index=pd.DatetimeIndex([], name="Date"))
+
+    df = df.copy()
+
+    # yfinance + pandas 3 -> MultiIndex ('Close','GC=F') oder ('GC=F','Close')
+    if isinstance(df.columns, pd.MultiIndex):
+        level = 0
+        for i in range(df.columns.nlevels):
+            if "Close" in df.columns.get_level_values(i):
+                level = i
+                break
+        df.columns = df.columns.get_level_values(level)
+        df = df.loc[:, ~df.columns.duplicated()]
+
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.to_datetime(df.index)
+    if df.index.tz is not None:
+        df.index = df.index.tz_convert("UTC").tz_localize(None)
+    df.index.name = "Date"
+
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    return df
+
+
+def resolve_start(start=None, period: Optional[str] = None) -> Optional[pd.Timestamp]:
+    """
+    start ("YYYY-MM-DD") oder yfinance-period ("5d", "6mo", "2y", "max") -> Timestamp.
+    None bedeutet: gesamte verfügbare Historie.
+    """
+    if start is not None:
+        return pd.Timestamp(start).normalize()
+    if not period or period == "max":
+        return None
+
+    m = re.fullmatch(r"(\d+)(d|wk|mo|y)", str(period).strip())
+    if not m:
+        raise ValueError(f"Unsupported period: {period!r}")
+
+    n, unit = int(m.group(1)), m.group(2)
+    offset = {
+        "d": pd.DateOffset(days=n),
+        "wk": pd.DateOffset(weeks=n),
+        "mo": pd.DateOffset(months=n),
+        "y": pd.DateOffset(years=n),
+    }[unit]
+    return (pd.Timestamp.now() - offset).normalize()
+
+
+def slice_history(df: pd.DataFrame, start=None, period: Optional[str] = None) -> pd.DataFrame:
+    ts = resolve_start(start, period)
+    if ts is None or df.empty:
+        return df
+    return df[df.index >= ts]
+
+
+def _ticker_filename(ticker: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._=^-]", "_", ticker)
+
+
+def run_with_deadline(fn, timeout: float, what: str = "download"):
+    """
+    fn() in einem Daemon-Thread ausführen und höchstens timeout Sekunden warten.
+    Hängt fn, wird der Thread aufgegeben (TimeoutError) - er blockiert weder den
+    Aufrufer noch das Prozess-Ende.
+    """
+    box = {}
+
+    def _target():
+        try:
+            box["value"] = fn()
+        except BaseException as e:
+            box["error"] = e
+
+    worker = threading.Thread(target=_target, daemon=True, name=f"fetch-{what}")
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        METRICS.incr("fetch_timeouts")
+        raise TimeoutError(f"{what}: keine Antwort nach {timeout:.0f}s")
+    if "error" in box:
+        raise box["error"]
+    return box["value"]
+
+
+# ==========================================================
+# PROVIDERS
+# ==========================================================
+class DataProvider:
+    """
+    Basis-Interface: fetch() liefert rohe Bars ab start, history() schneidet auf das
+    gewünschte Fenster zu. Alle Aufrufer gehen über history().
+    """
+
+    def fetch(self, ticker: str, start: Optional[pd.Timestamp] = None,
+              end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def fetch_many(self, tickers, start: Optional[pd.Timestamp] = None,
+                   end: Optional[pd.Timestamp] = None) -> Dict[str, pd.DataFrame]:
+        return {t: self.fetch(t, start=start, end=end) for t in tickers}
+
+    def history(self, ticker: str, *, start=None, period: Optional[str] = None) -> pd.DataFrame:
+        df = self.fetch(ticker, start=resolve_start(start, period))
+        return slice_history(df, start, period)
+
+    def history_many(self, tickers, *, start=None, period: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        frames = self.fetch_many(list(dict.fromkeys(tickers)), start=resolve_start(start, period))
+        return {t: slice_history(df, start, period) for t, df in frames.items()}
+
+
+class YFinanceProvider(DataProvider):
+    """Netzwerk-Quelle (Daily Bars über yfinance)."""
+
+    # yf.download nutzt globalen Modul-State -> parallele Aufrufe serialisieren.
+    # Die Deadline läuft erst ab Lock-Erwerb; ein aufgegebener Download gibt den Lock frei,
+    # damit ein hängender Request nicht alle folgenden Ticker mitreißt.
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _kwargs(start, end) -> dict:
+        # threads=False: der Download läuft komplett im (abbrechbaren) Deadline-Thread
+        kwargs = {"interval": "1d", "progress": False, "threads": False, "timeout": REQUEST_TIMEOUT_S}
+        if start is None:
+            kwargs["period"] = "max"
+        else:
+            kwargs["start"] = start.strftime("%Y-%m-%d")
+        if end is not None:
+            kwargs["end"] = end.strftime("%Y-%m-%d")
+        return kwargs
+
+    def fetch(self, ticker, start=None, end=None):
+        import yfinance as yf
+
+        kwargs = self._kwargs(start, end)
+        with self._lock:
+            raw = run_with_deadline(lambda: yf.download(ticker, **kwargs), FETCH_TIMEOUT_S, ticker)
+        return normalize_ohlcv(raw)
+
+    def fetch_many(self, tickers, start=None, end=None):
+        """Ein einziger Multi-Ticker-Request statt einem Download pro Ticker."""
+        import yfinance as yf
+
+        tickers = list(tickers)
+        if len(tickers) <= 1:
+            return {t: self.fetch(t, start=start, end=end) for t in tickers}
+
+        kwargs = self._kwargs(start, end)
+        with self._lock:
+            raw = run_with_deadline(
+                lambda: yf.download(tickers, group_by="ticker", **kwargs),
+                FETCH_TIMEOUT_S,
+                ",".join(tickers),
+            )
+
+        out = {}
+        for t in tickers:
+            if isinstance(raw.columns, pd.MultiIndex) and t in raw.columns.get_level_values(0):
+                df = normalize_ohlcv(raw[t])
+                # gemeinsamer Index aller Ticker -> fremde Handelstage sind komplett NaN
+                out[t] = df.dropna(how="all")
+            else:
+                out[t] = normalize_ohlcv(None)
+        return out
+
+
+class LocalFileProvider(DataProvider):
+    """
+    Offline-Quelle: liest <directory>/<TICKER>.parquet bzw. .csv
+    (z.B. GC=F.parquet, Spalten Date/Open/High/Low/Close/Volume).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, ticker: str) -> Optional[str]:
+        base = os.path.join(self.directory, _ticker_filename(ticker))
+        for ext in (".parquet", ".csv"):
+            if os.path.exists(base + ext):
+                return base + ext
+        return None
+
+    def fetch(self, ticker, start=None, end=None):
+        path = self._path(ticker)
+        if path is None:
+            return normalize_ohlcv(None)
+
+        if path.endswith(".parquet"):
+            df = pd.read_parquet(path)
+        else:
+            df = pd.read_csv(path, index_col=0, parse_dates=True)
+
+        df = normalize_ohlcv(df)
+        if start is not None:
+            df = df[df.index >= start]
+        if end is not None:
+            df = df[df.index < end]
+        return df
+
+
+class CachedProvider(DataProvider):
+    """
+    Spaltenbasierter Store pro Ticker vor einer Quelle (yfinance oder Datei):
+    - erster Aufruf lädt die Historie ab DEFAULT_START (bzw. früher, falls angefragt)
+    - danach werden nur Bars ab dem letzten gecachten Timestamp nachgeladen
+      (der letzte Bar wird dabei ersetzt, falls er intraday noch unvollständig war)
+    - innerhalb von max_age_s wird ganz ohne Request aus dem Store bedient
+    - offline=True: nie nachladen, nur Store
+    """
+
+    def __init__(self, source: DataProvider, cache_dir: str = DATA_CACHE_DIR, *,
+                 max_age_s: int = DEFAULT_MAX_AGE_S, offline: bool = False,
+                 floor_start: str = DEFAULT_START):
+        self.source = source
+        self.cache_dir = cache_dir
+        self.max_age_s = max_age_s
+        self.offline = offline
+        self.floor_start = pd.Timestamp(floor_start)
+
+    # ---------- STORE I/O ----------
+    def _base(self, ticker: str) -> str:
+        return os.path.join(self.cache_dir, _ticker_filename(ticker))
+
+    def _read(self, ticker: str) -> Tuple[Optional[pd.DataFrame], dict]:
+        base = self._base(ticker)
+        meta = {}
+        if os.path.exists(base + ".json"):
+            with open(base + ".json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+
+        if os.path.exists(base + ".parquet"):
+            return normalize_ohlcv(pd.read_parquet(base + ".parquet")), meta
+        if os.path.exists(base + ".pkl"):
+            return normalize_ohlcv(pd.read_pickle(base + ".pkl")), meta
+        return None, meta
+
+    def _write(self, ticker: str, df: pd.DataFrame, meta: dict) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        base = self._base(ticker)
+
+        # atomar schreiben (tmp + replace), damit parallele Leser nie halbe Dateien sehen
+        try:
+            df.to_parquet(base + ".parquet.tmp")
+            os.replace(base + ".parquet.tmp", base + ".parquet")
+        except ImportError:
+            # kein pyarrow/fastparquet installiert -> Pickle als Fallback
+            df.to_pickle(base + ".pkl.tmp")
+            os.replace(base + ".pkl.tmp", base + ".pkl")
+
+        with open(base + ".json.tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(base + ".json.tmp", base + ".json")
+
+    # ---------- FETCH ----------
+    def fetch(self, ticker, start=None, end=None):
+        return self.fetch_many([ticker], start=start, end=end)[ticker]
+
+    def fetch_many(self, tickers, start=None, end=None):
+        want = self.floor_start if start is None else min(start, self.floor_start)
+
+        frames, metas, plan = {}, {}, {}
+        for t in tickers:
+            cached, meta = self._read(t)
+            frames[t], metas[t] = cached, meta
+
+            if self.offline:
+                METRICS.incr("cache_hits")
+                continue
+
+            if cached is None or cached.empty:
+                plan[t] = want
+                metas[t] = {"covered_from": want.strftime("%Y-%m-%d")}
+                continue
+
+            # Backfill (selten), falls früher als bisher angefragt
+            covered_from = pd.Timestamp(meta.get("covered_from", cached.index[0]))
+            if want < covered_from:
+                try:
+                    older = self.source.fetch(t, start=want, end=covered_from)
+                    frames[t] = normalize_ohlcv(pd.concat([older, cached]))
+                    meta["covered_from"] = want.strftime("%Y-%m-%d")
+                    self._write(t, frames[t], meta)
+                except Exception as e:
+                    METRICS.incr("fetch_errors")
+                    print(f"[WARN] Backfill {t} fehlgeschlagen, nutze Cache: {e}")
+
+            # Delta: nur Bars ab dem letzten gecachten Timestamp
+            age = time.time() - float(meta.get("fetched_at", 0))
+            if age > self.max_age_s:
+                plan[t] = frames[t].index[-1].normalize()
+            else:
+                METRICS.incr("cache_hits")
+
+        # ein Request pro Start-Datum: ein neuer Ticker (Start floor_start) zieht
+        # die veralteten Ticker nicht mit auf die volle Historie
+        groups: Dict[pd.Timestamp, list] = {}
+        for t, since in plan.items():
+            groups.setdefault(since, []).append(t)
+
+        for since, group in sorted(groups.items()):
+            try:
+                fetched = self.source.fetch_many(group, start=since)
+            except Exception as e:
+                # Netz weg / Rate-Limit -> mit dem Store weiterarbeiten (Guard meldet alte Bars)
+                METRICS.incr("fetch_errors")
+                print(f"[WARN] Fetch {','.join(group)} fehlgeschlagen, nutze Cache: {e}")
+                continue
+            METRICS.incr("network_fetches")
+            METRICS.incr("rows_downloaded", sum(len(df) for df in fetched.values() if df is not None))
+
+            for t in group:
+                delta = fetched.get(t)
+                if delta is None or delta.empty:
+                    # kein fetched_at -> nächster Aufruf versucht es wieder
+                    continue
+                df = frames[t]
+                df = delta if df is None or df.empty else normalize_ohlcv(pd.concat([df, delta]))
+                frames[t] = df
+                metas[t]["fetched_at"] = time.time()
+                self._write(t, df, metas[t])
+
+        out = {}
+        for t in tickers:
+            df = frames[t]
+            out[t] = normalize_ohlcv(None) if df is None else self._clip(df, start, end)
+        return out
+
+    @staticmethod
+    def _clip(df, start, end):
+        if start is not None:
+            df = df[df.index >= start]
+        if end is not None:
+            df = df[df.index < end]
+        return df
+
+
+# ==========================================================
+# DEFAULT PROVIDER
+# ==========================================================
+_provider: Optional[DataProvider] = None
+
+
+def _default_provider() -> DataProvider:
+    """
+    FORECAST_DATA_DIR=<dir>  -> LocalFileProvider (komplett offline)
+    FORECAST_OFFLINE=1       -> nur lokaler Store, kein Netzwerk
+    sonst                    -> yfinance hinter dem lokalen Store
+    """
+    local_dir = os.environ.get("FORECAST_DATA_DIR")
+    if local_dir:
+        return LocalFileProvider(local_dir)
+
+    offline = os.environ.get("FORECAST_OFFLINE", "").lower() in ("1", "true", "yes")
+    return CachedProvider(YFinanceProvider(), DATA_CACHE_DIR, offline=offline)
+
+
+def get_provider() -> DataProvider:
+    global _provider
+    if _provider is None:
+        _provider = _default_provider()
+    return _provider
+
+
+def set_provider(provider: Optional[DataProvider]) -> None:
+    """Provider austauschen (None -> beim nächsten Zugriff wieder Default)."""
+    global _provider
+    _provider = provider
+
+
+def load_history(ticker: str, *, start=None, period: Optional[str] = None) -> pd.DataFrame:
+    return get_provider().history(ticker, start=start, period=period)
+
+
+def load_many(tickers, *, start=None, period: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """Alle Ticker eines Runs in einem Batch (ein Request für alle veralteten Stores)."""
+    return get_provider().history_many(tickers, start=start, period=period)
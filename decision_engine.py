@@ -1,3 +1,65 @@
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Tuple
+
+# numpy / pandas nur in decide_batch: decide() läuft im Forecast pro Asset und braucht beides nicht
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+
+# =============================
+# ENTRY RULES (pro Asset)
+# =============================
+@dataclass(frozen=True)
+class EntryRule:
+    long_entry: Optional[float] = None      # LONG wenn score >= long_entry
+    short_entry: Optional[float] = None     # SHORT wenn score <= short_entry
+    directions: Tuple[str, ...] = ("LONG",)
+    long_info: str = ""
+    short_info: str = ""
+    idle_info: str = ""                     # weder LONG noch SHORT
+
+
+ENTRY_RULES = {
+    "GOLD": EntryRule(
+        long_entry=0.53,
+        long_info="Gold-Regel aktiv",
+        idle_info="Score unter Gold-Entry",
+    ),
+    "SILVER": EntryRule(
+        long_entry=0.69,
+        long_info="Silver-Regel aktiv",
+        idle_info="Score unter Silver-Entry",
+    ),
+    "COPPER": EntryRule(
+        long_entry=0.56,
+        long_info="Copper-Regel aktiv",
+        idle_info="Score unter Copper-Entry",
+    ),
+    "NATURAL GAS": EntryRule(
+        long_entry=0.56,
+        short_entry=0.44,
+        directions=("LONG", "SHORT"),
+        long_info="Gas LONG-Regel",
+        short_info="Gas SHORT-Regel",
+        idle_info="Gas Neutralzone",
+    ),
+}
+
+# unbekanntes Asset -> nie handeln, keine Zusatzinfo
+_NO_RULE = EntryRule(directions=())
+
+
+# Richtung nicht erlaubt -> NaN (jeder Vergleich ist False)
+def _long_level(rule: EntryRule) -> float:
+    return rule.long_entry if "LONG" in rule.directions and rule.long_entry is not None else math.nan
+
+
+def _short_level(rule: EntryRule) -> float:
+    return rule.short_entry if "SHORT" in rule.directions and rule.short_entry is not None else math.nan
+
+
 def decide(asset, score, signal_1_5d, signal_2_3w, macro_bias):
 
     # Text-Einordnung (nur Info)
@@ -6,55 +68,16 @@ def decide(asset, score, signal_1_5d, signal_2_3w, macro_bias):
 
     SIGNAL = "NO_TRADE"
     FINAL = "NO_TRADE"
-    ZUSATZINFO = ""
-
-    # -----------------------------
-    # GOLD
-    # -----------------------------
-    if asset == "GOLD":
-        if score >= 0.53:
-            SIGNAL = "TRADE"
-            FINAL = "LONG"
-            ZUSATZINFO = "Gold-Regel aktiv"
-        else:
-            ZUSATZINFO = "Score unter Gold-Entry"
-
-    # -----------------------------
-    # SILVER
-    # -----------------------------
-    elif asset == "SILVER":
-        if score >= 0.69:
-            SIGNAL = "TRADE"
-            FINAL = "LONG"
-            ZUSATZINFO = "Silver-Regel aktiv"
-        else:
-            ZUSATZINFO = "Score unter Silver-Entry"
-
-    # -----------------------------
-    # COPPER
-    # -----------------------------
-    elif asset == "COPPER":
-        if score >= 0.56:
-            SIGNAL = "TRADE"
-            FINAL = "LONG"
-            ZUSATZINFO = "Copper-Regel aktiv"
-        else:
-            ZUSATZINFO = "Score unter Copper-Entry"
-
-    # -----------------------------
-    # NATURAL GAS
-    # -----------------------------
-    elif asset == "NATURAL GAS":
-        if score >= 0.56:
-            SIGNAL = "TRADE"
-            FINAL = "LONG"
-            ZUSATZINFO = "Gas LONG-Regel"
-        elif score <= 0.44:
-            SIGNAL = "TRADE"
-            FINAL = "SHORT"
-            ZUSATZINFO = "Gas SHORT-Regel"
-        else:
-            ZUSATZINFO = "Gas Neutralzone"
+
+    rule = ENTRY_RULES.get(asset, _NO_RULE)
+
+    # LONG hat Vorrang vor SHORT
+    if score >= _long_level(rule):
+        SIGNAL, FINAL, ZUSATZINFO = "TRADE", "LONG", rule.long_info
+    elif score <= _short_level(rule):
+        SIGNAL, FINAL, ZUSATZINFO = "TRADE", "SHORT", rule.short_info
+    else:
+        ZUSATZINFO = rule.idle_info
 
     return {
     "rule_signal": SIGNAL,     # TRADE / NO_TRADE
@@ -64,3 +87,82 @@ def decide(asset, score, signal_1_5d, signal_2_3w, macro_bias):
     "zusatzinfo": ZUSATZINFO
 }
 
+
+# =============================
+# BATCH (vektorisiert)
+# =============================
+def _codes(values, categories) -> "np.ndarray":
+    """Position jedes Werts in categories, -1 wenn nicht enthalten (Series ohne Umweg über object)."""
+    import numpy as np
+    import pandas as pd
+
+    if not isinstance(values, pd.Series):
+        values = np.asarray(values, dtype=object)
+    return np.asarray(pd.Categorical(values, categories=categories).codes)
+
+
+def _trend_text(signals) -> "pd.Categorical":
+    import numpy as np
+    import pandas as pd
+
+    # Code -1 (alles außer ++ / --) -> "Neutral"
+    codes = _codes(signals, ["++", "--"])
+    return pd.Categorical.from_codes(np.where(codes < 0, 2, codes), ["Bullish", "Bearish", "Neutral"])
+
+
+def decide_batch(data=None, *, asset=None, score=None, f_1_5=None, f_2_3=None) -> "pd.DataFrame":
+    """
+    decide() für beliebig viele Zeilen ohne Python-Schleife.
+
+    Input: DataFrame mit Spalten asset, score, f_1_5, f_2_3 (oder signal_1_5d / signal_2_3w)
+    oder dieselben Größen als Arrays; asset darf ein einzelner String sein.
+    Output: DataFrame mit den Keys von decide() als Spalten (gleicher Index wie data).
+    """
+    import numpy as np
+    import pandas as pd
+
+    index = None
+    if data is not None:
+        index = data.index
+        asset = data["asset"]
+        score = data["score"]
+        f_1_5 = data["f_1_5"] if "f_1_5" in data else data.get("signal_1_5d")
+        f_2_3 = data["f_2_3"] if "f_2_3" in data else data.get("signal_2_3w")
+
+    score = np.asarray(score, dtype=float).reshape(-1)
+    n = len(score)
+    if isinstance(asset, str):
+        asset = [asset] * n
+    if f_1_5 is None:
+        f_1_5 = [None] * n
+    if f_2_3 is None:
+        f_2_3 = [None] * n
+
+    # Asset -> Zeile in der Regel-Tabelle (letzte Zeile = keine Regel)
+    names = list(ENTRY_RULES)
+    rules = [ENTRY_RULES[a] for a in names] + [_NO_RULE]
+    codes = _codes(asset, names)
+    codes = np.where(codes < 0, len(names), codes)
+
+    long_lvl = np.array([_long_level(r) for r in rules])[codes]
+    short_lvl = np.array([_short_level(r) for r in rules])[codes]
+
+    # NaN-Score: weder >= noch <= (wie im Skalar-Pfad)
+    is_long = score >= long_lvl
+    is_short = ~is_long & (score <= short_lvl)
+
+    which = np.where(is_long, 0, np.where(is_short, 1, 2))
+
+    # Info-Texte als Kategorien (kein String-Array pro Zeile)
+    texts = [[r.long_info, r.short_info, r.idle_info] for r in rules]
+    info_cats = list(dict.fromkeys(t for row in texts for t in row))
+    info_codes = np.array([[info_cats.index(t) for t in row] for row in texts])
+
+    # Ergebnis-Spalten kategorisch -> Millionen Zeilen ohne Python-Strings je Zeile
+    return pd.DataFrame({
+        "rule_signal": pd.Categorical.from_codes((~(is_long | is_short)).astype(np.int8), ["TRADE", "NO_TRADE"]),
+        "action": pd.Categorical.from_codes(which, ["LONG", "SHORT", "NO_TRADE"]),
+        "gpt_1_5d": _trend_text(f_1_5),
+        "gpt_2_3w": _trend_text(f_2_3),
+        "zusatzinfo": pd.Categorical.from_codes(info_codes[codes, which], info_cats),
+    }, index=index)
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import glob
+import hashlib
+import inspect
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from run_metrics import METRICS
+
+
+# Persistenter Feature-Cache (content-addressed, siehe FeatureStore)
+FEATURE_DIR = os.environ.get("FORECAST_FEATURE_DIR") or os.path.join(os.path.dirname(__file__), "feature_cache")
+
+# Hochzählen, wenn sich Feature-Werte ändern, ohne dass der Quelltext hier es zeigt
+# (z.B. geändertes Verhalten einer numpy-Funktion) -> alle Feature-Keys neu
+FEATURE_VERSION = 1
+
+
+# =======================
+# FEATURE-FUNKTIONEN (numpy, pro Fenster exakt)
+# =======================
+# Jeder Wert hängt nur von seinem eigenen Fenster ab (keine laufenden Summen)
+# -> Tail-Neuberechnung liefert bitgleich dasselbe wie eine Vollberechnung.
+def _pct(p: np.ndarray, k: int) -> np.ndarray:
+    out = np.full(len(p), np.nan)
+    if len(p) > k:
+        out[k:] = p[k:] / p[:-k] - 1
+    return out
+
+
+def _rolling(x: np.ndarray, n: int, reduce) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if len(x) >= n:
+        out[n - 1:] = reduce(sliding_window_view(x, n))
+    return out
+
+
+def _ma(n: int):
+    return lambda p: _rolling(p, n, lambda w: w.mean(axis=1))
+
+
+def _ma_ratio(p):
+    return _rolling(p, 10, lambda w: w.mean(axis=1)) / _rolling(p, 50, lambda w: w.mean(axis=1)) - 1
+
+
+def _vol_10(p):
+    return _rolling(_pct(p, 1), 10, lambda w: w.std(axis=1, ddof=1))
+
+
+def _log_ret(p):
+    out = np.full(len(p), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = np.diff(np.log(p))
+    return out
+
+
+def _source(fn) -> str:
+    try:
+        return inspect.getsource(fn)
+    except (OSError, TypeError):
+        return getattr(fn, "__qualname__", repr(fn))
+
+
+# Gemeinsame Helfer gehen in jeden Feature-Key ein (Lambdas in FEATURES rufen sie nur auf)
+_HELPER_SOURCE = "".join(_source(f) for f in (_pct, _rolling, _ma, _ma_ratio, _vol_10, _log_ret))
+
+
+@dataclass(frozen=True)
+class FeatureDef:
+    """
+    key = Hash aus Name, lookback, FEATURE_VERSION, Quelltext von fn und der gemeinsamen
+    Helfer (_pct, _rolling, _ma, ...). Änderung an einem davon invalidiert den Cache;
+    andere Abhängigkeiten von fn nur über FEATURE_VERSION.
+    """
+
+    name: str
+    fn: Callable[[np.ndarray], np.ndarray]      # Close (float64) -> Werte gleicher Länge
+    lookback: int                               # Wert[i] hängt nur von close[i - lookback + 1 : i + 1] ab
+    key: str = field(init=False)
+
+    def __post_init__(self):
+        # Definition = Name + Fenster + Version + Quelltext (fn + Helfer) -> Codeänderung invalidiert den Cache
+        src = f"{self.name}|{self.lookback}|{FEATURE_VERSION}|{_source(self.fn)}|{_HELPER_SOURCE}"
+        digest = hashlib.sha1(src.encode()).hexdigest()[:12]
+        object.__setattr__(self, "key", digest)
+
+    def __call__(self, close):
+        """Wie die alten pandas-Features: Series rein, Series raus (Arrays gehen auch)."""
+        values = self.fn(np.asarray(close, dtype=float).reshape(-1))
+        if hasattr(close, "index"):
+            return type(close)(values, index=close.index, name=self.name)
+        return values
+
+
+FEATURES: Dict[str, FeatureDef] = {
+    f.name: f for f in (
+        FeatureDef("ret_1", lambda p: _pct(p, 1), 2),
+        FeatureDef("ret_5", lambda p: _pct(p, 5), 6),
+        FeatureDef("ret_20", lambda p: _pct(p, 20), 21),
+        FeatureDef("ma_10", _ma(10), 10),
+        FeatureDef("ma_50", _ma(50), 50),
+        FeatureDef("ma_ratio", _ma_ratio, 50),
+        FeatureDef("vol_10", _vol_10, 11),
+        FeatureDef("log_ret", _log_ret, 2),
+    )
+}
+
+
+# =======================
+# STORE
+# =======================
+def _timestamps(index, n: int) -> np.ndarray:
+    if index is None:
+        return np.arange(n, dtype=np.int64)
+    values = np.asarray(index)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").view(np.int64)
+    return values.astype(np.int64)
+
+
+def _data_key(ts: np.ndarray, close: np.ndarray) -> str:
+    h = hashlib.sha1(ts.tobytes())
+    h.update(close.tobytes())
+    return h.hexdigest()[:20]
+
+
+def _save(path: str, save, obj) -> None:
+    # atomar, auch wenn mehrere Backtest-Prozesse denselben Key schreiben
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        save(f, obj)
+    os.replace(tmp, path)
+
+
+class FeatureStore:
+    """
+    Features einmal rechnen, auf Platte halten, an Backtests / Modelle ausliefern.
+
+    Key = Hash der Eingangsdaten (Timestamps + Close) + Hash der Feature-Definition.
+    Ist die Eingabe eine Verlängerung (oder ein revidierter Tail) einer gespeicherten
+    Serie, wird nur ab der ersten Abweichung minus lookback neu gerechnet.
+
+    Layout:
+        <dir>/data/<ts0>_<n>_<datakey>.npz         Timestamps + Close der Serie
+        <dir>/<feature>-<defkey>/<datakey>.npy     Feature-Werte
+    """
+
+    def __init__(
+        self,
+        directory: str = FEATURE_DIR,
+        *,
+        persist: bool = True,
+        max_memory: int = 256,
+        keep_versions: int = 3,
+    ):
+        self.directory = directory
+        self.persist = persist
+        self.max_memory = max_memory
+        self.keep_versions = keep_versions      # gespeicherte Stände pro Serie (Rest wird gelöscht)
+        self._memory: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+
+    # ---------- PFADE ----------
+    def _data_path(self, ts: np.ndarray, dkey: str) -> str:
+        ts0 = int(ts[0]) if len(ts) else 0
+        return os.path.join(self.directory, "data", f"{ts0}_{len(ts)}_{dkey}.npz")
+
+    def _feature_path(self, feat: FeatureDef, dkey: str) -> str:
+        return os.path.join(self.directory, f"{feat.name}-{feat.key}", f"{dkey}.npy")
+
+    # ---------- MEMORY (LRU) ----------
+    def _remember(self, key, values: np.ndarray) -> None:
+        self._memory[key] = values
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    # ---------- BASIS FÜR INKREMENTELL ----------
+    def _base(self, ts: np.ndarray, close: np.ndarray, dkey: str):
+        """Gespeicherte Serie mit gleichem Start und längstem gemeinsamen Prefix -> (datakey, prefix_len)."""
+        if not self.persist or not len(ts):
+            return None, 0
+        best, best_m = None, 0
+        for path in glob.glob(os.path.join(self.directory, "data", f"{int(ts[0])}_*.npz")):
+            key = os.path.basename(path)[:-4].split("_")[-1]
+            if key == dkey:
+                continue
+            try:
+                with np.load(path) as z:
+                    old_ts, old_close = z["ts"], z["close"]
+            except (OSError, ValueError, KeyError):
+                continue
+            n = min(len(old_ts), len(ts))
+            diff = (old_ts[:n] != ts[:n]) | (old_close[:n] != close[:n])
+            m = int(np.argmax(diff)) if diff.any() else n
+            if m > best_m:
+                best, best_m = key, m
+        return best, best_m
+
+    # ---------- API ----------
+    def get(self, close, names: Iterable[str], index=None) -> Dict[str, np.ndarray]:
+        """Feature-Arrays (Länge = len(close)) für die gewünschten Namen."""
+        if index is None and hasattr(close, "index"):
+            index = close.index
+        close = np.ascontiguousarray(close, dtype=np.float64).reshape(-1)
+        ts = _timestamps(index, len(close))
+        dkey = _data_key(ts, close)
+
+        out: Dict[str, np.ndarray] = {}
+        missing = []
+        for name in names:
+            if name not in FEATURES:
+                raise KeyError(f"Unknown feature: {name}")
+            feat = FEATURES[name]
+            mem_key = (feat.key, dkey)
+            if mem_key in self._memory:
+                out[name] = self._memory[mem_key]
+                METRICS.incr("feature_hits")
+                continue
+            path = self._feature_path(feat, dkey)
+            if self.persist and os.path.exists(path):
+                try:
+                    out[name] = np.load(path)
+                    self._remember(mem_key, out[name])
+                    METRICS.incr("feature_hits")
+                    continue
+                except (OSError, ValueError):
+                    pass
+            missing.append(feat)
+
+        if not missing:
+            return out
+
+        base_key, m = self._base(ts, close, dkey)
+
+        for feat in missing:
+            values = None
+            if base_key is not None and m >= feat.lookback:
+                try:
+                    old = np.load(self._feature_path(feat, base_key))
+                except (OSError, ValueError):
+                    old = None
+                if old is not None:
+                    # nur ab der ersten Abweichung neu (Fenster reicht lookback - 1 Bars zurück)
+                    tail = feat.fn(close[m - feat.lookback + 1:])[feat.lookback - 1:]
+                    values = np.concatenate((old[:m], tail))
+                    METRICS.incr("feature_incremental")
+            if values is None:
+                values = feat.fn(close)
+                METRICS.incr("feature_computed")
+
+            values.setflags(write=False)
+            out[feat.name] = values
+            self._remember((feat.key, dkey), values)
+            if self.persist:
+                path = self._feature_path(feat, dkey)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                _save(path, np.save, values)
+
+        if self.persist:
+            data_path = self._data_path(ts, dkey)
+            if not os.path.exists(data_path):
+                os.makedirs(os.path.dirname(data_path), exist_ok=True)
+                _save(data_path, lambda f, d: np.savez(f, **d), {"ts": ts, "close": close})
+                # überholte Vorgänger derselben Serie aufräumen
+                self.prune(keep=self.keep_versions, ts0=int(ts[0]) if len(ts) else 0)
+
+        return out
+
+    def frame(self, close, names: Iterable[str]):
+        """Features als DataFrame mit dem Index der Close-Series."""
+        import pandas as pd
+
+        names = list(names)
+        values = self.get(close, names, index=getattr(close, "index", None))
+        return pd.DataFrame({n: values[n] for n in names}, index=getattr(close, "index", None))
+
+    def prune(self, keep: int = 2, ts0: Optional[int] = None) -> int:
+        """Pro Serienstart (ts0) nur die `keep` längsten Serien behalten; liefert Anzahl gelöschter Serien."""
+        groups: Dict[str, list] = {}
+        pattern = "*.npz" if ts0 is None else f"{ts0}_*.npz"
+        for path in glob.glob(os.path.join(self.directory, "data", pattern)):
+            ts0, n, key = os.path.basename(path)[:-4].split("_")
+            groups.setdefault(ts0, []).append((int(n), key, path))
+
+        removed = 0
+        for entries in groups.values():
+            for _, key, path in sorted(entries, reverse=True)[keep:]:
+                for f in [path] + glob.glob(os.path.join(self.directory, "*", f"{key}.npy")):
+                    try:
+                        os.remove(f)
+                    except FileNotFoundError:
+                        pass
+                removed += 1
+        if removed:
+            self._memory.clear()
+        return removed
+
+
+_stores: Dict[str, FeatureStore] = {}
+
+
+def get_feature_store(directory: Optional[str] = None) -> FeatureStore:
+    directory = directory or FEATURE_DIR
+    if directory not in _stores:
+        _stores[directory] = FeatureStore(directory)
+    return _stores[directory]
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import uuid
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+
+# Hive-partitioniertes Parquet-Dataset: forecast_history/date=YYYY-MM-DD/run-HHMMSS-<id>.parquet
+ARCHIVE_DIR = os.environ.get(
+    "FORECAST_ARCHIVE_DIR", os.path.join(os.path.dirname(__file__), "forecast_history")
+)
+
+# Ergebnis-Zeile aus forecast_assets + GuardResult + Run-Metadaten
+_FIELDS = [
+    ("run_id", "string"),
+    ("run_time_utc", "timestamp"),
+    ("git_sha", "string"),
+    ("host", "string"),
+    ("asset", "string"),
+    ("close", "float"),
+    ("score", "float"),
+    ("signal", "string"),
+    ("f_1_5", "float"),
+    ("f_2_3", "float"),
+    ("gpt_1_5d", "string"),
+    ("gpt_2_3w", "string"),
+    ("final", "string"),
+    ("zusatzinfo", "string"),
+    ("data_ok", "bool"),
+    ("last_bar_utc", "string"),
+    ("age_s", "float"),
+    ("age_h", "float"),
+    ("rows", "float"),
+    ("nan_last", "float"),
+    ("stale", "float"),
+    ("timeframe_s", "float"),
+    ("reason", "string"),
+    ("elapsed_s", "float"),
+]
+ARCHIVE_COLS = [name for name, _ in _FIELDS]
+
+
+def _arrow():
+    """pyarrow erst bei Bedarf laden (kostet spürbar Startzeit, der Forecast braucht es erst am Ende)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    return pa, pq
+
+
+def _schema():
+    pa, _ = _arrow()
+    types = {
+        "string": pa.string(),
+        "float": pa.float64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in _FIELDS])
+
+
+# =======================
+# WRITE (ein File pro Run)
+# =======================
+def append_run(
+    results: Iterable[dict],
+    *,
+    run_time: Optional[datetime] = None,
+    meta: Optional[dict] = None,
+    directory: str = ARCHIVE_DIR,
+) -> Optional[str]:
+    """
+    Ergebnis-Zeilen eines Runs als neue Parquet-Datei in die Tagespartition schreiben.
+    meta (z.B. Stage-Timings) landet als JSON in den Parquet-Metadaten.
+    Liefert den Dateipfad, ohne pyarrow None.
+    """
+    try:
+        pa, pq = _arrow()
+    except ImportError:     # Archiv ist optional, der Forecast läuft auch ohne
+        print("[SKIP] forecast_archive: pyarrow nicht installiert")
+        return None
+
+    run_time = run_time or datetime.now(timezone.utc)
+    if run_time.tzinfo is None:
+        run_time = run_time.replace(tzinfo=timezone.utc)
+    run_id = uuid.uuid4().hex[:12]
+
+    base = {
+        "run_id": run_id,
+        "run_time_utc": run_time,
+        "git_sha": os.environ.get("GITHUB_SHA", ""),
+        "host": platform.node(),
+    }
+
+    columns = {name: [] for name in ARCHIVE_COLS}
+    for r in results:
+        row = {**r, **base}
+        for name, kind in _FIELDS:
+            v = row.get(name)
+            if kind == "float":
+                try:
+                    v = float(v)
+                except (TypeError, ValueError):
+                    v = None
+            elif kind == "string" and v is not None:
+                v = str(v)
+            elif kind == "bool":
+                v = bool(v)
+            columns[name].append(v)
+
+    table = pa.table(columns, schema=_schema())
+    table = table.replace_schema_metadata({
+        "forecast_run": json.dumps({**base, "run_time_utc": run_time.isoformat(), **(meta or {})}, default=str),
+    })
+
+    part = os.path.join(directory, f"date={run_time:%Y-%m-%d}")
+    os.makedirs(part, exist_ok=True)
+    path = os.path.join(part, f"run-{run_time:%H%M%S}-{run_id}.parquet")
+
+    pq.write_table(table, path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+# =======================
+# QUERY
+# =======================
+def _partitions(directory: str, start=None, end=None) -> List[str]:
+    """Parquet-Files der Tagespartitionen in [start, end] (Pruning über den Verzeichnisnamen)."""
+    if not os.path.isdir(directory):
+        return []
+    lo = pd.Timestamp(start).strftime("%Y-%m-%d") if start is not None else None
+    hi = pd.Timestamp(end).strftime("%Y-%m-%d") if end is not None else None
+
+    files = []
+    for name in sorted(os.listdir(directory)):
+        if not name.startswith("date="):
+            continue
+        day = name[5:]
+        if (lo and day < lo) or (hi and day > hi):
+            continue
+        part = os.path.join(directory, name)
+        files += [os.path.join(part, f) for f in sorted(os.listdir(part)) if f.endswith(".parquet")]
+    return files
+
+
+def read_archive(
+    start=None,
+    end=None,
+    *,
+    assets: Optional[Iterable[str]] = None,
+    columns: Optional[List[str]] = None,
+    directory: str = ARCHIVE_DIR,
+) -> pd.DataFrame:
+    """Alle archivierten Zeilen im Datumsbereich (inkl.), optional nur bestimmte Assets / Spalten."""
+    import pyarrow.dataset as ds
+
+    files = _partitions(directory, start, end)
+    if not files:
+        return pd.DataFrame(columns=["date"] + (columns or ARCHIVE_COLS))
+
+    dataset = ds.dataset(files, schema=_schema(), format="parquet")
+    flt = ds.field("asset").isin(list(assets)) if assets else None
+    cols = None
+    if columns:
+        cols = list(dict.fromkeys(["run_time_utc", *columns]))
+
+    df = dataset.to_table(columns=cols, filter=flt).to_pandas()
+    df.insert(0, "date", df["run_time_utc"].dt.tz_convert(None).dt.normalize())
+    df = df.sort_values(["run_time_utc", "asset"] if "asset" in df else "run_time_utc", kind="stable")
+    return df.reset_index(drop=True)
+
+
+def scores(asset: str, start=None, end=None, *, last_per_day: bool = True, directory: str = ARCHIVE_DIR) -> pd.Series:
+    """Score-Verlauf eines Assets; last_per_day=True -> letzter Run je Tag, Index = Datum."""
+    df = read_archive(start, end, assets=[asset], columns=["asset", "score"], directory=directory)
+    if last_per_day:
+        df = df.groupby("date", sort=True).tail(1)
+        return pd.Series(df["score"].to_numpy(), index=pd.DatetimeIndex(df["date"], name="date"), name=asset)
+    return pd.Series(df["score"].to_numpy(), index=pd.DatetimeIndex(df["run_time_utc"], name="run_time_utc"), name=asset)
+
+
+def signal_flips(
+    asset: Optional[str] = None,
+    start=None,
+    end=None,
+    *,
+    column: str = "final",
+    directory: str = ARCHIVE_DIR,
+) -> pd.DataFrame:
+    """
+    Runs, in denen sich `column` (Default: FINAL) gegenüber dem vorherigen Run desselben Assets ändert.
+    Spalten: date, run_time_utc, asset, previous, current, score.
+    """
+    df = read_archive(
+        start, end,
+        assets=[asset] if asset else None,
+        columns=["asset", "score", column],
+        directory=directory,
+    )
+    if df.empty:
+        return pd.DataFrame(columns=["date", "run_time_utc", "asset", "previous", "current", "score"])
+
+    prev = df.groupby("asset", sort=False)[column].shift()
+    flips = df[prev.notna() & (df[column] != prev)]
+    return pd.DataFrame({
+        "date": flips["date"],
+        "run_time_utc": flips["run_time_utc"],
+        "asset": flips["asset"],
+        "previous": prev[flips.index],
+        "current": flips[column],
+        "score": flips["score"],
+    }).reset_index(drop=True)
+
+
+def run_meta(path: str) -> dict:
+    """Run-Metadaten (JSON aus den Parquet-Metadaten) einer Archivdatei."""
+    _, pq = _arrow()
+    raw = pq.read_schema(path).metadata or {}
+    return json.loads(raw.get(b"forecast_run", b"{}"))
@@ -1,10 +1,14 @@
-import yfinance as yf
-import pandas as pd
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
+import data_provider
+from data_provider import load_history
 from model_core import model_score
 from forecast_utils import forecast_trend
 from decision_engine import decide
 from signal_guard import guard_dataframe
+from run_metrics import METRICS
+from price_series import PriceSeries
 
 
 ASSETS = [
@@ -14,26 +18,27 @@ ASSETS = [
     ("COPPER", "HG=F", "STRONG_SUPPORT"),
 ]
 
+# Fenster für Score / Trend / Guard (ROWS im Output)
+FORECAST_PERIOD = "6mo"
 
-def _normalize_yfinance_df(df: pd.DataFrame) -> pd.DataFrame:
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-    return df
+# Parallelität / Deadline pro Asset in run_all
+MAX_WORKERS = 4
+ASSET_TIMEOUT_S = 60.0
 
 
-def _last_scalar(df, col):
-    v = df[col].iloc[-1]
-    if isinstance(v, pd.Series):
-        v = v.dropna().iloc[0] if not v.dropna().empty else v.iloc[0]
-    return float(v)
+def forecast_asset(asset, ticker, macro_bias, df=None):
 
+    # df: bereits geladene Historie (Batch-Fetch aus main) -> kein eigener Download
+    if df is None:
+        with METRICS.span("download", asset):
+            df = load_history(ticker, period=FORECAST_PERIOD)
 
-def forecast_asset(asset, ticker, macro_bias):
+    # einmal in Arrays umwandeln; Guard / Score / Trends arbeiten auf Views
+    prices = df if isinstance(df, PriceSeries) else PriceSeries.from_frame(df, ticker)
+    prices = prices.slice_period(FORECAST_PERIOD)
 
-    df = yf.download(ticker, period="6mo", interval="1d", progress=False)
-    df = _normalize_yfinance_df(df)
-
-    guard = guard_dataframe(asset, df)
+    with METRICS.span("guard", asset):
+        guard = guard_dataframe(asset, prices)
 
     if not guard.data_ok:
         return {
@@ -50,19 +55,21 @@ def forecast_asset(asset, ticker, macro_bias):
             **guard.to_dict()
         }
 
-    close = round(_last_scalar(df, "Close"), 1)
+    close = round(prices.last_value("Close"), 1)
 
-    score = model_score(df)
-    f_1_5 = forecast_trend(df, days=5)
-    f_2_3 = forecast_trend(df, days=15)
+    with METRICS.span("score", asset):
+        score = model_score(prices)
+        f_1_5 = forecast_trend(prices, days=5)
+        f_2_3 = forecast_trend(prices, days=15)
 
-    decision = decide(
-        asset=asset,
-        score=score,
-        signal_1_5d=f_1_5,
-        signal_2_3w=f_2_3,
-        macro_bias=macro_bias
-    )
+    with METRICS.span("decision", asset):
+        decision = decide(
+            asset=asset,
+            score=score,
+            signal_1_5d=f_1_5,
+            signal_2_3w=f_2_3,
+            macro_bias=macro_bias
+        )
 
     return {
         "asset": asset,
@@ -79,23 +86,102 @@ def forecast_asset(asset, ticker, macro_bias):
     }
 
 
-def run_all():
-    results = []
-    for asset, ticker, macro_bias in ASSETS:
-        try:
-            results.append(forecast_asset(asset, ticker, macro_bias))
-        except Exception as e:
-            results.append({
-                "asset": asset,
-                "close": None,
-                "score": 0.0,
-                "signal": "NO_TRADE",
-                "f_1_5": 0.0,
-                "f_2_3": 0.0,
-                "gpt_1_5d": "NA",
-                "gpt_2_3w": "NA",
-                "final": "NO_TRADE(ERROR)",
-                "zusatzinfo": str(e),
-                "data_ok": False
-            })
+def _error_row(asset, final, info):
+    return {
+        "asset": asset,
+        "close": None,
+        "score": 0.0,
+        "signal": "NO_TRADE",
+        "f_1_5": 0.0,
+        "f_2_3": 0.0,
+        "gpt_1_5d": "NA",
+        "gpt_2_3w": "NA",
+        "final": final,
+        "zusatzinfo": info,
+        "data_ok": False
+    }
+
+
+def _timed_forecast(asset, ticker, macro_bias, df):
+    t0 = time.perf_counter()
+    try:
+        row = forecast_asset(asset, ticker, macro_bias, df=df)
+    except Exception as e:
+        row = _error_row(asset, "NO_TRADE(ERROR)", str(e))
+    row["elapsed_s"] = round(time.perf_counter() - t0, 3)
+    return row
+
+
+def run_all(frames=None, *, max_workers=MAX_WORKERS, timeout_s=ASSET_TIMEOUT_S):
+    """
+    Forecast aller ASSETS in einem begrenzten Thread-Pool.
+
+    frames:      optional {ticker: DataFrame} aus einem gemeinsamen Batch-Fetch
+    max_workers: max. parallel laufende Assets
+    timeout_s:   Deadline pro Asset ab Datenverfügbarkeit (None = unbegrenzt); überschritten -> NO_TRADE(TIMEOUT)
+
+    Fehlt ein Frame, lädt der Job selbst; die Netzwerk-Deadline liegt dann auf dem Fetch
+    (data_provider.FETCH_TIMEOUT_S, gezählt ab Erwerb des Download-Locks) -> NO_TRADE(TIMEOUT).
+
+    Reihenfolge der Ergebnisse = Reihenfolge in ASSETS (deterministisch für forecast_writer),
+    jede Zeile enthält elapsed_s.
+    """
+    n = len(ASSETS)
+    results = [None] * n
+    started = {}
+
+    def _job(i, asset, ticker, macro_bias):
+        df = frames.get(ticker) if frames is not None else None
+        if df is None:
+            t0 = time.perf_counter()
+            try:
+                with METRICS.span("download", asset):
+                    df = load_history(ticker, period=FORECAST_PERIOD)
+            except TimeoutError as e:
+                row = _error_row(asset, "NO_TRADE(TIMEOUT)", str(e))
+                row["elapsed_s"] = round(time.perf_counter() - t0, 3)
+                return row
+            except Exception as e:
+                row = _error_row(asset, "NO_TRADE(ERROR)", str(e))
+                row["elapsed_s"] = round(time.perf_counter() - t0, 3)
+                return row
+        # Uhr erst ab hier: Warten auf Download-Lock / Netzwerk zählt nicht gegen timeout_s
+        started[i] = time.perf_counter()
+        return _timed_forecast(asset, ticker, macro_bias, df)
+
+    workers = max(1, min(int(max_workers or 1), n or 1))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="forecast")
+    futures = {pool.submit(_job, i, *spec): i for i, spec in enumerate(ASSETS)}
+
+    # harte Obergrenze, falls hängende Assets alle Worker blockieren und der Rest nie startet
+    t_run = time.perf_counter()
+    # (ohne frames kommen die seriellen Downloads hinzu, jeder durch FETCH_TIMEOUT_S begrenzt)
+    missing = sum(1 for _, ticker, _ in ASSETS if frames is None or frames.get(ticker) is None)
+    fetch_budget = data_provider.FETCH_TIMEOUT_S * missing
+    hard_deadline = None if timeout_s is None else t_run + timeout_s * -(-n // workers) + fetch_budget
+
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            for fut in done:
+                results[futures[fut]] = fut.result()
+
+            if timeout_s is None:
+                continue
+
+            now = time.perf_counter()
+            for fut in list(pending):
+                i = futures[fut]
+                t0 = started.get(i)
+                if (t0 is not None and now - t0 > timeout_s) or now > hard_deadline:
+                    fut.cancel()
+                    pending.discard(fut)
+                    row = _error_row(ASSETS[i][0], "NO_TRADE(TIMEOUT)", f"Timeout nach {timeout_s}s")
+                    row["elapsed_s"] = round(now - (t0 if t0 is not None else t_run), 3)
+                    results[i] = row
+    finally:
+        # hängende Worker nicht abwarten
+        pool.shutdown(wait=False, cancel_futures=True)
+
     return results
@@ -0,0 +1,382 @@
+"""
+Forecast als warmer Dienst statt Cron-Kaltstart:
+
+    python cli.py serve [--port 8765] [--socket /tmp/forecast.sock] [--interval 300]
+
+Historien, Features, run_all-Ergebnisse, Regime und Stats bleiben im Speicher;
+neu gerechnet wird nur, wenn ein Ticker einen neuen (oder geänderten) letzten Bar hat.
+Abfragen (JSON, GET):
+
+    /health   /forecast[?asset=GOLD]   /guard   /stats[?horizon=5]   /regime
+    /features?ticker=GC=F[&names=ret_1,vol_10]
+
+Neu laden nur per POST (GET -> 405):
+
+    /refresh[?force=1]
+
+    curl -s localhost:8765/forecast
+    curl -s --unix-socket /tmp/forecast.sock http://x/guard
+    curl -s -X POST localhost:8765/refresh
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import socketserver
+import stat
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from data_provider import load_many
+from feature_store import FEATURES, get_feature_store
+from forecast_assets import ASSETS, FORECAST_PERIOD, run_all
+from price_series import PriceSeries
+from regime_engine import compute_regime
+from run_metrics import METRICS
+from signal_guard import guard_dataframe
+from trade_tracker import DEFAULT_HORIZON, HORIZONS, compute_stats, evaluate_open_trades, record_signals
+
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = int(os.environ.get("FORECAST_SERVICE_PORT", "8765"))
+
+# Sekunden zwischen zwei Prüfungen auf neue Bars (Store-Lesen, Netz nur nach max_age_s des Providers)
+REFRESH_INTERVAL_S = 300
+
+# Historie im Speicher (wie main.RUN_PERIOD: Forecast + Trade-Auswertung + Regime)
+SERVICE_PERIOD = "2y"
+
+_TICKERS = {asset: ticker for asset, ticker, _ in ASSETS}
+
+
+def _json_default(obj):
+    if hasattr(obj, "item"):            # numpy-Skalare
+        return obj.item()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _clean(obj):
+    # NaN / inf sind kein gültiges JSON
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    if isinstance(obj, dict):
+        return {k: _clean(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_clean(v) for v in obj]
+    return obj
+
+
+def dumps(obj) -> bytes:
+    return json.dumps(_clean(obj), default=_json_default, ensure_ascii=False).encode("utf-8")
+
+
+def _fingerprint(df) -> Tuple:
+    # letzter Bar (Zeit + Close) + Länge; intraday revidierter Bar zählt als neu
+    if df is None or df.empty or "Close" not in df.columns:
+        return ()
+    close = df["Close"]
+    if hasattr(close, "columns"):
+        close = close.iloc[:, 0]
+    return (len(df), str(df.index[-1]), float(close.iloc[-1]))
+
+
+# =======================
+# ZUSTAND
+# =======================
+class ForecastService:
+    """
+    Hält die Daten eines Runs warm. refresh() lädt über den DataProvider (Store + Delta-Fetch)
+    und rechnet Forecast / Regime / Stats nur bei geändertem letzten Bar eines Tickers neu.
+    Antworten werden pro Refresh einmal serialisiert (Lesen = Lookup unter Lock).
+    """
+
+    def __init__(self, *, period: str = SERVICE_PERIOD, record: bool = False):
+        self.period = period
+        self.record = record                    # Signale loggen + offene Trades auswerten (wie main)
+        self.started = time.time()
+        self.frames: Dict[str, object] = {}
+        self.prices: Dict[str, PriceSeries] = {}
+        self.results: list = []
+        self.regime: dict = {}
+        self.stats: dict = {}
+        self.refreshed_at: Optional[float] = None
+        self.computed_at: Optional[float] = None
+        self.refreshes = 0
+        self.recomputes = 0
+        self.last_error = ""
+        self._fingerprints: Dict[str, Tuple] = {}
+        self._payloads: Dict[str, bytes] = {}
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._features = get_feature_store()
+
+    # ---------- REFRESH ----------
+    def refresh(self, force: bool = False) -> bool:
+        """Neue Bars holen; True, wenn neu gerechnet wurde."""
+        with self._refresh_lock:
+            METRICS.reset()
+            try:
+                with METRICS.span("download"):
+                    frames = load_many(_TICKERS.values(), period=self.period)
+            except Exception as e:
+                self.last_error = f"download: {e}"
+                return False
+
+            fingerprints = {t: _fingerprint(df) for t, df in frames.items()}
+            self.refreshed_at = time.time()
+            self.refreshes += 1
+            if not force and fingerprints == self._fingerprints and self.results:
+                return False
+
+            try:
+                self._recompute(frames)
+            except Exception as e:
+                self.last_error = f"recompute: {e}"
+                return False
+
+            self._fingerprints = fingerprints
+            self.last_error = ""
+            return True
+
+    def _recompute(self, frames) -> None:
+        prices = {
+            t: PriceSeries.from_frame(df, t)
+            for t, df in frames.items()
+            if df is not None and not df.empty
+        }
+
+        with METRICS.span("forecast"):
+            results = run_all(prices)
+
+        with METRICS.span("regime"):
+            regime = compute_regime(frames)
+
+        with METRICS.span("features"):
+            names = list(FEATURES)
+            for t, ps in prices.items():
+                self._features.get(ps.close, names, index=ps.index)
+
+        if self.record:
+            with METRICS.span("record_signals"):
+                record_signals(results, _TICKERS)
+            with METRICS.span("evaluate_trades"):
+                stats = evaluate_open_trades(
+                    _TICKERS, horizon_days=DEFAULT_HORIZON, market_data=frames, horizons=HORIZONS,
+                )
+        else:
+            with METRICS.span("stats"):
+                stats = compute_stats(DEFAULT_HORIZON)
+
+        payloads = {
+            "/forecast": dumps({"results": results}),
+            "/regime": dumps(regime),
+            "/stats": dumps(stats),
+        }
+        for r in results:
+            payloads[f"/forecast/{r.get('asset')}"] = dumps(r)
+
+        with self._lock:
+            self.frames, self.prices = frames, prices
+            self.results, self.regime, self.stats = results, regime, stats
+            self._payloads = payloads
+            self.computed_at = time.time()
+            self.recomputes += 1
+
+    def run_forever(self, interval: float = REFRESH_INTERVAL_S, stop: Optional[threading.Event] = None) -> None:
+        stop = stop or threading.Event()
+        while not stop.wait(interval):
+            self.refresh()
+
+    # ---------- ABFRAGEN ----------
+    def payload(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._payloads.get(key)
+
+    def guard_status(self) -> list:
+        """Guard live gegen die aktuelle Uhr (Alter / Stale ändern sich auch ohne neuen Bar)."""
+        with self._lock:
+            prices = dict(self.prices)
+        out = []
+        for asset, ticker in _TICKERS.items():
+            ps = prices.get(ticker)
+            if ps is None:
+                out.append({"asset": asset, "data_ok": False, "reason": "keine Daten"})
+                continue
+            out.append(guard_dataframe(asset, ps.slice_period(FORECAST_PERIOD)).to_dict())
+        return out
+
+    def stats_for(self, horizon: Optional[int]) -> dict:
+        if horizon is None or horizon == self.stats.get("horizon_days"):
+            return self.stats
+        return compute_stats(horizon)
+
+    def features(self, ticker: str, names=None) -> dict:
+        with self._lock:
+            ps = self.prices.get(ticker)
+        if ps is None:
+            raise KeyError(f"Unknown ticker: {ticker}")
+        names = list(names or FEATURES)
+        values = self._features.get(ps.close, names, index=ps.index)
+        return {
+            "ticker": ticker,
+            "last_bar": str(ps.index[-1]) if len(ps) else None,
+            "features": {n: float(values[n][-1]) if len(ps) else None for n in names},
+        }
+
+    def health(self) -> dict:
+        def _utc(ts):
+            return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d %H:%M:%S") if ts else None
+
+        # run_all liefert auch ohne Daten eine NO_TRADE-Zeile pro Asset -> ok nur mit geladenen Bars
+        with_data = sum(bool(fp) for fp in self._fingerprints.values())
+        return {
+            "ok": with_data > 0 and not self.last_error,
+            "tickers_with_data": with_data,
+            "assets_data_ok": sum(bool(r.get("data_ok")) for r in self.results),
+            "uptime_s": round(time.time() - self.started, 1),
+            "refreshed_utc": _utc(self.refreshed_at),
+            "computed_utc": _utc(self.computed_at),
+            "refreshes": self.refreshes,
+            "recomputes": self.recomputes,
+            "last_bars": {t: fp[1] for t, fp in self._fingerprints.items() if fp},
+            "error": self.last_error,
+            "pid": os.getpid(),
+        }
+
+
+# =======================
+# HTTP (TCP oder Unix-Socket)
+# =======================
+class _Handler(BaseHTTPRequestHandler):
+    service: ForecastService = None
+    quiet = True
+
+    def _send(self, body: bytes, status: int = 200, headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self):
+        url = urlparse(self.path)
+        path = url.path.rstrip("/") or "/health"
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        return path, query
+
+    def _not_allowed(self, allow: str):
+        return self._send(dumps({"error": f"method not allowed: {self.command}"}), 405, {"Allow": allow})
+
+    def do_GET(self):
+        path, query = self._route()
+        svc = self.service
+
+        try:
+            if path == "/health":
+                return self._send(dumps(svc.health()))
+            if path == "/refresh":
+                # Zustandsänderung (Download + Neurechnung) nicht per GET
+                return self._not_allowed("POST")
+            if path == "/guard":
+                return self._send(dumps({"guard": svc.guard_status()}))
+            if path == "/stats" and "horizon" in query:
+                return self._send(dumps(svc.stats_for(int(query["horizon"]))))
+            if path == "/features":
+                names = query["names"].split(",") if query.get("names") else None
+                return self._send(dumps(svc.features(query.get("ticker", ""), names)))
+
+            key = path
+            if path == "/forecast" and query.get("asset"):
+                key = f"/forecast/{query['asset'].upper()}"
+            body = svc.payload(key)
+            if body is None:
+                return self._send(dumps({"error": f"not found: {key}"}), 404)
+            return self._send(body)
+        except (KeyError, ValueError) as e:
+            return self._send(dumps({"error": str(e)}), 400)
+        except Exception as e:
+            return self._send(dumps({"error": str(e)}), 500)
+
+    def do_POST(self):
+        path, query = self._route()
+        if path != "/refresh":
+            return self._not_allowed("GET")
+        # Body wird nicht gebraucht, aber gelesen (Keep-Alive)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        try:
+            svc = self.service
+            changed = svc.refresh(force=query.get("force") in ("1", "true", "yes"))
+            return self._send(dumps({"recomputed": changed, **svc.health()}))
+        except Exception as e:
+            return self._send(dumps({"error": str(e)}), 500)
+
+    def address_string(self):
+        # Unix-Socket: client_address ist "" statt (host, port)
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, fmt, *args):
+        if not self.quiet:
+            super().log_message(fmt, *args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _remove_socket(path: str) -> None:
+    """Alten Unix-Socket entfernen; alles andere unter dem Pfad bleibt stehen (-> Fehler)."""
+    if not os.path.lexists(path):
+        return
+    if not stat.S_ISSOCK(os.lstat(path).st_mode):
+        raise FileExistsError(f"{path} existiert und ist kein Unix-Socket")
+    os.remove(path)
+
+
+def make_server(service: ForecastService, *, host: str = SERVICE_HOST, port: int = SERVICE_PORT,
+                socket_path: Optional[str] = None, quiet: bool = True):
+    """HTTP-Server (localhost-TCP oder Unix-Socket) für service; noch nicht gestartet."""
+    handler = type("ForecastHandler", (_Handler,), {"service": service, "quiet": quiet})
+    if socket_path:
+        _remove_socket(socket_path)
+        server = _UnixHTTPServer(socket_path, handler)
+        os.chmod(socket_path, 0o600)
+        return server
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(*, host: str = SERVICE_HOST, port: int = SERVICE_PORT, socket_path: Optional[str] = None,
+          interval: float = REFRESH_INTERVAL_S, record: bool = False, quiet: bool = True) -> None:
+    service = ForecastService(record=record)
+    t0 = time.perf_counter()
+    service.refresh(force=True)
+    print(f"[OK] warm in {time.perf_counter() - t0:.2f}s ({len(service.results)} assets)"
+          + (f" | {service.last_error}" if service.last_error else ""))
+
+    stop = threading.Event()
+    threading.Thread(target=service.run_forever, args=(interval, stop), daemon=True, name="refresh").start()
+
+    server = make_server(service, host=host, port=port, socket_path=socket_path, quiet=quiet)
+    where = socket_path or f"http://{host}:{port}"
+    print(f"[START] forecast service on {where} (refresh every {interval:.0f}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        if socket_path:
+            _remove_socket(socket_path)
@@ -1,7 +1,14 @@
 import pandas as pd
 
+from price_series import PriceSeries
+
 
 def forecast_trend(df, days=5) -> float:
+    if isinstance(df, PriceSeries):
+        last = float(df.close[-1])
+        past = float(df.close[-days])
+        return round((last - past) / past, 4)
+
     close = df["Close"]
 
     # Robust gegen Series ODER DataFrame
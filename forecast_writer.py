@@ -2,11 +2,60 @@ import os
 from datetime import datetime
 
 OUTPUT_FILE = os.path.join(os.path.dirname(__file__), "forecast_output.txt")
+METRICS_FILE = os.path.join(os.path.dirname(__file__), "forecast_metrics.json")
 
 
-def write_daily_summary(results, stats=None):
+def _ci_text(s):
+    # 95%-Intervalle aus den laufenden Aggregaten (nur wenn vorhanden)
+    acc_ci, ret_ci = s.get("accuracy_ci"), s.get("return_ci")
+    if not acc_ci or not ret_ci:
+        return ""
+    return (
+        f" [{acc_ci[0]:.2f}-{acc_ci[1]:.2f}] | "
+        f"AvgRet={s.get('mean_return', 0.0):+.4f} [{ret_ci[0]:+.4f}..{ret_ci[1]:+.4f}]"
+    )
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+
+def _horizon_table(by_horizon):
+    # Accuracy (Trades) pro Horizont x Asset; eine Zeile pro Horizont
+    assets = sorted({a for h in by_horizon.values() for a in h.get("by_asset", {})})
+
+    def cell(s):
+        if not s or not s.get("trades"):
+            return f"{'-':>14}"
+        return f"{s['accuracy'] * 100:>6.1f}% ({s['trades']:>4})"
+
+    lines = ["ACCURACY BY HORIZON (Trading Days) – Accuracy (Trades)", "-" * 80]
+    lines.append(f"{'H':>3}  {'OVERALL':>14}  " + "  ".join(f"{a[:14]:>14}" for a in assets))
+    for h in sorted(by_horizon):
+        row = by_horizon[h]
+        lines.append(
+            f"{h:>3}  {cell(row.get('overall'))}  "
+            + "  ".join(cell(row.get("by_asset", {}).get(a)) for a in assets)
+        )
+    return "\n".join(lines) + "\n\n"
+
+
+def _regime_text(regime):
+    lines = [
+        f"MACRO REGIME: {regime.get('macro_regime')} | Confidence={regime.get('confidence')} | "
+        f"AvgCorr={regime.get('avg_corr')} | Bars={regime.get('bars')}",
+        "-" * 80,
+        regime.get("interpretation", ""),
+    ]
+    bull = regime.get("bull", {})
+    if bull:
+        lines.append("BULL: " + " | ".join(f"{k}={v}" for k, v in bull.items()))
+    for name, s in regime.get("assets", {}).items():
+        lines.append(
+            f"- {name}: Vol={s['vol']:.3f} ({s['vol_state']}, x{s['vol_ratio']:.2f}) | Trend z={s['trend_z']:+.2f}"
+        )
+    return "\n".join(lines) + "\n\n"
+
+
+def write_daily_summary(results, stats=None, output_file=None, metrics=None, regime=None):
+
+    with open(output_file or OUTPUT_FILE, "w", encoding="utf-8") as f:
 
         f.write(f"Run time (UTC): {datetime.utcnow():%Y-%m-%d %H:%M:%S}\n")
         f.write("=" * 170 + "\n")
@@ -25,7 +74,8 @@ def write_daily_summary(results, stats=None):
             data_ok = r.get("data_ok", False)
             final = r.get("final", "NO_TRADE")
 
-            if not data_ok:
+            # TIMEOUT / ERROR aus run_all bleiben sichtbar
+            if not data_ok and not str(final).startswith("NO_TRADE("):
                 final = "NO_TRADE(DATA)"
 
             f.write(
@@ -50,6 +100,12 @@ def write_daily_summary(results, stats=None):
 
         f.write("=" * 170 + "\n\n")
 
+        # ==========================================================
+        # MACRO REGIME (regime_engine)
+        # ==========================================================
+        if regime:
+            f.write(_regime_text(regime))
+
         # ==========================================================
         # PERFORMANCE / ACCURACY SECTION
         # ==========================================================
@@ -57,19 +113,40 @@ def write_daily_summary(results, stats=None):
             overall = stats.get("overall", {})
             by_asset = stats.get("by_asset", {})
 
-            f.write("SIGNAL ACCURACY (EVALUATED TRADES) – Horizon: 5 Trading Days\n")
+            horizon = stats.get("horizon_days")
+            horizon_text = f"{horizon} Trading Days" if horizon else "all horizons"
+            f.write(f"SIGNAL ACCURACY (EVALUATED TRADES) – Horizon: {horizon_text}\n")
             f.write("-" * 80 + "\n")
             f.write(
                 f"OVERALL: Trades={overall.get('trades',0)} | "
                 f"Correct={overall.get('correct',0)} | Wrong={overall.get('wrong',0)} | "
-                f"Accuracy={overall.get('accuracy',None)}\n"
+                f"Accuracy={overall.get('accuracy',None)}{_ci_text(overall)}\n"
             )
             f.write("\nBY ASSET:\n")
             for a, s in by_asset.items():
                 f.write(
                     f"- {a}: Trades={s.get('trades',0)} | Correct={s.get('correct',0)} | "
-                    f"Wrong={s.get('wrong',0)} | Accuracy={s.get('accuracy',None)}\n"
+                    f"Wrong={s.get('wrong',0)} | Accuracy={s.get('accuracy',None)}{_ci_text(s)}\n"
                 )
             f.write("\n")
 
+            by_horizon = stats.get("by_horizon") or {}
+            if by_horizon:
+                f.write(_horizon_table(by_horizon))
+
+        # ==========================================================
+        # RUN METRICS (Stage-Timings / Counter, Details im JSON)
+        # ==========================================================
+        if metrics is not None and metrics.enabled:
+            f.write("RUN METRICS\n")
+            f.write("-" * 80 + "\n")
+            f.write(metrics.summary_line() + "\n")
+            slow = sorted(
+                ((sum(st.values()), a) for a, st in metrics.by_asset().items()),
+                reverse=True,
+            )
+            if slow:
+                f.write("BY ASSET: " + " | ".join(f"{a}={sec:.2f}s" for sec, a in slow) + "\n")
+            f.write("\n")
+
         # (dein RULE-BLOCK kann danach bleiben, wenn du ihn weiter drin haben willst)
@@ -1,7 +1,11 @@
+from data_provider import load_many
+from forecast_archive import append_run
 from forecast_assets import run_all
-from forecast_writer import write_daily_summary
+from forecast_writer import METRICS_FILE, write_daily_summary
+from regime_engine import compute_regime
+from run_metrics import METRICS
 
-from trade_tracker import record_signals, evaluate_open_trades
+from trade_tracker import DEFAULT_HORIZON, HORIZONS, record_signals, evaluate_open_trades
 
 
 ASSET_TO_TICKER = {
@@ -11,18 +15,49 @@ ASSET_TO_TICKER = {
     "COPPER": "HG=F",
 }
 
+# breitestes Fenster des Runs (Trade-Auswertung); Forecast schneidet selbst auf 6mo zu
+RUN_PERIOD = "2y"
+
 
 def main():
-    results = run_all()
+    METRICS.reset()
+
+    # 0) alle Ticker einmal pro Run laden (ein Batch-Request) und überall weiterreichen
+    # (Batch gescheitert / Timeout -> jedes Asset lädt selbst, mit eigener Deadline)
+    with METRICS.span("download"):
+        try:
+            frames = load_many(ASSET_TO_TICKER.values(), period=RUN_PERIOD)
+        except Exception as e:
+            print(f"[WARN] Batch-Download fehlgeschlagen: {e}")
+            frames = {}
+
+    with METRICS.span("forecast"):
+        results = run_all(frames)
+
+    # Cross-Asset-Regime (EWMA-Korrelation / Vol-Zustände) aus denselben Frames
+    with METRICS.span("regime"):
+        regime = compute_regime(frames)
+
+    # 1) heutige handelbare Signale loggen (LONG/SHORT, nur DATA_OK), eine Zeile pro Signal
+    with METRICS.span("record_signals"):
+        record_signals(results, ASSET_TO_TICKER)
+
+    # 2) offene Trades auswerten (alle Horizonte in einem Durchgang, Headline 5 Tradingdays)
+    with METRICS.span("evaluate_trades"):
+        stats = evaluate_open_trades(
+            ASSET_TO_TICKER, horizon_days=DEFAULT_HORIZON, market_data=frames, horizons=HORIZONS,
+        )
 
-    # 1) heutige handelbare Signale loggen (LONG/SHORT, nur DATA_OK)
-    record_signals(results, ASSET_TO_TICKER)
+    # 3) Output schreiben inkl. Stats (+ Metrics-Footer / JSON)
+    with METRICS.span("write"):
+        write_daily_summary(results, stats, metrics=METRICS, regime=regime)
 
-    # 2) offene Trades auswerten (z.B. 5 Tradingdays später)
-    stats = evaluate_open_trades(ASSET_TO_TICKER, horizon_days=5)
+    # 4) Run-Zeilen ins Parquet-Archiv (forecast_history/date=.../)
+    with METRICS.span("archive"):
+        append_run(results, meta={"stages": METRICS.stage_totals(), "regime": regime["macro_regime"]})
 
-    # 3) Output schreiben inkl. Stats
-    write_daily_summary(results, stats)
+    if METRICS.enabled:
+        METRICS.write_json(METRICS_FILE)
 
 
 if __name__ == "__main__":
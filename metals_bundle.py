@@ -1,9 +1,9 @@
-import yfinance as yf
+from data_provider import load_history
 
 START_DATE = "2010-01-01"
 
 def _load(symbol):
-    df = yf.download(symbol, start=START_DATE, progress=False)
+    df = load_history(symbol, start=START_DATE)
     df = df[["Open", "High", "Low", "Close", "Volume"]].dropna()
     return df
 
@@ -1,18 +1,34 @@
+import math
+import sys
+from typing import Optional
+
 import numpy as np
-import pandas as pd
 
-def compute_score(prices) -> float:
-    """
-    SCORE V2 – fully robust, production safe
-    """
 
-    # ---------- INPUT NORMALIZATION ----------
-    if isinstance(prices, pd.DataFrame):
+# pandas / price_series werden hier nie selbst importiert: ist das Modul noch nicht geladen,
+# kann der Input auch kein Objekt daraus sein -> `import model_core` braucht nur numpy
+def _is_instance(obj, module: str, attr: str) -> bool:
+    cls = getattr(sys.modules.get(module), attr, None)
+    return cls is not None and isinstance(obj, cls)
+
+
+def _close_array(prices) -> np.ndarray:
+    """Close-Preise aus PriceSeries / DataFrame / Series / Array als 1D float Array."""
+
+    # bereits normalisiert -> nur View (float64) bzw. eine Konvertierung (float32)
+    if _is_instance(prices, "price_series", "PriceSeries"):
+        return np.asarray(prices.close, dtype=float)
+
+    pd = sys.modules.get("pandas")
+    if pd is None:
+        p = np.asarray(prices)
+
+    elif isinstance(prices, pd.DataFrame):
         # Case: MultiIndex columns (e.g. ('Close','GOLD'))
         if isinstance(prices.columns, pd.MultiIndex):
             close_cols = [c for c in prices.columns if c[0].lower() == "close"]
             if not close_cols:
-                return 0.50
+                return None
             p = prices[close_cols[0]].values
 
         # Case: normal DataFrame
@@ -29,35 +45,338 @@ def compute_score(prices) -> float:
         p = np.asarray(prices)
 
     # ---------- FORCE 1D FLOAT ARRAY ----------
-    p = np.asarray(p, dtype=float).reshape(-1)
+    return np.asarray(p, dtype=float).reshape(-1)
+
+
+# Standard-Parameter von SCORE V2 (Fenster, Gewichtung, tanh-Gains)
+SCORE_PARAMS = {
+    "long_window": 20,
+    "short_window": 5,
+    "blend": 0.65,
+    "gain_long": 0.8,
+    "gain_short": 1.2,
+}
+
+
+def compute_score(
+    prices,
+    long_window: Optional[int] = None,
+    short_window: Optional[int] = None,
+    blend: Optional[float] = None,
+    gain_long: Optional[float] = None,
+    gain_short: Optional[float] = None,
+) -> float:
+    """
+    SCORE V2 – fully robust, production safe
+
+    None = aktueller Wert aus SCORE_PARAMS (beim Aufruf gelesen, wie compute_score_series /
+    ScoreState / compute_score_matrix); explizite Werte für Grid-Search und getunte Backtests.
+    """
+    long_window = SCORE_PARAMS["long_window"] if long_window is None else long_window
+    short_window = SCORE_PARAMS["short_window"] if short_window is None else short_window
+    blend = SCORE_PARAMS["blend"] if blend is None else blend
+    gain_long = SCORE_PARAMS["gain_long"] if gain_long is None else gain_long
+    gain_short = SCORE_PARAMS["gain_short"] if gain_short is None else gain_short
+
+    # ---------- INPUT NORMALIZATION ----------
+    p = _close_array(prices)
+    if p is None:
+        return 0.50
 
     # ---------- SAFETY ----------
-    if len(p) < 30 or np.any(~np.isfinite(p)):
+    if len(p) < max(30, long_window + 1) or np.any(~np.isfinite(p)):
         return 0.50
 
     # ---------- RETURNS ----------
-    r_20 = (p[-1] - p[-21]) / p[-21]
-    r_5  = (p[-1] - p[-6])  / p[-6]
+    r_20 = (p[-1] - p[-long_window - 1]) / p[-long_window - 1]
+    r_5  = (p[-1] - p[-short_window - 1]) / p[-short_window - 1]
 
     # ---------- VOLATILITY ----------
-    rets = np.diff(np.log(p[-21:]))
+    rets = np.diff(np.log(p[-long_window - 1:]))
 
     vol = np.std(rets)
     if not np.isfinite(vol) or vol < 1e-6:
         return 0.50
 
     # ---------- NORMALIZED MOMENTUM ----------
-    m20 = r_20 / (vol * np.sqrt(20))
-    m5  = r_5  / (vol * np.sqrt(5))
+    m20 = r_20 / (vol * np.sqrt(long_window))
+    m5  = r_5  / (vol * np.sqrt(short_window))
 
     core = (
-        0.65 * np.tanh(m20 * 0.8) +
-        0.35 * np.tanh(m5  * 1.2)
+        blend * np.tanh(m20 * gain_long) +
+        (1 - blend) * np.tanh(m5 * gain_short)
     )
 
     score = 0.5 + core * 0.25
     return float(np.round(score, 3))
 
 
+def score_from_components(r_long, r_short, vol, long_window, short_window, blend, gain_long, gain_short):
+    """
+    SCORE V2 aus fertigen Bausteinen, elementweise (numpy-Broadcast über Ticker / Bars / Kombinationen).
+
+    r_long / r_short = Return über long/short Bars, vol = Std (ddof=0) der letzten long Log-Returns.
+    NaN, wo compute_score auf den Fallback 0.50 gehen würde (Volatilität NaN / ~ 0).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol = np.where(vol >= 1e-6, vol, np.nan)
+
+        # ---------- NORMALIZED MOMENTUM ----------
+        m_long = r_long / (vol * np.sqrt(long_window))
+        m_short = r_short / (vol * np.sqrt(short_window))
+
+        core = (
+            blend * np.tanh(m_long * gain_long) +
+            (1 - blend) * np.tanh(m_short * gain_short)
+        )
+        return np.round(0.5 + core * 0.25, 3)
+
+
+def compute_score_matrix(closes, n_bars=None, **params) -> np.ndarray:
+    """
+    SCORE V2 am letzten Bar jeder Zeile einer (Ticker x Bars) Close-Matrix.
+
+    out[t] == compute_score(closes[t], **params)  (fehlende params = SCORE_PARAMS).
+    n_bars[t] = Länge der Historie hinter Zeile t, falls closes nur deren letzte Bars
+    enthält (Mindestlänge wie compute_score); die Zeile selbst muss dann endlich sein.
+    """
+    params = {**SCORE_PARAMS, **params}
+    long_w, short_w = params["long_window"], params["short_window"]
+
+    p = np.asarray(closes, dtype=float)
+    if p.ndim == 1:
+        p = p[None, :]
+    n_rows, width = p.shape
+    n_bars = np.full(n_rows, width) if n_bars is None else np.asarray(n_bars)
+
+    out = np.full(n_rows, 0.50)
+    if width < long_w + 1:
+        return out
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = p[:, -long_w - 1:]
+        last = w[:, -1]
+
+        # ---------- RETURNS ----------
+        r_long = (last - w[:, 0]) / w[:, 0]
+        r_short = (last - w[:, -short_w - 1]) / w[:, -short_w - 1]
+
+        # ---------- VOLATILITY ----------
+        vol = np.std(np.diff(np.log(w), axis=1), axis=1)
+
+        score = score_from_components(
+            r_long, r_short, vol, long_w, short_w,
+            params["blend"], params["gain_long"], params["gain_short"],
+        )
+
+    # ---------- SAFETY ----------
+    valid = (n_bars >= max(30, long_w + 1)) & np.isfinite(p).all(axis=1) & np.isfinite(score)
+    return np.where(valid, score, out)
+
+
+def _rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """Summe der letzten `window` Werte je Position (NaN, solange das Fenster unvollständig ist)."""
+    c = np.concatenate(([0.0], np.cumsum(x)))
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = c[window:] - c[:-window]
+    return out
+
+
+def compute_score_series(prices, lookback=None):
+    """
+    SCORE V2 für jeden Bar in einem vektorisierten Durchlauf.
+
+    out[i] == compute_score(p[max(0, i - lookback + 1) : i + 1])   (lookback=int, rollierendes Fenster)
+    out[i] == compute_score(p[: i + 1])                            (lookback=None, wachsendes Fenster)
+
+    Volatilität über rollierende Summen der Log-Returns und ihrer Quadrate -> O(n).
+    Fenster / Gewichte aus SCORE_PARAMS.
+    DataFrame/Series-Input liefert eine Series mit gleichem Index, sonst ein np.ndarray.
+    """
+    long_w, short_w = SCORE_PARAMS["long_window"], SCORE_PARAMS["short_window"]
+
+    pd = sys.modules.get("pandas")
+    index = prices.index if pd is not None and isinstance(prices, (pd.DataFrame, pd.Series)) else None
+
+    p = _close_array(prices)
+    if p is None:
+        p = np.full(len(index), np.nan)
+
+    n = len(p)
+    out = np.full(n, 0.50)
+
+    if n >= long_w + 1:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # ---------- SAFETY (wie compute_score: Fensterlänge + alle Werte endlich) ----------
+            pos = np.arange(n)
+            c_bad = np.concatenate(([0], np.cumsum(~np.isfinite(p))))
+            if lookback is None:
+                first = np.zeros(n, dtype=int)
+            else:
+                first = np.maximum(pos - lookback + 1, 0)
+            n_bad = c_bad[pos + 1] - c_bad[first]
+            valid = (pos - first + 1 >= max(30, long_w + 1)) & (n_bad == 0)
+
+            # ---------- RETURNS ----------
+            r_long = np.full(n, np.nan)
+            r_short = np.full(n, np.nan)
+            r_long[long_w:] = (p[long_w:] - p[:-long_w]) / p[:-long_w]
+            r_short[short_w:] = (p[short_w:] - p[:-short_w]) / p[:-short_w]
+
+            # ---------- VOLATILITY (rolling, ddof=0) ----------
+            rets = np.diff(np.log(p))
+            ok = np.isfinite(rets)
+            # zentrieren -> keine Auslöschung bei E[r^2] - E[r]^2
+            shift = rets[ok].mean() if ok.any() else 0.0
+            x = np.where(ok, rets - shift, 0.0)
+
+            s1 = _rolling_sum(x, long_w)
+            s2 = _rolling_sum(x * x, long_w)
+            var = np.maximum(s2 / long_w - (s1 / long_w) ** 2, 0.0)
+            # p <= 0 -> log ungültig -> np.std wäre NaN
+            var[_rolling_sum((~ok).astype(float), long_w) > 0] = np.nan
+
+            vol = np.full(n, np.nan)
+            vol[1:] = np.sqrt(var)
+
+            score = score_from_components(
+                r_long, r_short, vol, long_w, short_w,
+                SCORE_PARAMS["blend"], SCORE_PARAMS["gain_long"], SCORE_PARAMS["gain_short"],
+            )
+            out = np.where(valid & np.isfinite(score), score, 0.50)
+
+    if index is not None:
+        return pd.Series(out, index=index, name="score")
+    return out
+
+
+class ScoreState:
+    """
+    SCORE V2 als Streaming-Zustand: update(close) pro neuem Bar, O(1) Zeit und Speicher.
+
+    Ringpuffer der letzten long_window + 1 Closes und long_window Log-Returns plus laufende
+    Summen von r und r^2 (Parameter aus SCORE_PARAMS). update() liefert denselben Wert wie
+        compute_score(alle bisherigen Closes)                (lookback=None)
+        compute_score(die letzten `lookback` Closes)         (lookback=int)
+    """
+
+    __slots__ = (
+        "lookback", "n", "_long", "_short", "_blend", "_gain_long", "_gain_short",
+        "_p", "_r", "_r_ok", "_s1", "_s2", "_n_bad_ret", "_bad", "_n_bad", "_shift",
+    )
+
+    _RESYNC = 1024      # laufende Summen regelmäßig aus dem Puffer neu aufbauen (Rundungsdrift)
+
+    def __init__(self, lookback=None):
+        self.lookback = lookback
+        self.n = 0
+        self._long = SCORE_PARAMS["long_window"]
+        self._short = SCORE_PARAMS["short_window"]
+        self._blend = SCORE_PARAMS["blend"]
+        self._gain_long = SCORE_PARAMS["gain_long"]
+        self._gain_short = SCORE_PARAMS["gain_short"]
+        self._p = [math.nan] * (self._long + 1)
+        self._r = [0.0] * self._long
+        self._r_ok = [True] * self._long
+        self._s1 = 0.0
+        self._s2 = 0.0
+        self._n_bad_ret = 0
+        self._bad = [False] * lookback if lookback else None
+        self._n_bad = 0
+        self._shift = None
+
+    def update(self, close) -> float:
+        p = float(close)
+        n = self.n
+        w = self._long
+        finite = math.isfinite(p)
+
+        # ---------- SAFETY: nicht-endliche Werte im Fenster ----------
+        if self._bad is None:
+            self._n_bad += not finite
+        else:
+            i = n % self.lookback
+            self._n_bad += (not finite) - self._bad[i]
+            self._bad[i] = not finite
+
+        # ---------- LOG-RETURN (gegen Vorgänger) ----------
+        if n >= 1:
+            prev = self._p[(n - 1) % (w + 1)]
+            try:
+                r = math.log(p) - math.log(prev)
+                ok = math.isfinite(r)
+            except ValueError:
+                r, ok = 0.0, False
+            if ok and self._shift is None:
+                self._shift = r
+            x = r - self._shift if ok else 0.0
+
+            j = (n - 1) % w
+            if n > w:
+                old = self._r[j]
+                self._s1 -= old
+                self._s2 -= old * old
+                self._n_bad_ret -= not self._r_ok[j]
+            self._r[j] = x
+            self._r_ok[j] = ok
+            self._s1 += x
+            self._s2 += x * x
+            self._n_bad_ret += not ok
+
+            if n % self._RESYNC == 0:
+                self._s1 = sum(self._r[:min(n, w)])
+                self._s2 = sum(v * v for v in self._r[:min(n, w)])
+
+        self._p[n % (w + 1)] = p
+        self.n = n + 1
+        return self.score()
+
+    def score(self) -> float:
+        n = self.n
+        w, s = self._long, self._short
+        window = n if self.lookback is None else min(n, self.lookback)
+        if window < max(30, w + 1) or self._n_bad or self._n_bad_ret:
+            return 0.50
+
+        p = self._p
+        last, p_long, p_short = p[(n - 1) % (w + 1)], p[(n - w - 1) % (w + 1)], p[(n - s - 1) % (w + 1)]
+
+        # ---------- RETURNS ----------
+        r_long = (last - p_long) / p_long
+        r_short = (last - p_short) / p_short
+
+        # ---------- VOLATILITY ----------
+        m = self._s1 / w
+        vol = math.sqrt(max(self._s2 / w - m * m, 0.0))
+        if not math.isfinite(vol) or vol < 1e-6:
+            return 0.50
+
+        # ---------- NORMALIZED MOMENTUM ----------
+        m_long = r_long / (vol * math.sqrt(w))
+        m_short = r_short / (vol * math.sqrt(s))
+
+        core = (
+            self._blend * math.tanh(m_long * self._gain_long) +
+            (1 - self._blend) * math.tanh(m_short * self._gain_short)
+        )
+
+        # wie np.round(x, 3)
+        return round((0.5 + core * 0.25) * 1000) / 1000
+
+
+def replay_scores(feed, lookback=None):
+    """
+    Lokalen Bar-Feed abspielen: feed = Iterable von (ticker, close),
+    liefert (ticker, score) je Update mit einem ScoreState pro Ticker.
+    """
+    states = {}
+    for ticker, close in feed:
+        state = states.get(ticker)
+        if state is None:
+            state = states[ticker] = ScoreState(lookback)
+        yield ticker, state.update(close)
+
+
 # backward compatibility
 model_score = compute_score
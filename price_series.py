@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_provider import OHLCV_COLS, normalize_ohlcv, resolve_start
+
+
+def _is_normalized(df) -> bool:
+    # Output von load_history / load_many -> ohne Kopie übernehmen
+    return (
+        isinstance(df, pd.DataFrame)
+        and not isinstance(df.columns, pd.MultiIndex)
+        and isinstance(df.index, pd.DatetimeIndex)
+        and df.index.tz is None
+        and df.index.is_monotonic_increasing
+        and df.index.is_unique
+    )
+
+
+class PriceSeries:
+    """
+    Kompakter OHLCV-Container für den Forecast-Hot-Path.
+
+    Einmal beim Laden normalisiert (normalize_ohlcv), danach nur noch zusammenhängende
+    Arrays: ts = int64 ns (UTC, tz-naiv), Preise float64 oder float32.
+    compute_score, forecast_trend und guard_dataframe akzeptieren ihn direkt.
+    """
+
+    __slots__ = ("ticker", "ts", "open", "high", "low", "close", "volume")
+
+    def __init__(
+        self,
+        ts,
+        close,
+        open=None,
+        high=None,
+        low=None,
+        volume=None,
+        *,
+        ticker: Optional[str] = None,
+        dtype=np.float64,
+    ):
+        self.ticker = ticker
+        self.ts = np.ascontiguousarray(ts, dtype=np.int64)
+        self.close = np.ascontiguousarray(close, dtype=dtype)
+        self.open = None if open is None else np.ascontiguousarray(open, dtype=dtype)
+        self.high = None if high is None else np.ascontiguousarray(high, dtype=dtype)
+        self.low = None if low is None else np.ascontiguousarray(low, dtype=dtype)
+        self.volume = None if volume is None else np.ascontiguousarray(volume, dtype=dtype)
+
+    @classmethod
+    def from_frame(cls, df: Optional[pd.DataFrame], ticker: Optional[str] = None, dtype=np.float64) -> "PriceSeries":
+        """DataFrame (auch yfinance-MultiIndex) -> PriceSeries; fehlende Spalten bleiben None."""
+        if not _is_normalized(df):
+            df = normalize_ohlcv(df)
+        ts = df.index.values.astype("datetime64[ns]").view(np.int64)
+        cols = {c.lower(): df[c].to_numpy(dtype=float) for c in OHLCV_COLS if c in df.columns}
+        close = cols.pop("close", np.full(len(df), np.nan))
+        return cls(ts, close, ticker=ticker, dtype=dtype, **cols)
+
+    # ---------- FRAME-ÄHNLICHE SICHT ----------
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return tuple(c for c in OHLCV_COLS if getattr(self, c.lower()) is not None)
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        # Sicht auf ts, keine Kopie
+        return pd.DatetimeIndex(self.ts.view("datetime64[ns]"), name="Date")
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.ts, self.close, self.open, self.high, self.low, self.volume) if a is not None)
+
+    def last_value(self, col: str = "Close") -> Optional[float]:
+        a = getattr(self, col.lower(), None)
+        if a is None or len(a) == 0:
+            return None
+        return float(a[-1])
+
+    # ---------- SLICING (Views) ----------
+    def _slice(self, sl: slice) -> "PriceSeries":
+        out = object.__new__(PriceSeries)
+        out.ticker = self.ticker
+        for name in ("ts", "close", "open", "high", "low", "volume"):
+            a = getattr(self, name)
+            setattr(out, name, None if a is None else a[sl])
+        return out
+
+    def since(self, start) -> "PriceSeries":
+        """Bars mit ts >= start (wie slice_history)."""
+        if start is None:
+            return self
+        k = np.searchsorted(self.ts, pd.Timestamp(start).value, side="left")
+        return self._slice(slice(k, None))
+
+    def slice_period(self, period: Optional[str]) -> "PriceSeries":
+        return self.since(resolve_start(period=period))
+
+    def tail(self, n: int) -> "PriceSeries":
+        return self._slice(slice(max(len(self) - n, 0), None))
+
+    def to_frame(self) -> pd.DataFrame:
+        data = {c: getattr(self, c.lower()) for c in self.columns}
+        return pd.DataFrame(data, index=self.index)
+
+    def __repr__(self) -> str:
+        last = self.index[-1] if len(self) else "NA"
+        return f"PriceSeries({self.ticker or '?'}, rows={len(self)}, last={last}, dtype={self.close.dtype})"
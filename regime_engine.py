@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import argparse
+import math
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from macro_output import macro_regime_output
+from regime_adjustment import adjust_metals_for_regime
+
+
+# Kern-Universum der Regime-Regeln (Name -> Ticker wie im Forecast)
+REGIME_ASSETS = {
+    "GOLD": "GC=F",
+    "SILVER": "SI=F",
+    "COPPER": "HG=F",
+    "NATURAL GAS": "NG=F",
+}
+
+# Namen wie in macro_output / regime_adjustment
+_COMMODITY = {"GOLD": "Gold", "SILVER": "Silver", "COPPER": "Copper", "NATURAL GAS": "Natural Gas"}
+
+# EWMA-Halbwertszeiten (Bars): schnell = Korrelation / Drift, langsam = Vol-Referenz
+HALFLIFE = 21
+SLOW_HALFLIFE = 126
+
+# Bars, bevor ein Regime ausgegeben wird (sonst Transition)
+MIN_BARS = 42
+
+# Drift / Vol (annualisiert) ab der ein Asset als steigend / fallend gilt
+TREND_Z = 0.5
+
+# Vol-Zustand: schnelle / langsame Vol
+VOL_HIGH = 1.25
+VOL_LOW = 0.80
+
+BARS_PER_YEAR = 252
+
+
+# =======================
+# STREAMING-ZUSTAND
+# =======================
+class RegimeState:
+    """
+    EWMA-Mittel / Kovarianz der Log-Returns über N Assets, update() pro neuem Bar in O(N^2).
+
+    Fehlender Close (NaN) -> Return 0 für dieses Asset, der nächste gültige Bar
+    überspannt die Lücke. Gewichte sind bias-korrigiert (1 - (1-a)^n), damit
+    frühe Schätzungen nicht zur Null gezogen werden.
+    """
+
+    __slots__ = ("names", "n", "_a", "_a_slow", "_mean", "_cov", "_var_slow", "_last")
+
+    def __init__(self, names: Iterable[str], halflife: float = HALFLIFE, slow_halflife: float = SLOW_HALFLIFE):
+        self.names = list(names)
+        k = len(self.names)
+        self.n = 0
+        self._a = 1.0 - 0.5 ** (1.0 / halflife)
+        self._a_slow = 1.0 - 0.5 ** (1.0 / slow_halflife)
+        self._mean = np.zeros(k)
+        self._cov = np.zeros((k, k))
+        self._var_slow = np.zeros(k)
+        self._last = np.full(k, np.nan)
+
+    def update(self, closes) -> "RegimeState":
+        p = np.asarray(closes, dtype=float).reshape(-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = np.log(p) - np.log(self._last)
+        self._last = np.where(np.isfinite(p) & (p > 0), p, self._last)
+
+        if np.isfinite(r).any():
+            r = np.where(np.isfinite(r), r, 0.0)
+            a, a_slow = self._a, self._a_slow
+
+            d = r - self._mean
+            self._mean += a * d
+            self._cov = (1.0 - a) * (self._cov + a * np.outer(d, d))
+            self._var_slow = (1.0 - a_slow) * (self._var_slow + a_slow * r * r)
+            self.n += 1
+        return self
+
+    def update_many(self, matrix) -> "RegimeState":
+        """Zeilen (Bars x Assets) nacheinander einspielen, z.B. Historie beim Start."""
+        for row in np.asarray(matrix, dtype=float):
+            self.update(row)
+        return self
+
+    # ---------- SCHÄTZER ----------
+    def _debias(self, a: float) -> float:
+        w = 1.0 - (1.0 - a) ** self.n
+        return 1.0 / w if w > 0 else math.nan
+
+    @property
+    def mean(self) -> np.ndarray:
+        """annualisierte Drift der Log-Returns"""
+        return self._mean * self._debias(self._a) * BARS_PER_YEAR
+
+    @property
+    def cov(self) -> np.ndarray:
+        """annualisierte Kovarianz-Matrix"""
+        return self._cov * self._debias(self._a) * BARS_PER_YEAR
+
+    @property
+    def vol(self) -> np.ndarray:
+        return np.sqrt(np.diag(self.cov))
+
+    @property
+    def corr(self) -> np.ndarray:
+        vol = self.vol
+        with np.errstate(divide="ignore", invalid="ignore"):
+            c = self.cov / np.outer(vol, vol)
+        np.fill_diagonal(c, 1.0)
+        return c
+
+    @property
+    def vol_ratio(self) -> np.ndarray:
+        slow = np.sqrt(self._var_slow * self._debias(self._a_slow) * BARS_PER_YEAR)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.vol / slow
+
+    def trend_z(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = self.mean / self.vol
+        return np.where(np.isfinite(z), z, 0.0)
+
+    def vol_state(self) -> List[str]:
+        ratio = self.vol_ratio
+        return ["HIGH" if x > VOL_HIGH else "LOW" if x < VOL_LOW else "NORMAL" for x in ratio]
+
+    def avg_corr(self) -> float:
+        c = self.corr
+        k = len(c)
+        if k < 2:
+            return math.nan
+        off = c[~np.eye(k, dtype=bool)]
+        off = off[np.isfinite(off)]
+        return float(off.mean()) if len(off) else math.nan
+
+
+# =======================
+# REGIME-REGELN
+# =======================
+def classify(state: RegimeState) -> str:
+    """
+    Regime aus Drift (Kern-Assets) und Vol-Zustand:
+        Risk-Off     Gold steigt, Kupfer fällt, Vol erhöht
+        Stagflation  Gas steigt, Kupfer fällt
+        Reflation    Kupfer und Gas steigen
+        Recession    Kupfer und Gas fallen
+        sonst        Transition
+    """
+    if state.n < MIN_BARS:
+        return "Transition"
+
+    pos = {name: i for i, name in enumerate(state.names)}
+    if not all(name in pos for name in REGIME_ASSETS):
+        return "Transition"
+
+    z = state.trend_z()
+    up = {name: z[pos[name]] > TREND_Z for name in REGIME_ASSETS}
+    down = {name: z[pos[name]] < -TREND_Z for name in REGIME_ASSETS}
+
+    core = [pos[name] for name in REGIME_ASSETS]
+    stressed = np.nanmean(state.vol_ratio[core]) > VOL_HIGH
+
+    if up["GOLD"] and down["COPPER"] and stressed:
+        return "Risk-Off"
+    if up["NATURAL GAS"] and down["COPPER"]:
+        return "Stagflation"
+    if up["COPPER"] and up["NATURAL GAS"]:
+        return "Reflation"
+    if down["COPPER"] and down["NATURAL GAS"]:
+        return "Recession"
+    return "Transition"
+
+
+def _bull(z: float) -> int:
+    # Drift / Vol -> 0..100 (50 = neutral)
+    return int(round(50 + 50 * math.tanh(z)))
+
+
+def regime_report(state: RegimeState) -> dict:
+    """
+    macro_regime_output() mit Bull/Bear-Werten aus den Daten statt von Hand,
+    dazu Korrelation / Vol-Zustände für den Output.
+    """
+    regime = classify(state)
+    pos = {name: i for i, name in enumerate(state.names)}
+    z = state.trend_z()
+    vol, ratio, vol_state = state.vol, state.vol_ratio, state.vol_state()
+
+    def entry(name):
+        bull = _bull(z[pos[name]]) if name in pos else 50
+        return {"commodity": _COMMODITY[name], "bull": bull, "bear": 100 - bull}
+
+    gas = entry("NATURAL GAS")
+    metals = adjust_metals_for_regime([entry(n) for n in ("GOLD", "SILVER", "COPPER")], regime)
+
+    out = macro_regime_output(regime, gas, metals)
+    out.update({
+        "bars": state.n,
+        "avg_corr": round(state.avg_corr(), 3),
+        "assets": {
+            name: {
+                "vol": round(float(vol[i]), 4),
+                "vol_ratio": round(float(ratio[i]), 3),
+                "vol_state": vol_state[i],
+                "trend_z": round(float(z[i]), 3),
+            }
+            for i, name in enumerate(state.names)
+        },
+        "bull": {m["commodity"]: m["bull"] for m in [gas] + metals},
+        "corr": np.round(state.corr, 3).tolist(),
+    })
+    return out
+
+
+# =======================
+# AUS DEN RUN-FRAMES
+# =======================
+def close_matrix(frames: Dict[str, pd.DataFrame], names: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """{ticker: OHLCV} -> Close-Matrix (Tage x Assets), Spalten nach names (Name -> Ticker)."""
+    names = names or REGIME_ASSETS
+    cols = {}
+    for name, ticker in names.items():
+        df = frames.get(ticker)
+        if df is None or df.empty or "Close" not in df.columns:
+            continue
+        close = df["Close"]
+        if isinstance(close, pd.DataFrame):
+            close = close.iloc[:, 0]
+        idx = close.index
+        if isinstance(idx, pd.DatetimeIndex):
+            idx = (idx.tz_localize(None) if idx.tz is not None else idx).normalize()
+        cols[name] = pd.Series(pd.to_numeric(close, errors="coerce").to_numpy(), index=idx).groupby(level=0).last()
+    return pd.DataFrame(cols).sort_index()
+
+
+def compute_regime(frames: Dict[str, pd.DataFrame], names: Optional[Dict[str, str]] = None) -> dict:
+    """Regime-Report aus den Frames des Runs (z.B. load_many(..., period="2y"))."""
+    names = names or REGIME_ASSETS
+    closes = close_matrix(frames, names)
+    state = RegimeState(list(names))
+    if not closes.empty:
+        state.update_many(closes.reindex(columns=list(names)).to_numpy())
+    return regime_report(state)
+
+
+def main(argv=None) -> None:
+    from data_provider import load_many
+
+    parser = argparse.ArgumentParser(description="Cross-Asset-Regime aus Korrelation / Vol-Zuständen")
+    parser.add_argument("--period", default="2y")
+    parser.add_argument("--extra", nargs="*", default=[], help="weitere Ticker (nur Korrelation / Vol)")
+    args = parser.parse_args(argv)
+
+    names = dict(REGIME_ASSETS, **{t: t for t in args.extra})
+    report = compute_regime(load_many(names.values(), period=args.period), names)
+
+    print(f"REGIME: {report['macro_regime']} | Confidence={report['confidence']} | AvgCorr={report['avg_corr']}")
+    print(report["interpretation"])
+    for name, s in report["assets"].items():
+        print(f"{name:<12} Vol={s['vol']:.3f} ({s['vol_state']}) | Trend z={s['trend_z']:+.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class _NoopSpan:
+    """Geteiltes Leer-Objekt, wenn Metrics deaktiviert sind (kein Zeitstempel, keine Allokation)."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("_metrics", "stage", "asset", "parent", "depth", "_t0")
+
+    def __init__(self, metrics: "Metrics", stage: str, asset: Optional[str]):
+        self._metrics = metrics
+        self.stage = stage
+        self.asset = asset
+
+    def __enter__(self):
+        # offene Spans dieses Threads -> Parent-Pfad ("evaluate_trades/query_open_trades")
+        stack = self._metrics._stack()
+        self.parent = stack[-1] if stack else None
+        self.depth = len(stack)
+        stack.append(self.stage if self.parent is None else f"{self.parent}/{self.stage}")
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._t0
+        self._metrics._stack().pop()
+        self._metrics._record(self.stage, self.asset, seconds, self.parent, self.depth)
+        return False
+
+
+class Metrics:
+    """
+    Leichtgewichtige Stage-Timings und Counter für einen Run.
+
+        with METRICS.span("download"): ...
+        with METRICS.span("score", asset="GOLD"): ...
+        METRICS.incr("rows_downloaded", len(df))
+
+    Spans dürfen verschachtelt sein (pro Thread): ein Span innerhalb eines anderen
+    bekommt parent/depth und zählt nur unter seinem Parent (substages), nicht in stage_totals.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        self.started_utc = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        self.spans: List[dict] = []
+        self.counters: Dict[str, float] = {}
+
+    # ---------- RECORD ----------
+    def span(self, stage: str, asset: Optional[str] = None):
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, stage, asset)
+
+    def _stack(self) -> List[str]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, stage: str, asset: Optional[str], seconds: float,
+                parent: Optional[str] = None, depth: int = 0) -> None:
+        with self._lock:
+            self.spans.append({
+                "stage": stage, "asset": asset, "seconds": round(seconds, 6),
+                "parent": parent, "depth": depth,
+            })
+
+    def incr(self, name: str, n: float = 1, asset: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        key = name if asset is None else f"{name}[{asset}]"
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    # ---------- REPORT ----------
+    def stage_totals(self) -> Dict[str, float]:
+        """
+        Sekunden pro Top-Level-Stage (ohne Asset-Label), in Reihenfolge des ersten Auftretens.
+        Verschachtelte Spans stecken schon in ihrem Parent -> siehe substages().
+        """
+        out: Dict[str, float] = {}
+        for s in self.spans:
+            if s["asset"] is None and s.get("parent") is None:
+                out[s["stage"]] = out.get(s["stage"], 0.0) + s["seconds"]
+        return out
+
+    def substages(self) -> Dict[str, Dict[str, float]]:
+        """Verschachtelte Spans (ohne Asset-Label) je Parent-Pfad: {"evaluate_trades": {"write_back": s}}."""
+        out: Dict[str, Dict[str, float]] = {}
+        for s in self.spans:
+            if s["asset"] is None and s.get("parent") is not None:
+                stages = out.setdefault(s["parent"], {})
+                stages[s["stage"]] = round(stages.get(s["stage"], 0.0) + s["seconds"], 6)
+        return out
+
+    def by_asset(self) -> Dict[str, Dict[str, float]]:
+        out: Dict[str, Dict[str, float]] = {}
+        for s in self.spans:
+            if s["asset"] is not None:
+                stages = out.setdefault(s["asset"], {})
+                stages[s["stage"]] = round(stages.get(s["stage"], 0.0) + s["seconds"], 6)
+        return out
+
+    def to_dict(self) -> dict:
+        return {
+            "started_utc": self.started_utc,
+            "stages": {k: round(v, 6) for k, v in self.stage_totals().items()},
+            "substages": self.substages(),
+            "assets": self.by_asset(),
+            "counters": dict(sorted(self.counters.items())),
+            "spans": list(self.spans),
+        }
+
+    def summary_line(self) -> str:
+        subs = self.substages()
+
+        def _stage(name, seconds):
+            inner = subs.get(name)
+            if not inner:
+                return f"{name}={seconds:.2f}s"
+            return f"{name}={seconds:.2f}s (" + ", ".join(f"{k}={v:.2f}s" for k, v in inner.items()) + ")"
+
+        stages = " | ".join(_stage(k, v) for k, v in self.stage_totals().items())
+        counters = " | ".join(
+            f"{k}={int(v) if float(v).is_integer() else round(v, 3)}"
+            for k, v in sorted(self.counters.items()) if "[" not in k
+        )
+        return " || ".join(x for x in (stages, counters) if x)
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+# Run-weite Instanz; FORECAST_METRICS=0 schaltet alles ab
+METRICS = Metrics(enabled=os.environ.get("FORECAST_METRICS", "1").lower() not in ("0", "false", "no"))
@@ -4,8 +4,11 @@ from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 from typing import Optional, Tuple, Dict, Any
 
+import numpy as np
 import pandas as pd
 
+from price_series import PriceSeries
+
 
 @dataclass
 class GuardResult:
@@ -34,6 +37,8 @@ def _safe_int(x, default: int = 0) -> int:
 
 def infer_timeframe_seconds(index: pd.Index, fallback_seconds: int = 86400) -> int:
     try:
+        if isinstance(index, np.ndarray) and index.dtype == np.int64:
+            return _infer_timeframe_ts(index, fallback_seconds)
         if not isinstance(index, pd.DatetimeIndex):
             return fallback_seconds
         if len(index) < 3:
@@ -55,7 +60,19 @@ def infer_timeframe_seconds(index: pd.Index, fallback_seconds: int = 86400) -> i
         return fallback_seconds
 
 
+def _infer_timeframe_ts(ts: np.ndarray, fallback_seconds: int) -> int:
+    # wie oben, direkt auf int64-ns Timestamps (PriceSeries.ts)
+    if len(ts) < 3:
+        return fallback_seconds
+    tf = int(round(float(np.median(np.diff(ts[-50:]) / 1e9))))
+    if tf <= 0:
+        return fallback_seconds
+    return max(1, min(tf, 7 * 86400))
+
+
 def _last_scalar(df: pd.DataFrame, col: str):
+    if isinstance(df, PriceSeries):
+        return df.last_value(col)
     try:
         v = df[col].iloc[-1]
         if isinstance(v, pd.Series):
@@ -73,7 +90,7 @@ def _format_display(dt_utc: datetime) -> str:
 
 def guard_dataframe(
     asset: str,
-    df: Optional[pd.DataFrame],
+    df: Optional[pd.DataFrame],     # oder PriceSeries
     *,
     now_utc: Optional[datetime] = None,
     required_cols: Tuple[str, ...] = ("Open", "High", "Low", "Close"),
@@ -109,7 +126,7 @@ def guard_dataframe(
         reasons.append("HISTORY_SHORT")
 
     try:
-        last_bar = df.index[-1]
+        last_bar = pd.Timestamp(df.ts[-1]) if isinstance(df, PriceSeries) else df.index[-1]
         if isinstance(last_bar, pd.Timestamp):
             last_bar = last_bar.to_pydatetime()
     except Exception:
@@ -125,7 +142,8 @@ def guard_dataframe(
 
     last_bar_utc = last_bar.astimezone(timezone.utc)
 
-    tf = timeframe_seconds if timeframe_seconds else infer_timeframe_seconds(df.index)
+    index = df.ts if isinstance(df, PriceSeries) else df.index
+    tf = timeframe_seconds if timeframe_seconds else infer_timeframe_seconds(index)
     tf = _safe_int(tf, 86400)
 
     age_s = _safe_int((now_utc - last_bar_utc).total_seconds(), 10**9)
@@ -0,0 +1,45 @@
+import threading
+
+from run_metrics import Metrics
+
+
+def _span(m, stage, asset=None, seconds=1.0):
+    # feste Dauer statt sleep: Zeitstempel über _record überschreiben
+    span = m.span(stage, asset)
+    span.__enter__()
+    span._t0 -= seconds
+    return span
+
+
+def test_nested_spans_count_once():
+    m = Metrics()
+    with m.span("download"):
+        pass
+    outer = _span(m, "evaluate_trades", seconds=0.0)
+    for stage in ("query_open_trades", "write_back"):
+        _span(m, stage, seconds=1.0).__exit__(None, None, None)
+    outer._t0 -= 2.0
+    outer.__exit__(None, None, None)
+
+    totals = m.stage_totals()
+    assert set(totals) == {"download", "evaluate_trades"}
+    assert 2.0 <= totals["evaluate_trades"] < 2.5
+    assert set(m.substages()["evaluate_trades"]) == {"query_open_trades", "write_back"}
+    assert {s["stage"]: s["depth"] for s in m.spans}["write_back"] == 1
+    assert "evaluate_trades=" in m.summary_line() and "(query_open_trades=" in m.summary_line()
+
+
+def test_spans_in_worker_threads_are_top_level():
+    m = Metrics()
+
+    def work():
+        with m.span("score", "GOLD"):
+            pass
+
+    with m.span("forecast"):
+        t = threading.Thread(target=work)
+        t.start()
+        t.join()
+
+    assert [s["parent"] for s in m.spans] == [None, None]
+    assert list(m.by_asset()) == ["GOLD"]
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from model_core import SCORE_PARAMS, compute_score, compute_score_matrix
+
+
+def _random_closes(rng, n_rows, n_bars):
+    """Random Walks mit Lücken (NaN), Null- und Negativ-Preisen und flachen Strecken."""
+    p = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_rows, n_bars)), axis=1))
+    p[rng.random(p.shape) < 0.01] = np.nan
+    p[rng.random(p.shape) < 0.003] = 0.0
+    p[rng.random(p.shape) < 0.003] = -1.0
+    p[:3, -25:] = 42.0                      # vol == 0 -> Fallback
+    return p
+
+
+# =======================
+# compute_score_matrix
+# =======================
+@pytest.mark.parametrize("seed", range(5))
+def test_matrix_matches_compute_score(seed):
+    rng = np.random.default_rng(seed)
+    closes = _random_closes(rng, 200, 40)
+    expected = np.array([compute_score(row) for row in closes])
+    np.testing.assert_array_equal(compute_score_matrix(closes), expected)
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"long_window": 10, "short_window": 3, "blend": 0.5, "gain_long": 1.2, "gain_short": 0.8},
+    {"long_window": 40, "short_window": 8},
+])
+def test_matrix_params(params):
+    rng = np.random.default_rng(7)
+    closes = _random_closes(rng, 100, 60)
+    expected = np.array([compute_score(row, **{**SCORE_PARAMS, **params}) for row in closes])
+    np.testing.assert_array_equal(compute_score_matrix(closes, **params), expected)
+
+
+def test_matrix_tail_with_n_bars():
+    # nur die letzten Bars übergeben, Mindestlänge über n_bars
+    rng = np.random.default_rng(3)
+    closes = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, (50, 80)), axis=1))
+    n_bars = rng.integers(10, 80, 50)
+    expected = np.array([compute_score(row[-n:]) for row, n in zip(closes, n_bars)])
+    got = compute_score_matrix(closes[:, -21:], n_bars=n_bars)
+    np.testing.assert_array_equal(got, expected)
+
+
+def test_short_matrix_is_fallback():
+    assert (compute_score_matrix(np.ones((4, 10))) == 0.50).all()
+
+
+# =======================
+# universe / grid
+# =======================
+def test_cross_section_matches_compute_score():
+    from universe import cross_section
+
+    rng = np.random.default_rng(11)
+    m = _random_closes(rng, 60, 120).T
+    m[:45, :10] = np.nan                    # kurze Historien
+    closes = pd.DataFrame(m, index=pd.bdate_range("2024-01-01", periods=len(m)))
+
+    expected = [compute_score(closes[c].dropna()) for c in closes.columns]
+    np.testing.assert_array_equal(cross_section(closes)["score"].to_numpy(), expected)
+
+
+@pytest.mark.parametrize("bad", [None, 0.0, -1.0])
+def test_grid_score_matrix_matches_compute_score(bad):
+    from backtest.grid import param_combos, score_matrix
+
+    rng = np.random.default_rng(5)
+    p = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, 120)))
+    if bad is not None:
+        p[40] = bad                         # log -> -inf / NaN darf nicht in spätere Bars laufen
+    combos = param_combos({"long_window": (10, 20), "short_window": (3, 5), "blend": (0.65,)})
+    scores = score_matrix(p, combos)
+
+    for c, row in combos.iterrows():
+        params = {k: row[k] for k in SCORE_PARAMS}
+        expected = np.array([compute_score(p[: i + 1], **params) for i in range(len(p))])
+        # score_matrix: NaN statt Fallback 0.50
+        np.testing.assert_allclose(np.where(np.isnan(scores[c]), 0.50, scores[c]), expected, atol=1e-12)
+
+
+# =======================
+# compute_score_series / ScoreState / replay_scores
+# =======================
+def _reference(p, lookback):
+    start = (lambda i: 0) if lookback is None else (lambda i: max(0, i - lookback + 1))
+    return np.array([compute_score(p[start(i): i + 1]) for i in range(len(p))])
+
+
+def _assert_scores(got, expected):
+    # laufende Summen statt np.std -> höchstens ein Rundungsschritt bei Gleichstand auf 0.0005
+    got = np.asarray(got)
+    assert np.abs(got - expected).max() <= 0.001 + 1e-12
+    assert (got != expected).mean() < 0.01
+
+
+@pytest.mark.parametrize("lookback", [None, 30, 45, 120])
+@pytest.mark.parametrize("seed", range(3))
+def test_series_and_state_match_compute_score(seed, lookback):
+    from model_core import ScoreState, compute_score_series
+
+    rng = np.random.default_rng(100 + seed)
+    p = _random_closes(rng, 1, 400)[0]
+    p[150:160] = np.nan                     # Lücke mitten im Verlauf
+    if lookback is None:
+        # wachsendes Fenster: ein NaN bliebe für immer drin, nur <= 0 / flach testen
+        p = np.where(np.isnan(p), 30.0, p)
+    expected = _reference(p, lookback)
+    assert (expected != 0.50).sum() > 100
+
+    _assert_scores(compute_score_series(p, lookback=lookback), expected)
+
+    state = ScoreState(lookback)
+    _assert_scores([state.update(x) for x in p], expected)
+
+    series = compute_score_series(pd.Series(p, index=pd.bdate_range("2020-01-01", periods=len(p))), lookback)
+    assert isinstance(series, pd.Series)
+    _assert_scores(series.to_numpy(), expected)
+
+
+def test_replay_scores_per_ticker():
+    from model_core import replay_scores
+
+    rng = np.random.default_rng(42)
+    closes = _random_closes(rng, 3, 200)
+    closes[:, :] = np.where(np.isfinite(closes), closes, 10.0)
+    feed = [(t, closes[k, i]) for i in range(closes.shape[1]) for k, t in enumerate("ABC")]
+
+    got = {t: [] for t in "ABC"}
+    for ticker, score in replay_scores(feed, lookback=60):
+        got[ticker].append(score)
+
+    for k, t in enumerate("ABC"):
+        _assert_scores(got[t], _reference(closes[k], 60))
+
+
+def test_retuned_score_params_apply_to_all_paths(monkeypatch):
+    from model_core import ScoreState, compute_score_series
+
+    rng = np.random.default_rng(9)
+    p = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, 200)))
+    before = _reference(p, 60)
+
+    tuned = {"long_window": 30, "short_window": 8, "blend": 0.5, "gain_long": 1.2, "gain_short": 0.8}
+    for k, v in tuned.items():
+        monkeypatch.setitem(SCORE_PARAMS, k, v)
+
+    expected = _reference(p, 60)
+    assert (expected != before).any()
+    np.testing.assert_array_equal(expected, [compute_score(p[max(0, i - 59): i + 1], **tuned) for i in range(len(p))])
+
+    _assert_scores(compute_score_series(p, lookback=60), expected)
+    state = ScoreState(60)
+    _assert_scores([state.update(x) for x in p], expected)
+    windows = np.array([p[i - 59: i + 1] for i in range(59, len(p))])
+    np.testing.assert_array_equal(compute_score_matrix(windows), expected[59:])
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from trade_tracker import _evaluate_batch, _forward_returns
+
+# Mo 2026-01-05 .. Fr 2026-01-16, Wochenende 10./11. fehlt
+DATES = pd.bdate_range("2026-01-05", periods=10)
+CLOSE = np.array([100.0, 102.0, 101.0, 105.0, 104.0, 103.0, 108.0, 110.0, 107.0, 111.0])
+MARKET = {"GC=F": pd.DataFrame({"Close": CLOSE}, index=DATES)}
+
+
+def _open(rows):
+    return pd.DataFrame(
+        [{"id": i + 1, "ticker": "GC=F", "signal_date": d, "direction": side} for i, (d, side) in enumerate(rows)]
+    )
+
+
+def _cell(exits, trade_id, h):
+    row = exits[(exits["trade_id"] == trade_id) & (exits["horizon_days"] == h)]
+    return None if row.empty else row.iloc[0]
+
+
+def test_forward_returns_by_hand():
+    exit_pos, exit_close, ret = _forward_returns(CLOSE, np.array([0, 8, 10]), np.array([1, 3]))
+    assert exit_pos.tolist() == [[1, 3], [9, 11], [11, 13]]
+    np.testing.assert_allclose(ret[0], [102 / 100 - 1, 105 / 100 - 1])
+    assert ret[1, 0] == 111 / 107 - 1 and np.isnan(ret[1, 1])     # h=3 läuft übers Ende
+    assert np.isnan(ret[2]).all() and np.isnan(exit_close[2]).all()  # Signal hinter dem letzten Bar
+
+
+def test_evaluate_batch_cases():
+    rows = _open([
+        ("2026-01-05", "LONG"),     # 1: Montag
+        ("2026-01-10", "SHORT"),    # 2: Samstag -> Montag 12.01. (Position 5)
+        ("2026-01-15", "LONG"),     # 3: vorletzter Bar, nur h=1 erreichbar
+        ("2026-01-16", "LONG"),     # 4: letzter Bar, keine Zukunft
+        ("not a date", "LONG"),     # 5: NaT
+        ("2026-01-20", "SHORT"),    # 6: nach dem letzten Bar
+    ])
+    exits, done = _evaluate_batch(rows, MARKET, horizons=(3, 1))
+
+    # 1: Entry 100, h=1 -> 102 (LONG richtig), h=3 -> 105
+    e = _cell(exits, 1, 1)
+    assert (e["exit_date"], e["exit_close"], e["correct"]) == ("2026-01-06", 102.0, 1)
+    assert e["return"] == round(102 / 100 - 1, 6)
+    assert _cell(exits, 1, 3)["exit_date"] == "2026-01-08"
+
+    # 2: Entry = Close am Montag 12.01. (103); h=1 -> 108 (SHORT falsch), h=3 -> 107 (falsch)
+    e = _cell(exits, 2, 1)
+    assert (e["exit_date"], e["return"], e["correct"]) == ("2026-01-13", round(108 / 103 - 1, 6), 0)
+    e = _cell(exits, 2, 3)
+    assert (e["exit_date"], e["return"], e["correct"]) == ("2026-01-15", round(107 / 103 - 1, 6), 0)
+
+    # 3: Entry 107 -> h=1 111, h=3 noch offen
+    assert _cell(exits, 3, 1)["correct"] == 1
+    assert _cell(exits, 3, 3) is None
+
+    # 4-6: keine Auswertung
+    assert not exits["trade_id"].isin([4, 5, 6]).any()
+    assert len(exits) == 5
+
+    # fertig nur, wo der längste Horizont in den Daten liegt
+    assert sorted(done) == [1, 2]
+
+
+def test_evaluate_batch_without_market_data():
+    exits, done = _evaluate_batch(_open([("2026-01-05", "LONG")]), {}, horizons=(1, 5))
+    assert exits.empty and done == []
@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+
+from trade_store import TradeStore
+
+
+def _signal(asset, date, direction="LONG", close=100.0):
+    return {"asset": asset, "ticker": f"{asset}=F", "signal_date": date, "direction": direction, "entry_close": close}
+
+
+def _exit(trade_id, h, ret):
+    return {
+        "trade_id": trade_id, "horizon_days": h, "exit_date": "2026-02-01",
+        "exit_close": round(100 * (1 + ret), 6), "return": ret, "correct": int(ret > 0),
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TradeStore(str(tmp_path / "trades.sqlite"), legacy_csv=None)
+
+
+def test_insert_signals_dedup_on_unique_key(store):
+    rows = [_signal("GC", "2026-01-05"), _signal("GC", "2026-01-06"), _signal("GC", "2026-01-05", "SHORT")]
+    assert store.insert_signals(rows) == 3
+
+    # gleicher Key -> keep first (entry_close bleibt), neuer Key wird ergänzt
+    again = [_signal("GC", "2026-01-05", close=999.0), _signal("SI", "2026-01-05")]
+    assert store.insert_signals(again) == 1
+
+    frame = store.to_frame()
+    assert len(frame) == 4
+    assert frame.loc[(frame["asset"] == "GC") & (frame["direction"] == "LONG"), "entry_close"].tolist() == [100.0, 100.0]
+    assert (frame["evaluated"] == 0).all()
+
+
+def test_mark_evaluated_trigger_matches_rebuild(store):
+    store.insert_signals([_signal("GC", "2026-01-05"), _signal("GC", "2026-01-06"), _signal("SI", "2026-01-05")])
+    ids = store.open_trades()["id"].tolist()
+
+    first = [_exit(ids[0], 1, 0.01), _exit(ids[0], 5, -0.02), _exit(ids[2], 1, 0.03)]
+    assert store.mark_evaluated(first, done=[ids[2]]) == 3
+    assert store.open_trades()["id"].tolist() == ids[:2]
+
+    # Duplikate (gleicher Signal/Horizont, andere Werte) zählen nicht und ändern nichts
+    second = [_exit(ids[0], 1, 0.5), _exit(ids[1], 1, -0.04), _exit(ids[1], 5, 0.05)]
+    assert store.mark_evaluated(second, done=[ids[0], ids[1]]) == 2
+    assert store.open_trades().empty
+
+    exits = store.exits()
+    assert len(exits) == 5
+    assert exits.loc[(exits["id"] == ids[0]) & (exits["horizon_days"] == 1), "return"].item() == 0.01
+
+    by_trigger = store.stats()
+    gc1 = by_trigger.set_index(["asset", "horizon_days"]).loc[("GC", 1)]
+    assert (gc1["trades"], gc1["correct"], gc1["wrong"]) == (2, 1, 1)
+    assert gc1["sum_ret"] == pytest.approx(0.01 - 0.04)
+    assert gc1["sum_ret2"] == pytest.approx(0.01 ** 2 + 0.04 ** 2)
+
+    store.rebuild_stats()
+    pd.testing.assert_frame_equal(store.stats(), by_trigger)
+
+
+def test_legacy_csv_import(tmp_path):
+    csv = tmp_path / "trade_log.csv"
+    pd.DataFrame([
+        {**_signal("GC", "2026-01-05"), "horizon_days": 5, "evaluated": 1,
+         "exit_date": "2026-01-12", "exit_close": 103.0, "return": 0.03, "correct": 1},
+        {**_signal("GC", "2026-01-05"), "horizon_days": 5, "evaluated": 0},     # Duplikat
+        {**_signal("SI", "2026-01-06", "SHORT"), "horizon_days": 5, "evaluated": 0},
+    ]).to_csv(csv, index=False)
+
+    store = TradeStore(str(tmp_path / "trades.sqlite"), legacy_csv=str(csv))
+    frame = store.to_frame()
+    assert len(frame) == 2
+    assert store.open_trades()["asset"].tolist() == ["SI"]
+
+    stats = store.stats()
+    assert stats[["asset", "horizon_days", "trades", "correct"]].values.tolist() == [["GC", 5, 1, 1]]
+    assert stats["sum_ret"].item() == pytest.approx(0.03)
+
+    # nur beim Anlegen importieren
+    assert len(TradeStore(str(tmp_path / "trades.sqlite"), legacy_csv=str(csv)).to_frame()) == 2
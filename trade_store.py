@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from contextlib import closing
+from typing import Iterable, Optional
+
+import pandas as pd
+
+
+# Persistenter Trade-Log (ersetzt das komplette Neuschreiben von trade_log.csv)
+TRADE_DB_FILE = os.path.join(os.path.dirname(__file__), "trade_log.sqlite")
+
+# Alt-Format, wird beim ersten Öffnen einmalig importiert
+LEGACY_CSV_FILE = os.path.join(os.path.dirname(__file__), "trade_log.csv")
+
+# ein Signal = eine Zeile; Auswertungen je Horizont in trade_exits
+SIGNAL_COLS = ["time_utc", "asset", "ticker", "signal_date", "direction", "entry_close", "evaluated"]
+EXIT_COLS = ["horizon_days", "exit_date", "exit_close", "return", "correct"]
+
+# flache Sicht (Signal x Horizont) wie das alte trade_log.csv
+TRADE_COLS = [c for c in SIGNAL_COLS if c != "evaluated"] + EXIT_COLS
+
+_DEFAULTS = {"evaluated": 0}
+
+
+def _q(cols) -> str:
+    return ", ".join(f'"{c}"' for c in cols)        # "return" quoten
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id           INTEGER PRIMARY KEY,
+    time_utc     TEXT,
+    asset        TEXT    NOT NULL,
+    ticker       TEXT,
+    signal_date  TEXT    NOT NULL,
+    direction    TEXT    NOT NULL,
+    entry_close  REAL,
+    evaluated    INTEGER NOT NULL DEFAULT 0      -- 1 = alle Horizonte ausgewertet
+);
+
+-- ein Signal pro (Asset, Tag, Richtung); Upsert = B-Tree-Lookup
+CREATE UNIQUE INDEX IF NOT EXISTS ux_trades_key
+    ON trades (asset, signal_date, direction);
+
+-- nur offene Signale indexiert -> Abfrage unabhängig von der Log-Größe
+CREATE INDEX IF NOT EXISTS ix_trades_open
+    ON trades (ticker) WHERE evaluated = 0;
+
+-- Auswertung je (Signal, Horizont), einmal geschrieben
+CREATE TABLE IF NOT EXISTS trade_exits (
+    trade_id     INTEGER NOT NULL REFERENCES trades (id),
+    horizon_days INTEGER NOT NULL,
+    exit_date    TEXT,
+    exit_close   REAL,
+    "return"     REAL,
+    correct      INTEGER,
+    PRIMARY KEY (trade_id, horizon_days)
+) WITHOUT ROWID;
+
+-- laufende Aggregate pro (Asset, Horizont) -> Stats in O(Assets) statt O(Log)
+CREATE TABLE IF NOT EXISTS trade_stats (
+    asset        TEXT    NOT NULL,
+    horizon_days INTEGER NOT NULL,
+    trades       INTEGER NOT NULL DEFAULT 0,
+    correct      INTEGER NOT NULL DEFAULT 0,
+    wrong        INTEGER NOT NULL DEFAULT 0,
+    sum_ret      REAL    NOT NULL DEFAULT 0,
+    sum_ret2     REAL    NOT NULL DEFAULT 0,
+    PRIMARY KEY (asset, horizon_days)
+);
+
+-- nur neu eingefügte Auswertungen fließen ein (ON CONFLICT DO NOTHING feuert nicht)
+CREATE TRIGGER IF NOT EXISTS trg_trade_exit_stats
+AFTER INSERT ON trade_exits
+BEGIN
+    INSERT INTO trade_stats (asset, horizon_days, trades, correct, wrong, sum_ret, sum_ret2)
+    VALUES (
+        (SELECT asset FROM trades WHERE id = NEW.trade_id), NEW.horizon_days, 1,
+        NEW.correct = 1, NEW.correct = 0,
+        COALESCE(NEW."return", 0), COALESCE(NEW."return" * NEW."return", 0)
+    )
+    ON CONFLICT (asset, horizon_days) DO UPDATE SET
+        trades   = trades + excluded.trades,
+        correct  = correct + excluded.correct,
+        wrong    = wrong + excluded.wrong,
+        sum_ret  = sum_ret + excluded.sum_ret,
+        sum_ret2 = sum_ret2 + excluded.sum_ret2;
+END;
+"""
+
+_REBUILD_STATS = """
+DELETE FROM trade_stats;
+INSERT INTO trade_stats (asset, horizon_days, trades, correct, wrong, sum_ret, sum_ret2)
+SELECT t.asset, e.horizon_days, COUNT(*),
+       COALESCE(SUM(e.correct = 1), 0), COALESCE(SUM(e.correct = 0), 0),
+       COALESCE(SUM(e."return"), 0), COALESCE(SUM(e."return" * e."return"), 0)
+FROM trade_exits e JOIN trades t ON t.id = e.trade_id
+GROUP BY t.asset, e.horizon_days;
+"""
+
+# Log aus der Zeit mit einer Zeile pro (Signal, Horizont) -> Signale + trade_exits
+_MIGRATE_V1 = """
+BEGIN;
+DROP TRIGGER IF EXISTS trg_trade_stats;
+DROP INDEX IF EXISTS ux_trades_key;
+DROP INDEX IF EXISTS ix_trades_open;
+ALTER TABLE trades RENAME TO trades_v1;
+{schema}
+DROP TRIGGER trg_trade_exit_stats;
+INSERT INTO trades (time_utc, asset, ticker, signal_date, direction, entry_close, evaluated)
+SELECT time_utc, asset, ticker, signal_date, direction, entry_close, MIN(evaluated)
+FROM trades_v1
+GROUP BY asset, signal_date, direction
+ORDER BY MIN(id);
+INSERT OR IGNORE INTO trade_exits (trade_id, horizon_days, exit_date, exit_close, "return", correct)
+SELECT t.id, v.horizon_days, v.exit_date, v.exit_close, v."return", v.correct
+FROM trades_v1 v
+JOIN trades t ON t.asset = v.asset AND t.signal_date = v.signal_date AND t.direction = v.direction
+WHERE v.evaluated = 1;
+DROP TABLE trades_v1;
+{schema}
+{rebuild}
+COMMIT;
+"""
+
+STATS_COLS = ["asset", "horizon_days", "trades", "correct", "wrong", "sum_ret", "sum_ret2"]
+
+
+def _none_if_nan(v):
+    if hasattr(v, "item"):          # numpy-Skalare -> Python (sqlite3 kennt kein np.int64)
+        v = v.item()
+    if v is None or v == "":
+        return None
+    try:
+        if pd.isna(v):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return v
+
+
+class TradeStore:
+    """
+    SQLite-Backend für den Trade-Log: eine Zeile pro Signal in trades (eindeutig auf
+    asset, signal_date, direction), die Auswertungen je Horizont in trade_exits.
+    """
+
+    def __init__(self, path: str = TRADE_DB_FILE, legacy_csv: Optional[str] = LEGACY_CSV_FILE):
+        self.path = path
+        is_new = not os.path.exists(path)
+
+        with closing(self._connect()) as con:
+            cols = {row[1] for row in con.execute("PRAGMA table_info(trades)")}
+            if "horizon_days" in cols:
+                con.executescript(_MIGRATE_V1.format(schema=_SCHEMA, rebuild=_REBUILD_STATS))
+            with con:
+                con.executescript(_SCHEMA)
+                # Log aus der Zeit vor den Aggregaten -> einmalig nachziehen
+                has_stats = con.execute("SELECT 1 FROM trade_stats LIMIT 1").fetchone()
+                has_done = con.execute("SELECT 1 FROM trade_exits LIMIT 1").fetchone()
+
+        if has_done and not has_stats:
+            self.rebuild_stats()
+
+        if is_new and legacy_csv and os.path.exists(legacy_csv):
+            self._import_csv(legacy_csv)
+
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        return con
+
+    def _import_csv(self, path: str) -> None:
+        # Alt-Format: eine Zeile pro (Signal, Horizont), ausgewertete mit exit_* / return / correct
+        df = pd.read_csv(path)
+        if df.empty:
+            return
+        df["horizon_days"] = df.get("horizon_days", pd.Series(5, index=df.index)).fillna(5).astype(int)
+        df["evaluated"] = df.get("evaluated", pd.Series(0, index=df.index)).fillna(0).astype(int)
+
+        key = ["asset", "signal_date", "direction"]
+        # alter Unique-Key inkl. Horizont, keep="first" wie zuvor
+        df = df.drop_duplicates(key + ["horizon_days"])
+        signals = df.assign(evaluated=df.groupby(key)["evaluated"].transform("min"))
+        self.insert_signals(signals.drop_duplicates(key).to_dict("records"))
+
+        done = df[df["evaluated"] == 1]
+        if done.empty:
+            return
+        ids = self._query().set_index(key)["id"]
+        exits = done.assign(trade_id=ids.reindex(pd.MultiIndex.from_frame(done[key])).to_numpy())
+        self.mark_evaluated(exits.to_dict("records"))
+
+    # ---------- WRITE ----------
+    def insert_signals(self, rows: Iterable[dict]) -> int:
+        """
+        Neue Signale einfügen; bestehender Key bleibt unverändert (keep="first").
+        Liefert die Anzahl tatsächlich eingefügter Zeilen.
+        """
+        values = [tuple(_none_if_nan(r.get(c, _DEFAULTS.get(c))) for c in SIGNAL_COLS) for r in rows]
+        if not values:
+            return 0
+
+        sql = (
+            f"INSERT INTO trades ({_q(SIGNAL_COLS)}) "
+            f"VALUES ({', '.join('?' for _ in SIGNAL_COLS)}) "
+            "ON CONFLICT (asset, signal_date, direction) DO NOTHING"
+        )
+        with closing(self._connect()) as con, con:
+            return con.executemany(sql, values).rowcount
+
+    def mark_evaluated(self, exits: Iterable[dict], done: Iterable[int] = ()) -> int:
+        """
+        exits: dicts mit trade_id, horizon_days, exit_date, exit_close, return, correct;
+        schon vorhandene (Signal, Horizont) bleiben unverändert (Trigger zählt sie nicht doppelt).
+        done = Signal-IDs, die danach für alle Horizonte fertig sind
+        (evaluated = 1, fallen aus open_trades). Liefert die Anzahl neuer Auswertungen.
+        """
+        values = [
+            (
+                int(e["trade_id"]), int(e["horizon_days"]), _none_if_nan(e.get("exit_date")),
+                _none_if_nan(e.get("exit_close")), _none_if_nan(e.get("return")), _none_if_nan(e.get("correct")),
+            )
+            for e in exits
+        ]
+        done = [(int(i),) for i in done]
+
+        sql = (
+            f"INSERT INTO trade_exits (trade_id, {_q(EXIT_COLS)}) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (trade_id, horizon_days) DO NOTHING"
+        )
+        added = 0
+        with closing(self._connect()) as con, con:
+            if values:
+                added = con.executemany(sql, values).rowcount
+            if done:
+                con.executemany("UPDATE trades SET evaluated = 1 WHERE id = ? AND evaluated = 0", done)
+        return added
+
+    def rebuild_stats(self) -> None:
+        """Aggregate komplett aus trade_exits neu aufbauen."""
+        with closing(self._connect()) as con, con:
+            con.executescript(_REBUILD_STATS)
+
+    # ---------- READ ----------
+    def _query(self, where: str = "", params: tuple = ()) -> pd.DataFrame:
+        sql = f"SELECT id, {_q(SIGNAL_COLS)} FROM trades {where} ORDER BY id"
+        with closing(self._connect()) as con:
+            return pd.read_sql_query(sql, con, params=params)
+
+    def open_trades(self) -> pd.DataFrame:
+        """Signale, für die noch mindestens ein Horizont offen ist."""
+        return self._query("WHERE evaluated = 0")
+
+    def exits(self, horizon_days: Optional[int] = None, include_open: bool = False) -> pd.DataFrame:
+        """
+        Flache Sicht wie das alte trade_log.csv (Spalten TRADE_COLS): eine Zeile je ausgewertetem
+        (Signal, Horizont); include_open=True hängt Signale ohne Auswertung mit leeren exit_* an.
+        """
+        signal = ", ".join(f't."{c}"' for c in TRADE_COLS if c not in EXIT_COLS)
+        exit_ = ", ".join(f'e."{c}"' for c in EXIT_COLS)
+        join = "LEFT JOIN" if include_open else "JOIN"
+        sql = f"SELECT t.id, {signal}, {exit_} FROM trades t {join} trade_exits e ON e.trade_id = t.id"
+        params: tuple = ()
+        if horizon_days is not None:
+            sql += " WHERE e.horizon_days = ?"
+            params = (int(horizon_days),)
+        with closing(self._connect()) as con:
+            return pd.read_sql_query(sql + " ORDER BY t.id, e.horizon_days", con, params=params)
+
+    def evaluated_trades(self) -> pd.DataFrame:
+        return self._query("WHERE evaluated = 1")
+
+    def stats(self, horizon_days: Optional[int] = None) -> pd.DataFrame:
+        """Aggregate pro (asset, horizon_days); eine Zeile je Kombination."""
+        sql = f"SELECT {', '.join(STATS_COLS)} FROM trade_stats"
+        params: tuple = ()
+        if horizon_days is not None:
+            sql += " WHERE horizon_days = ?"
+            params = (int(horizon_days),)
+        with closing(self._connect()) as con:
+            return pd.read_sql_query(sql + " ORDER BY asset, horizon_days", con, params=params)
+
+    def to_frame(self) -> pd.DataFrame:
+        return self._query()
+
+    def export_csv(self, path: str) -> None:
+        self.exits(include_open=True).drop(columns=["id"]).to_csv(path, index=False)
+
+
+_stores: dict = {}
+
+
+def get_store(path: str = TRADE_DB_FILE) -> TradeStore:
+    if path not in _stores:
+        _stores[path] = TradeStore(path)
+    return _stores[path]
@@ -1,35 +1,44 @@
 from __future__ import annotations
 
-import os
 from datetime import datetime, timezone
+from typing import Iterable
+
+import numpy as np
 import pandas as pd
-import yfinance as yf
 
+from data_provider import load_history
+from run_metrics import METRICS
+from trade_store import TRADE_DB_FILE, get_store
 
-# Persistente Logs (werden im Repo committed, wenn dein Workflow das macht)
-TRADE_LOG_FILE = os.path.join(os.path.dirname(__file__), "trade_log.csv")
 
+# Auswertungs-Horizonte (Tradingdays); jedes Signal wird einmal geloggt und je Horizont ausgewertet
+HORIZONS = (1, 3, 5, 10, 15, 21)
 
-def _utc_now_str() -> str:
-    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+# Headline-Horizont im Output (1-5D-Forecast -> 5 Tradingdays)
+DEFAULT_HORIZON = 5
 
 
-def _normalize_yfinance_df(df: pd.DataFrame) -> pd.DataFrame:
-    # yfinance + pandas 3 -> manchmal MultiIndex-Spalten
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-    return df
+def _store():
+    # Persistenter Trade-Log (SQLite, siehe trade_store)
+    return get_store(TRADE_DB_FILE)
 
 
-def _download_daily(ticker: str, period: str = "2y") -> pd.DataFrame:
-    df = yf.download(ticker, period=period, interval="1d", progress=False)
-    df = _normalize_yfinance_df(df)
+def _utc_now_str() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _as_daily(df: pd.DataFrame) -> pd.DataFrame:
     # Index auf Date-only bringen (Tradingdays)
     if isinstance(df.index, pd.DatetimeIndex):
+        df = df.copy()
         df.index = df.index.tz_localize(None).normalize()
     return df
 
 
+def _download_daily(ticker: str, period: str = "2y") -> pd.DataFrame:
+    return _as_daily(load_history(ticker, period=period))
+
+
 def _to_date(s: str):
     # erwartet "YYYY-MM-DD" oder "YYYY-MM-DD HH:MM"
     try:
@@ -38,10 +47,14 @@ def _to_date(s: str):
         return None
 
 
-def record_signals(results: list[dict], asset_to_ticker: dict[str, str]) -> None:
+def record_signals(
+    results: list[dict],
+    asset_to_ticker: dict[str, str],
+) -> None:
     """
     Speichert die heutigen FINAL-Signale (LONG/SHORT/NO_TRADE/NO_TRADE(DATA)).
-    Nur wenn DATA_OK=True und FINAL in {LONG,SHORT} wird als "Trade-Signal" geloggt.
+    Nur wenn DATA_OK=True und FINAL in {LONG,SHORT} wird als "Trade-Signal" geloggt,
+    eine Zeile pro Signal; die Horizonte kommen erst bei der Auswertung dazu.
     """
     rows = []
     now_utc = _utc_now_str()
@@ -79,138 +92,207 @@ def record_signals(results: list[dict], asset_to_ticker: dict[str, str]) -> None
             "signal_date": signal_date.strftime("%Y-%m-%d"),
             "direction": final,          # LONG / SHORT
             "entry_close": close,        # Close am Signal-Tag (aus deinem Output)
-            "horizon_days": 5,           # 1-5D Horizont -> 5 Tradingdays
             "evaluated": 0,
-            "exit_date": "",
-            "exit_close": "",
-            "return": "",
-            "correct": "",
         })
 
     if not rows:
         return
 
-    df_new = pd.DataFrame(rows)
+    # Duplikate verhindert der Unique-Index (asset, signal_date, direction)
+    METRICS.incr("signals_recorded", _store().insert_signals(rows))
 
-    if os.path.exists(TRADE_LOG_FILE):
-        df_old = pd.read_csv(TRADE_LOG_FILE)
-        df_all = pd.concat([df_old, df_new], ignore_index=True)
-    else:
-        df_all = df_new
 
-    # Duplikate verhindern (gleicher Asset + signal_date + direction)
-    df_all = df_all.drop_duplicates(subset=["asset", "signal_date", "direction"], keep="first")
-
-    df_all.to_csv(TRADE_LOG_FILE, index=False)
-
-
-def evaluate_open_trades(asset_to_ticker: dict[str, str], horizon_days: int = 5) -> dict:
+def evaluate_open_trades(
+    asset_to_ticker: dict[str, str],
+    horizon_days: int | None = DEFAULT_HORIZON,
+    market_data: dict[str, pd.DataFrame] | None = None,
+    horizons: Iterable[int] = HORIZONS,
+) -> dict:
     """
-    Bewertet alle offenen Signale aus trade_log.csv:
+    Bewertet alle offenen Signale aus dem Trade-Log, alle Horizonte in einem Durchgang:
     - LONG richtig, wenn Close(t+h) > Close(t)
     - SHORT richtig, wenn Close(t+h) < Close(t)
-    Speichert Ergebnis zurück in trade_log.csv und liefert Stats.
+    Schreibt nur die neu erreichten (Signal, Horizont)-Auswertungen zurück und liefert Stats.
+    horizon_days: Headline-Horizont für overall/by_asset (None = alle); by_horizon enthält jeden.
+    market_data: optional {ticker: DataFrame} aus dem Batch-Fetch des Runs (sonst eigener Download).
     """
-    if not os.path.exists(TRADE_LOG_FILE):
-        return {"overall": {"trades": 0, "correct": 0, "wrong": 0, "accuracy": None}, "by_asset": {}}
-
-    log = pd.read_csv(TRADE_LOG_FILE)
-
-    if log.empty:
-        return {"overall": {"trades": 0, "correct": 0, "wrong": 0, "accuracy": None}, "by_asset": {}}
-
-    # nur passende horizon_days auswerten
-    log["horizon_days"] = log["horizon_days"].fillna(horizon_days).astype(int)
+    store = _store()
+    horizons = sorted({int(h) for h in horizons})
 
-    open_mask = (log["evaluated"].fillna(0).astype(int) == 0) & (log["horizon_days"] == horizon_days)
-    open_rows = log[open_mask].copy()
+    # alle offenen Signale (Partial Index): mindestens ein Horizont noch nicht erreicht
+    with METRICS.span("query_open_trades"):
+        open_rows = store.open_trades()
+    METRICS.incr("open_trades", len(open_rows))
 
     if open_rows.empty:
-        return _compute_stats(log)
+        return compute_stats(horizon_days)
 
-    # pro ticker einmal laden
+    # pro ticker einmal laden (bzw. aus dem Batch des Runs übernehmen)
     tickers = sorted(set(open_rows["ticker"].dropna().astype(str).tolist()))
+    shared = market_data or {}
     market_data = {}
-    for t in tickers:
-        try:
-            market_data[t] = _download_daily(t, period="2y")
-        except Exception:
-            market_data[t] = pd.DataFrame()
+    with METRICS.span("load_market_data"):
+        for t in tickers:
+            try:
+                if t in shared:
+                    market_data[t] = _as_daily(shared[t])
+                else:
+                    market_data[t] = _download_daily(t, period="2y")
+            except Exception:
+                market_data[t] = pd.DataFrame()
+
+    # auswerten (vektorisiert pro Ticker)
+    with METRICS.span("evaluate_batch"):
+        exits, done = _evaluate_batch(open_rows, market_data, horizons)
+
+    # ein Batch-Insert in trade_exits (schon vorhandene Horizonte bleiben unverändert)
+    # (Aggregate werden dabei per Trigger nur um die neuen Zeilen fortgeschrieben)
+    with METRICS.span("write_back"):
+        METRICS.incr("trades_evaluated", store.mark_evaluated(exits.to_dict("records"), done))
+    return compute_stats(horizon_days)
+
+
+def _close_values(df: pd.DataFrame) -> np.ndarray:
+    close = df["Close"]
+    # Robust gegen Series ODER DataFrame
+    if isinstance(close, pd.DataFrame):
+        close = close.iloc[:, 0]
+    return pd.to_numeric(close, errors="coerce").to_numpy(dtype=float)
+
+
+def _forward_returns(close: np.ndarray, pos: np.ndarray, horizons: np.ndarray):
+    """
+    Forward-Return-Matrix (Signal-Tage x Horizonte) mit einem Gather:
+    ret[i, j] = close[pos[i] + horizons[j]] / close[pos[i]] - 1, NaN ohne genug Zukunftsdaten.
+    """
+    n = len(close)
+    exit_pos = pos[:, None] + horizons[None, :]
+    ok = (pos[:, None] < n) & (exit_pos < n)
+    exit_close = np.where(ok, close[np.where(ok, exit_pos, 0)], np.nan)
+    entry_close = np.where(pos < n, close[np.minimum(pos, n - 1)], np.nan)
+    return exit_pos, exit_close, exit_close / entry_close[:, None] - 1.0
+
 
-    # auswerten
-    for idx, row in open_rows.iterrows():
-        ticker = str(row["ticker"])
-        asset = row["asset"]
-        direction = str(row["direction"])
-        sig_date = _to_date(str(row["signal_date"]))
-        h = int(row["horizon_days"])
+EXIT_FRAME_COLS = ["trade_id", "horizon_days", "exit_date", "exit_close", "return", "correct"]
 
+
+def _evaluate_batch(open_rows: pd.DataFrame, market_data: dict[str, pd.DataFrame], horizons=HORIZONS):
+    """
+    Batched Join offener Signale auf die Kursreihen:
+    - signal_date -> nächster Tradingday >= signal_date per searchsorted
+    - pro Ticker eine Forward-Return-Matrix (eindeutige Signal-Tage x Horizonte)
+    - jedes Signal liest seine Zeile positional ab (kein Lookup pro Zeile)
+    Liefert (exits, done): eine Zeile je erreichtem (Signal, Horizont) und die IDs der Signale,
+    deren längster Horizont erreicht ist (fertig). Signale ohne Kurs / Datum bleiben offen.
+    """
+    horizons = np.asarray(sorted({int(h) for h in horizons}), dtype=int)
+    parts, done = [], []
+    for ticker, g in open_rows.groupby(open_rows["ticker"].astype(str), sort=False):
         df = market_data.get(ticker)
-        if df is None or df.empty or "Close" not in df.columns or sig_date is None:
+        if df is None or df.empty or "Close" not in df.columns:
             continue
 
-        # signal_date muss im Index sein (Tradingday)
-        if sig_date not in df.index:
-            # falls Wochenende/Feiertag: nächster Tradingday nach signal_date
-            later = df.index[df.index >= sig_date]
-            if len(later) == 0:
-                continue
-            sig_date = later[0]
+        dates = df.index.to_numpy(dtype="datetime64[ns]")
+        close = _close_values(df)
+        n = len(dates)
 
-        # Entry Close
-        entry_close = df.loc[sig_date, "Close"]
-        try:
-            entry_close = float(entry_close)
-        except Exception:
+        sig = pd.to_datetime(g["signal_date"].astype(str), errors="coerce").dt.normalize()
+        sig = sig.to_numpy(dtype="datetime64[ns]")
+
+        pos = np.where(np.isnat(sig), n, np.searchsorted(dates, sig, side="left"))
+
+        # Signale -> Zeile der (Signal-Tag x Horizont)-Matrix
+        days, day_idx = np.unique(pos, return_inverse=True)
+        exit_pos, exit_close, ret = (a[day_idx] for a in _forward_returns(close, days, horizons))
+
+        ids = g["id"].to_numpy(dtype=int)
+        # längster Horizont liegt in den Daten -> kein Horizont kommt mehr dazu
+        # (fehlender Close an einem Exit-Tag bleibt dann dauerhaft ohne Auswertung)
+        done.extend(ids[(pos < n) & (exit_pos[:, -1] < n)].tolist())
+
+        ok = np.isfinite(ret)
+        if not ok.any():
             continue
 
-        # Exit = h Tradingdays später
-        pos = df.index.get_loc(sig_date)
-        exit_pos = pos + h
-        if exit_pos >= len(df.index):
-            continue  # noch nicht genug Zukunftsdaten -> später auswerten
-
-        exit_date = df.index[exit_pos]
-        exit_close = float(df.loc[exit_date, "Close"])
-
-        ret = (exit_close / entry_close) - 1.0
-        correct = 1 if ((direction == "LONG" and ret > 0) or (direction == "SHORT" and ret < 0)) else 0
-
-        # in original log schreiben (über Index matching)
-        # Wir matchen über asset+signal_date+direction
-        m = (
-            (log["asset"] == asset) &
-            (log["signal_date"].astype(str) == row["signal_date"].astype(str)) &
-            (log["direction"] == direction) &
-            (log["horizon_days"] == h)
-        )
-        if m.any():
-            log.loc[m, "evaluated"] = 1
-            log.loc[m, "exit_date"] = pd.to_datetime(exit_date).strftime("%Y-%m-%d")
-            log.loc[m, "exit_close"] = round(exit_close, 6)
-            log.loc[m, "return"] = round(ret, 6)
-            log.loc[m, "correct"] = int(correct)
-
-    log.to_csv(TRADE_LOG_FILE, index=False)
-    return _compute_stats(log)
-
-
-def _compute_stats(log: pd.DataFrame) -> dict:
-    done = log[log["evaluated"].fillna(0).astype(int) == 1].copy()
-    done["correct"] = done["correct"].fillna("").astype(str)
-
-    def _acc(df):
-        trades = len(df)
-        if trades == 0:
-            return {"trades": 0, "correct": 0, "wrong": 0, "accuracy": None}
-        c = (df["correct"] == "1").sum()
-        w = (df["correct"] == "0").sum()
-        acc = round(c / trades, 4)
-        return {"trades": trades, "correct": int(c), "wrong": int(w), "accuracy": acc}
-
-    overall = _acc(done)
+        rows, cols = np.nonzero(ok)
+        r = ret[rows, cols]
+        direction = g["direction"].astype(str).to_numpy()[rows]
+        correct = ((direction == "LONG") & (r > 0)) | ((direction == "SHORT") & (r < 0))
+
+        parts.append(pd.DataFrame({
+            "trade_id": ids[rows],
+            "horizon_days": horizons[cols],
+            "exit_date": pd.DatetimeIndex(dates[exit_pos[rows, cols]]).strftime("%Y-%m-%d"),
+            "exit_close": np.round(exit_close[rows, cols], 6),
+            "return": np.round(r, 6),
+            "correct": correct.astype(int),
+        }))
+
+    exits = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=EXIT_FRAME_COLS)
+    return exits, done
+
+
+def _wilson_ci(correct: int, n: int, z: float = 1.96):
+    # Wilson-Intervall für die Trefferquote
+    if n == 0:
+        return None
+    p = correct / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return (round(float(center - half), 4), round(float(center + half), 4))
+
+
+def _acc(trades, correct, wrong, sum_ret, sum_ret2) -> dict:
+    trades = int(trades)
+    if trades == 0:
+        return {"trades": 0, "correct": 0, "wrong": 0, "accuracy": None,
+                "accuracy_ci": None, "mean_return": None, "return_ci": None}
+
+    mean = sum_ret / trades
+    var = max(sum_ret2 - trades * mean * mean, 0.0) / (trades - 1) if trades > 1 else 0.0
+    half = 1.96 * np.sqrt(var / trades)
+
+    return {
+        "trades": trades,
+        "correct": int(correct),
+        "wrong": int(wrong),
+        "accuracy": round(correct / trades, 4),
+        "accuracy_ci": _wilson_ci(int(correct), trades),
+        "mean_return": round(float(mean), 6),
+        "return_ci": (round(float(mean - half), 6), round(float(mean + half), 6)),
+    }
+
+
+def _acc_tables(agg: pd.DataFrame) -> tuple[dict, dict]:
+    cols = ["trades", "correct", "wrong", "sum_ret", "sum_ret2"]
+    overall = _acc(*agg[cols].sum())
     by_asset = {}
-    for asset, g in done.groupby("asset"):
-        by_asset[asset] = _acc(g)
+    for asset, g in agg.groupby("asset"):
+        by_asset[asset] = _acc(*g[cols].sum())
+    return overall, by_asset
+
+
+def compute_stats(horizon_days: int | None = None) -> dict:
+    """
+    Stats aus den laufenden Aggregaten (O(Assets x Horizonte), unabhängig von der Log-Größe).
+    overall/by_asset für horizon_days (None -> über alle Horizonte),
+    by_horizon: {h: {"overall", "by_asset"}} für jeden Horizont mit Daten.
+    """
+    agg = _store().stats()
+
+    sel = agg if horizon_days is None else agg[agg["horizon_days"] == int(horizon_days)]
+    overall, by_asset = _acc_tables(sel)
+
+    by_horizon = {}
+    for h, g in agg.groupby("horizon_days"):
+        h_overall, h_by_asset = _acc_tables(g)
+        by_horizon[int(h)] = {"overall": h_overall, "by_asset": h_by_asset}
+
+    return {"horizon_days": horizon_days, "overall": overall, "by_asset": by_asset, "by_horizon": by_horizon}
+
 
-    return {"overall": overall, "by_asset": by_asset}
+def rebuild_stats(horizon_days: int | None = DEFAULT_HORIZON) -> dict:
+    """Aggregate aus dem kompletten Log neu aufbauen (z.B. nach manuellen Korrekturen)."""
+    _store().rebuild_stats()
+    return compute_stats(horizon_days)
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_provider import load_many, slice_history
+from model_core import SCORE_PARAMS, compute_score_matrix
+
+
+# Fenster wie im Forecast (ROWS = letzte 6 Monate pro Ticker)
+UNIVERSE_PERIOD = "6mo"
+
+# forecast_trend-Fenster (days) für 1-5d / 2-3w / ~1m
+TREND_DAYS = (5, 15, 21)
+
+# Bars, die für Score + Trends am Ende jeder Spalte gebraucht werden
+_TAIL = max(SCORE_PARAMS["long_window"] + 1, *TREND_DAYS)
+
+
+# =======================
+# LOAD (dates x tickers)
+# =======================
+def _read_table(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def load_close_matrix(
+    source: Optional[str] = None,
+    *,
+    tickers: Optional[Iterable[str]] = None,
+    period: Optional[str] = UNIVERSE_PERIOD,
+) -> pd.DataFrame:
+    """
+    Close-Matrix (Index = Datum, Spalten = Ticker).
+
+    source = CSV/Parquet, entweder breit (erste Spalte/Index = Datum, eine Spalte pro Ticker)
+             oder lang (Spalten date, ticker, close) -> wird pivotiert.
+    source = None -> tickers über den DataProvider (Cache / Batch-Download).
+    """
+    if source is None:
+        if not tickers:
+            raise ValueError("load_close_matrix: source oder tickers angeben")
+        frames = load_many(tickers, period=period)
+        cols = {t: df["Close"] for t, df in frames.items() if not df.empty and "Close" in df.columns}
+        m = pd.DataFrame(cols)
+    else:
+        raw = _read_table(source)
+        lower = {c.lower(): c for c in raw.columns if isinstance(c, str)}
+        if "ticker" in lower and "close" in lower:
+            date_col = lower.get("date", raw.columns[0])
+            m = raw.pivot_table(index=date_col, columns=lower["ticker"], values=lower["close"], aggfunc="last")
+        else:
+            if not isinstance(raw.index, pd.DatetimeIndex):
+                raw = raw.set_index(raw.columns[0])
+            m = raw
+        if tickers:
+            m = m[[t for t in tickers if t in m.columns]]
+
+    m.index = pd.to_datetime(m.index)
+    if getattr(m.index, "tz", None) is not None:
+        m.index = m.index.tz_localize(None)
+    m = m.sort_index().apply(pd.to_numeric, errors="coerce").astype(float)
+    m.columns = [str(c) for c in m.columns]
+    m.columns.name = "ticker"
+    return slice_history(m, period=period) if period else m
+
+
+# =======================
+# SCORE / TRENDS (2-D)
+# =======================
+def _tail_values(closes: np.ndarray, k: int):
+    """
+    Letzte k gültige Werte je Ticker als (Ticker x k) Array (Lücken zusammengeschoben,
+    wie dropna pro Ticker) plus Anzahl gültiger Bars je Ticker.
+    """
+    ok = np.isfinite(closes)
+    n_valid = ok.sum(axis=0)
+    # stabile Sortierung: ungültige nach oben, gültige behalten ihre Reihenfolge
+    order = np.argsort(ok, axis=0, kind="stable")[-k:]
+    tail = np.take_along_axis(closes, order, axis=0)
+    return np.ascontiguousarray(tail.T), n_valid
+
+
+def cross_section(closes: pd.DataFrame, trend_days=TREND_DAYS) -> pd.DataFrame:
+    """
+    Score V2 + forecast_trend-Werte am letzten Bar für alle Ticker auf einmal.
+
+    Pro Ticker identisch zu compute_score(close.dropna()) bzw. forecast_trend(df, days).
+    """
+    values = closes.to_numpy(dtype=float)
+    k = min(len(values), max(_TAIL, *trend_days))
+    tail, n_valid = _tail_values(values, k)
+    n_tickers = tail.shape[0]
+
+    score = compute_score_matrix(tail, n_bars=n_valid)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = {"score": score}
+        for d in trend_days:
+            trend = np.full(n_tickers, np.nan)
+            if k >= d:
+                past = tail[:, -d]
+                trend = np.round((tail[:, -1] - past) / past, 4)
+            out[f"trend_{d}"] = np.where(n_valid >= d, trend, np.nan)
+
+    # letztes Datum mit gültigem Close je Ticker
+    ok = np.isfinite(values)
+    last_pos = len(values) - 1 - np.argmax(ok[::-1], axis=0)
+    out["n_bars"] = n_valid
+    out["last_date"] = np.where(n_valid > 0, closes.index.values[last_pos], np.datetime64("NaT"))
+
+    return pd.DataFrame(out, index=pd.Index(closes.columns, name="ticker"))
+
+
+# =======================
+# RANK / FILTER
+# =======================
+def scan_universe(
+    closes: pd.DataFrame,
+    *,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    min_bars: int = 30,
+    top: Optional[int] = None,
+    by: str = "score",
+) -> pd.DataFrame:
+    """
+    Querschnitt ranken und filtern.
+
+    rank / pct_rank / zscore beziehen sich auf alle Ticker mit min_bars Historie
+    (vor den Score-Filtern), sortiert absteigend nach `by`.
+    """
+    cs = cross_section(closes)
+    cs = cs[cs["n_bars"] >= min_bars]
+
+    col = cs[by]
+    cs["rank"] = col.rank(ascending=False, method="min").astype("Int64")
+    cs["pct_rank"] = col.rank(pct=True)
+    std = col.std(ddof=0)
+    cs["zscore"] = (col - col.mean()) / std if std > 0 else 0.0
+
+    if min_score is not None:
+        cs = cs[cs["score"] >= min_score]
+    if max_score is not None:
+        cs = cs[cs["score"] <= max_score]
+
+    cs = cs.sort_values([by, "trend_5"], ascending=False, kind="stable")
+    return cs.head(top) if top else cs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score-V2 Scan über ein Ticker-Universum")
+    parser.add_argument("source", nargs="?", help="CSV/Parquet (breit oder lang); sonst --tickers")
+    parser.add_argument("--tickers", nargs="+", help="Ticker über den DataProvider laden")
+    parser.add_argument("--period", default=UNIVERSE_PERIOD)
+    parser.add_argument("--min-score", type=float)
+    parser.add_argument("--max-score", type=float)
+    parser.add_argument("--top", type=int, default=50)
+    parser.add_argument("--out", help="Ergebnis als CSV")
+    args = parser.parse_args(argv)
+
+    if args.source and not os.path.exists(args.source):
+        parser.error(f"{args.source} nicht gefunden")
+
+    closes = load_close_matrix(args.source, tickers=args.tickers, period=args.period)
+
+    t0 = time.perf_counter()
+    result = scan_universe(closes, min_score=args.min_score, max_score=args.max_score, top=args.top)
+    elapsed = time.perf_counter() - t0
+
+    print(result.to_string())
+    print(f"\n[OK] {closes.shape[1]} Ticker x {closes.shape[0]} Bars gescannt in {elapsed:.3f}s")
+
+    if args.out:
+        result.to_csv(args.out)
+
+
+if __name__ == "__main__":
+    main()